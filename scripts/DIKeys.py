@@ -64,3 +64,41 @@ def press(hexKeyCode, duration=0.1):
     KeyDown(hexKeyCode)
     time.sleep(duration)
     KeyUp(hexKeyCode)
+
+
+# Mouse e envio em lote (vários eventos numa única chamada do SendInput)
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+KEYEVENTF_SCANCODE = 0x0008
+KEYEVENTF_KEYUP = 0x0002
+MOUSE_BUTTON_FLAGS = {"left": (0x0002, 0x0004), "right": (0x0008, 0x0010), "middle": (0x0020, 0x0040)}
+SetCursorPos = ctypes.windll.user32.SetCursorPos
+
+
+def key_event(hexKeyCode, up=False):
+    ii_ = Input_I()
+    ii_.ki = KeyBdInput(0, hexKeyCode, KEYEVENTF_SCANCODE | (KEYEVENTF_KEYUP if up else 0), 0, None)
+    return Input(ctypes.c_ulong(INPUT_KEYBOARD), ii_)
+
+
+def mouse_event(flags):
+    ii_ = Input_I()
+    ii_.mi = MouseInput(0, 0, 0, flags, 0, None)
+    return Input(ctypes.c_ulong(INPUT_MOUSE), ii_)
+
+
+def send(events):
+    """
+    Envia uma lista de eventos (key_event/mouse_event) numa única chamada do SendInput.
+    """
+    array = (Input * len(events))(*events)
+    return SendInput(len(events), array, ctypes.sizeof(Input))
+
+
+def click(x, y, clicks=1, button="left"):
+    """
+    Move o cursor para (x, y) e envia todos os cliques de uma vez, sem pausas.
+    """
+    SetCursorPos(int(x), int(y))
+    down, up = MOUSE_BUTTON_FLAGS[button]
+    send([mouse_event(flags) for _ in range(clicks) for flags in (down, up)])
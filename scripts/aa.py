@@ -4,24 +4,30 @@ from util import *
 # Remove capturas de tela temporárias antes de iniciar
 clear_temp_screenshots()
 
+# Estima o marcador e a zona alvo entre as amostras da barra e prevê as posições no instante do clique
+marker_tracker = MarkerTracker(latency=PULL_CLICK_LATENCY)
 
-def pull(brightness=50):
+
+def pull(brightness=50, tracker=None):
     """
     Realiza a ação de puxar o peixe, ajustando a barra de acordo com o brilho atual.
     
-    Em sistemas macOS, captura uma linha da tela e converte a imagem para escala de cinza.
-    Em Windows, utiliza uma imagem capturada e salva temporariamente.
+    Captura uma linha da tela em memória (buffer pré-alocado, sem arquivo temporário) e a analisa com analyze_bar.
+    Com um MarkerTracker, as decisões usam as posições previstas para o instante em que o clique chega ao jogo,
+    a partir do instante em que o quadro foi capturado; um quadro já analisado não é analisado de novo.
     
     Args:
         brightness (int, opcional): Nível de brilho para ajustar o limiar da barra. Padrão é 50.
+        tracker (MarkerTracker, opcional): Rastreador do marcador e da zona alvo. Se None, usa a última amostra.
     
     Returns:
         int ou None: O intervalo de limites da barra (bound_range) se a ação for bem-sucedida,
-        ou None se não for possível realizar a operação (ex.: se a posição atual não for válida).
+        ou None se não for possível realizar a operação (ex.: se a posição atual não for válida ou se ainda não
+        houver um quadro novo).
     """
     if sys.platform == "darwin":
-        # Para macOS: captura uma linha da tela e converte a imagem (inverte canais)
-        im_bar = screenshot(region=(x0 + 612, y0 + 214, 882, 1))[:, :, ::-1]
+        # Para macOS: captura uma linha da tela (sample_row já retorna em RGB)
+        im_bar, t_capture, seq = sample_row((x0 + 612, y0 + 214, 882, 1))
         dark_color_gray = 70
         bright_color_gray = 165
         n_dark = 10     # Número de pixels escuros consecutivos para determinar a posição atual
@@ -31,8 +37,8 @@ def pull(brightness=50):
         lb_right_end = 650
         amount_pull = 80  # Quantidade de mudança na posição para cada puxão
     else:
-        # Para Windows: utiliza uma captura de tela salva temporariamente
-        im_bar = screenshot(os.path.join(TEMP_DIR, "temp.png"), region=(x0 + 560, y0 + 145, 806, 1))
+        # Para Windows: captura a linha da barra em memória
+        im_bar, t_capture, seq = sample_row((x0 + 560, y0 + 145, 806, 1))
         dark_color_gray = 70
         bright_color_gray = int(brightness / 10) + 150
         n_dark = 9     # Número de pixels escuros consecutivos para determinar a posição atual
@@ -41,43 +47,39 @@ def pull(brightness=50):
         ub_range = 300
         lb_right_end = 600
         amount_pull = 65  # Quantidade de mudança na posição para cada puxão
+    if tracker is not None and not tracker.fresh(seq):
+        time.sleep(STALE_FRAME_POLL)
+        return None
 
-    # Converte a linha capturada para escala de cinza usando ponderação dos canais RGB
-    bar_g = np.dot(np.array(im_bar)[0, :, :3], [0.2989, 0.5870, 0.1140])
-    dark = np.where(bar_g < dark_color_gray)[0]  # Índices de pixels escuros
-    diff_dark = np.diff(dark)  # Diferença entre pixels consecutivos
-
-    bounds = np.where(bar_g > bright_color_gray)[0]  # Índices de pixels brilhantes
-    bound_range = bounds.ptp() if bounds.shape[0] > 1 else 0
-    current = None
-    j = 0
-    # Procura por uma sequência de pixels escuros consecutivos para determinar a posição atual da barra
-    while j < len(diff_dark) - n_dark:
-        next_dark = np.where(diff_dark[j:j + n_dark] != 1)[0]
-        if next_dark.shape[0] == 0:
-            current = dark[j] - n_offset
-            break
-        j += next_dark[-1] + 1
-    if current is None or current < 0 or bounds.shape[0] == 0:
+    # Marcador (sequência de pixels escuros) e limites claros numa única passada vetorizada
+    bar = analyze_bar(im_bar, dark_gray=dark_color_gray, bright_gray=bright_color_gray, n_dark=n_dark, n_offset=n_offset)
+    current = bar.marker
+    bound_range = bar.bound_range
+    first_bound, last_bound = bar.first_bound, bar.last_bound
+    if tracker is not None:
+        predicted = tracker.update(bar, t_capture, seq)
+        if current is not None and bar.n_bounds:
+            current, first_bound, last_bound = predicted
+    if current is None or current < 0 or bar.n_bounds == 0:
         return None
 
     # Verifica condições baseadas na quantidade de pixels brilhantes e intervalo para decidir a ação
-    if (2 <= bounds.shape[0] <= 10 and lb_range < bound_range < ub_range) or (bounds[0] > lb_right_end and bound_range < 10):
-        if bounds[0] < current < bounds[-1] - amount_pull:
+    if (2 <= bar.n_bounds <= 10 and lb_range < bound_range < ub_range) or (bar.first_bound > lb_right_end and bound_range < 10):
+        if first_bound < current < last_bound - amount_pull:
             if sys.platform == "darwin":
-                p.press('n')
+                input_backend.press('n')
             else:
                 click_box(boxes[READY])
         elif bound_range < 10:
-            pull_count = (bar_g.shape[0] - current) // amount_pull
+            pull_count = max(bar.width - current, 0) // amount_pull
             if sys.platform == "darwin":
-                p.write('n' * pull_count)
+                input_backend.write('n' * pull_count)
             else:
                 click_box(boxes[READY], pull_count)
-        elif current < bounds[0]:
-            pull_count = (bounds[-1] - current) // amount_pull
+        elif current < first_bound:
+            pull_count = (last_bound - current) // amount_pull
             if sys.platform == "darwin":
-                p.write('n' * pull_count)
+                input_backend.write('n' * pull_count)
             else:
                 click_box(boxes[READY], pull_count)
         else:
@@ -86,6 +88,27 @@ def pull(brightness=50):
     return None
 
 
+def play_minigame(brightness=50):
+    """
+    Joga o minigame de pesca: chama pull() até a barra sumir (MAX_TIMEOUT sem leitura válida) ou até
+    MAX_FISHING_TIME, amostrando a barra a cada PULL_SAMPLE_INTERVAL segundos.
+
+    A pesca é contada como bem-sucedida quando termina porque a barra sumiu, e não pelo tempo máximo; a taxa
+    de sucesso e as amostras por pesca são registradas no log, para comparar ajustes em sessões gravadas
+    (DIABLO_FRAME_SOURCE=replay:...).
+    """
+    marker_tracker.start_catch()
+    t = time.time()
+    bar_or_bounds_not_found_time = time.time()
+    while time.time() - t < MAX_FISHING_TIME and time.time() - bar_or_bounds_not_found_time < MAX_TIMEOUT:
+        if pull(brightness, marker_tracker):  # Se o puxão foi bem-sucedido, atualiza o tempo
+            bar_or_bounds_not_found_time = time.time()
+        if PULL_SAMPLE_INTERVAL:
+            time.sleep(PULL_SAMPLE_INTERVAL)
+    marker_tracker.end_catch(time.time() - t < MAX_FISHING_TIME)
+    log(marker_tracker.summary())
+
+
 def check_status(prev_status, fish_type="yellow"):
     """
     Verifica o status atual da pesca, comparando as imagens da tela com referências conhecidas.
@@ -188,11 +211,7 @@ def fish(fish_type="yellow", fish_key='5', brightness=50, stop=None):
         if not status:
             continue
         if status == PULLING:
-            t = time.time()
-            bar_or_bounds_not_found_time = time.time()
-            while time.time() - t < MAX_FISHING_TIME and time.time() - bar_or_bounds_not_found_time < MAX_TIMEOUT:
-                if pull(brightness):  # Se o puxão foi bem-sucedido, atualiza o tempo\n
-                    bar_or_bounds_not_found_time = time.time()
+            play_minigame(brightness)
             continue
         if status in [INTERRUPTED_PARTY, INTERRUPTED_LAIR, INTERRUPTED_RAID]:
             activate_diablo()
@@ -207,11 +226,11 @@ def fish(fish_type="yellow", fish_key='5', brightness=50, stop=None):
             else:
                 # Para Windows, simula o lançamento da vara de pesca\n
                 cast_fishing_rod(fish_key, box)
-                p.moveTo(box.left, box.top)
+                input_backend.move(box.left, box.top)
                 if fishing_attempted == 0:
                     p.sleep(0.5)
                     for _ in range(10):
-                        DIKeys.press(hexKeyMap.DIK_E, 0.01)
+                        input_backend.press(hexKeyMap.DIK_E, 0.01)
                         p.sleep(round(0.05 + random.random() * 0.1, 1))
             fishing_attempted += 1
             if time.time() - last_pickup_time > 600:
@@ -228,20 +247,16 @@ def fish(fish_type="yellow", fish_key='5', brightness=50, stop=None):
             click_box(box)
             p.sleep(0.1)
             status = PULLING
-            t = time.time()
-            bar_or_bounds_not_found_time = time.time()
-            while time.time() - t < MAX_FISHING_TIME and time.time() - bar_or_bounds_not_found_time < MAX_TIMEOUT:
-                if pull(brightness):  # Se o puxão foi bem-sucedido\n
-                    bar_or_bounds_not_found_time = time.time()
+            play_minigame(brightness)
             if sys.platform == "win32":
-                p.moveTo(find_npc() or (960, 540))
+                input_backend.move(*(find_npc() or (960, 540)))
         elif status == BONUS_NOT_REACHED:
             last_fish_up_time = time.time()
         elif status == WAITING and sys.platform == "win32" and pickup_attempted < PICKUP_LIMIT:
             log("pick up items...")
             last_pickup_time = time.time()
             for _ in range(15):
-                DIKeys.press(hexKeyMap.DIK_E, 0.01)
+                input_backend.press(hexKeyMap.DIK_E, 0.01)
                 p.sleep(round(0.05 + random.random() * 0.1, 1))
             if pickup_win32(pickup_attempted):
                 pickup_attempted += 1
@@ -289,9 +304,9 @@ def walk(key, duration=0.1):
     """
     activate_diablo()
     p.sleep(0.3)
-    p.keyDown(key)
+    input_backend.key_down(key)
     p.sleep(duration)
-    p.keyUp(key)
+    input_backend.key_up(key)
 
 
 def trade_fish_buy_bait_go_back(key_to_npc, key_to_fish):
@@ -331,7 +346,7 @@ def trade_fish_buy_bait_go_back(key_to_npc, key_to_fish):
         elif status == PICK:
             activate_diablo()
             p.sleep(0.1)
-            p.press('space')
+            input_backend.press('space')
         elif stage == "trade":
             walk(key_to_npc)
         elif stage == "buy":
@@ -352,15 +367,15 @@ def trade_fish():
     Após a troca, aguarda um tempo para que a operação seja concluída.
     """
     log("selling fish to npc...")
-    p.press('space')
+    input_backend.press('space')
     p.sleep(1)
-    p.click(x0 // 2 + 850, y0 // 2 + 540)
+    input_backend.click(x0 // 2 + 850, y0 // 2 + 540)
     p.sleep(0.5)
-    p.click(x0 // 2 + 530, y0 // 2 + 660)
+    input_backend.click(x0 // 2 + 530, y0 // 2 + 660)
     p.sleep(0.2)
-    p.click(x0 // 2 + 880, y0 // 2 + 650)
+    input_backend.click(x0 // 2 + 880, y0 // 2 + 650)
     p.sleep(0.2)
-    p.click(x0 // 2 + 1010, y0 // 2 + 170)
+    input_backend.click(x0 // 2 + 1010, y0 // 2 + 170)
     p.sleep(15)
     walk('w', 0.2)
 
@@ -372,23 +387,23 @@ def buy_bait():
     A função simula cliques com intervalos curtos para assegurar o registro correto da ação.
     """
     log("buying baits...")
-    p.press('space')
+    input_backend.press('space')
     p.sleep(1)
-    p.click(x0 // 2 + 840, y0 // 2 + 600)
+    input_backend.click(x0 // 2 + 840, y0 // 2 + 600)
     p.sleep(1)
-    p.click(x0 // 2 + 890, y0 // 2 + 600)
+    input_backend.click(x0 // 2 + 890, y0 // 2 + 600)
     p.sleep(0.2)
-    p.click(x0 // 2 + 960, y0 // 2 + 470)
+    input_backend.click(x0 // 2 + 960, y0 // 2 + 470)
     p.sleep(0.2)
-    p.click(x0 // 2 + 960, y0 // 2 + 470)
+    input_backend.click(x0 // 2 + 960, y0 // 2 + 470)
     p.sleep(0.2)
-    p.click(x0 // 2 + 960, y0 // 2 + 470)
+    input_backend.click(x0 // 2 + 960, y0 // 2 + 470)
     p.sleep(0.2)
-    p.click(x0 // 2 + 900, y0 // 2 + 655)
+    input_backend.click(x0 // 2 + 900, y0 // 2 + 655)
     p.sleep(0.2)
-    p.click(x0 // 2 + 1010, y0 // 2 + 170)
+    input_backend.click(x0 // 2 + 1010, y0 // 2 + 170)
     p.sleep(0.2)
-    p.click(x0 // 2 + 1010, y0 // 2 + 170)
+    input_backend.click(x0 // 2 + 1010, y0 // 2 + 170)
 
 
 def trade_with_gui(attempts_trade=3, attempts_sell=3):
@@ -410,20 +425,20 @@ def trade_with_gui(attempts_trade=3, attempts_sell=3):
         position = find_npc()
         if not position:
             return trade_with_gui(attempts_trade - 1)
-        p.click(position)
+        input_backend.click(*position)
         error = 0
         error += click_image("trade", time.time(), 3)
         error += click_image("select", time.time(), 3)
         error += click_image("exchange", time.time(), 3, confidence=0.97)
         p.sleep(1)
         if error > 0:
-            p.click(window.center)
+            input_backend.click(*window.center)
             p.sleep(0.3)
-            p.click(window.center)
+            input_backend.click(*window.center)
             p.sleep(0.3)
             click_image("x", time.time(), 1)
             p.sleep(0.5)
-            p.click(window.center)
+            input_backend.click(*window.center)
             p.sleep(1)
             return trade_with_gui(attempts_trade - 1)
         else:
@@ -441,7 +456,7 @@ def trade_with_gui(attempts_trade=3, attempts_sell=3):
         position = find_npc()
         if not position:
             return trade_with_gui(0, attempts_sell - 1)
-        p.click(position)
+        input_backend.click(*position)
         error = 0
         error += click_image("shop", time.time(), 3)
         error += click_image("amount", time.time(), 3, offset=(0.2, 0.7, -0.2, -0.1))
@@ -451,11 +466,11 @@ def trade_with_gui(attempts_trade=3, attempts_sell=3):
         if error > 0:
             return trade_with_gui(0, attempts_sell - 1)
         p.sleep(1)
-        DIKeys.press(hexKeyMap.DIK_Q)
+        input_backend.press(hexKeyMap.DIK_Q, 0.1)
         p.sleep(0.1)
-        DIKeys.press(hexKeyMap.DIK_D, 1)
+        input_backend.press(hexKeyMap.DIK_D, 1)
         p.sleep(0.1)
-        DIKeys.press(hexKeyMap.DIK_A, 1)
+        input_backend.press(hexKeyMap.DIK_A, 1)
     return 0
 
 
@@ -501,7 +516,7 @@ def pickup_win32(attempted=0, pickup_blue=True, legendary_alarm=False):
         y = int(click_region[1] + click_span * (j + 0.5) + (random.random() - 0.5) * click_flex)
         for i in range(0, click_region[2] // click_span + 1):
             x = int(click_region[0] + click_span * (i + 0.5) + (random.random() - 0.5) * click_flex)
-            p.click(x, y)
+            input_backend.click(x, y)
             p.sleep(0.1)
     if legendary_alarm and attempted >= PICKUP_LIMIT - 1:
         if np.where((np.abs(np.array(im)[:, :, :3] - orange_rgb) <= color_threshold).all(axis=2))[0].shape[0] > 10:
@@ -0,0 +1,59 @@
+import collections
+
+import cv2
+import numpy as np
+
+GRAY_WEIGHTS = np.array([0.2989, 0.5870, 0.1140])
+
+BarReading = collections.namedtuple('BarReading', 'marker first_bound last_bound n_bounds bound_range green width')
+
+
+def analyze_bar(row, dark_gray=70, bright_gray=165, n_dark=10, n_offset=8, green_rgb=None, green_tolerance=20):
+    """
+    Analisa a linha da barra numa única passada vetorizada, sem laços em Python.
+
+    O marcador é o primeiro pixel escuro seguido de 'n_dark' pixels escuros consecutivos: as diferenças entre
+    os índices dos pixels escuros são 1 dentro de uma sequência, e uma soma acumulada dessas diferenças dá o
+    tamanho de todas as janelas de uma só vez. Os critérios são os mesmos do laço antigo do pull() do aa.py,
+    inclusive a exigência de mais um pixel escuro depois da sequência.
+
+    Args:
+        row (numpy.ndarray): Linha(s) da barra em RGB (altura x largura x 3), como retornado por read_row.
+            A primeira linha é usada para o marcador e os limites; todas para a cobertura de verde.
+        dark_gray (int, opcional): Tons de cinza abaixo deste valor são escuros. Padrão é 70.
+        bright_gray (int, opcional): Tons de cinza acima deste valor são claros. Padrão é 165.
+        n_dark (int, opcional): Número de pixels escuros consecutivos do marcador. Padrão é 10.
+        n_offset (int, opcional): Offset subtraído da posição da sequência escura. Padrão é 8.
+        green_rgb (tuple, opcional): Cor RGB do verde da barra. Se None, a cobertura não é calculada.
+        green_tolerance (int, opcional): Diferença (estritamente menor) por canal para a cor verde. Padrão é 20.
+
+    Returns:
+        BarReading: marker (posição do marcador ou None), first_bound/last_bound (primeiro e último pixel claro,
+        ou None), n_bounds (número de pixels claros), bound_range (distância entre o primeiro e o último pixel
+        claro, 0 se houver menos de dois), green (fração de pixels verdes, ou None) e width (largura da linha).
+    """
+    row = np.asarray(row)
+    bar_g = np.dot(row[0, :, :3], GRAY_WEIGHTS)
+    dark = np.flatnonzero(bar_g < dark_gray)
+    marker = None
+    n_windows = len(dark) - 1 - n_dark
+    if n_windows > 0:
+        steps = np.concatenate(([0], np.cumsum(np.diff(dark) == 1)))
+        runs = np.flatnonzero(steps[n_dark:n_dark + n_windows] - steps[:n_windows] == n_dark)
+        if runs.shape[0]:
+            marker = int(dark[runs[0]]) - n_offset
+    bounds = np.flatnonzero(bar_g > bright_gray)
+    n_bounds = bounds.shape[0]
+    green = None
+    if green_rgb is not None:
+        lower = tuple(max(int(c) - green_tolerance + 1, 0) for c in green_rgb)
+        upper = tuple(min(int(c) + green_tolerance - 1, 255) for c in green_rgb)
+        pixels = np.ascontiguousarray(row[:, :, :3])
+        green = cv2.countNonZero(cv2.inRange(pixels, lower, upper)) / (pixels.shape[0] * pixels.shape[1])
+    return BarReading(marker,
+                      int(bounds[0]) if n_bounds else None,
+                      int(bounds[-1]) if n_bounds else None,
+                      n_bounds,
+                      int(bounds[-1] - bounds[0]) if n_bounds > 1 else 0,
+                      green,
+                      bar_g.shape[0])
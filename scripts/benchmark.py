@@ -0,0 +1,565 @@
+"""
+Benchmarks das rotinas de captura e detecção.
+
+Uso:
+    python benchmark.py <nome> [--seconds N]
+
+Os benchmarks que leem a tela precisam do jogo aberto (assim como fishing.py); os demais usam imagens sintéticas.
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCHMARKS = {}
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources")
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__.replace("bench_", "")] = func
+    return func
+
+
+def rate(func, seconds):
+    """
+    Executa func repetidamente durante 'seconds' segundos.
+
+    Returns:
+        tuple: (chamadas por segundo, tempo médio por chamada em ms)
+    """
+    n = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        func()
+        n += 1
+    elapsed = time.perf_counter() - t0
+    return n / elapsed, elapsed / n * 1000
+
+
+@benchmark
+def bench_bar_reads(seconds):
+    """
+    Leituras da barra do pull() por segundo: captura gravando temp.png (antes) x read_row em memória (depois).
+    """
+    import util
+    if sys.platform == "darwin":
+        region = (util.x0 + 612, util.y0 + 214, 882, 1)
+    else:
+        region = (util.x0 + 560, util.y0 + 145, 806, 1)
+    temp_path = os.path.join(util.TEMP_DIR, "temp.png")
+    before = rate(lambda: util.screenshot(temp_path, region=region), seconds)
+    after = rate(lambda: util.read_row(region), seconds)
+    print(f"antes  (screenshot + temp.png): {before[0]:8.1f} leituras/s ({before[1]:.2f} ms)")
+    print(f"depois (read_row em memória):   {after[0]:8.1f} leituras/s ({after[1]:.2f} ms)")
+
+
+@benchmark
+def bench_capture_fps(seconds):
+    """
+    Quadros por segundo da frame_source configurada (DIABLO_FRAME_SOURCE), em tela cheia e na região da barra.
+    """
+    import util
+    full = rate(util.frame_source.grab, seconds)
+    bar = rate(lambda: util.frame_source.grab((util.x0 + 560, util.y0 + 145, 806, 1)), seconds)
+    print(f"fonte: {type(util.frame_source).__name__}")
+    print(f"tela cheia: {full[0]:8.1f} quadros/s ({full[1]:.2f} ms)")
+    print(f"barra:      {bar[0]:8.1f} quadros/s ({bar[1]:.2f} ms)")
+
+
+def synthetic_screen(seed=0):
+    """
+    Gera um "screenshot" 1920x1080 BGR e um template 80x40 colado em três posições.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    haystack = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+    needle = rng.integers(0, 256, (40, 80, 3), dtype=np.uint8)
+    for x, y in [(300, 200), (1500, 700), (960, 540)]:
+        haystack[y:y + 40, x:x + 80] = needle
+    return haystack, needle
+
+
+@benchmark
+def bench_locate(seconds):
+    """
+    locate_all (todas as posições) x locate (primeira) x locate_best x locate_top_k num haystack 1920x1080.
+    """
+    import numpy as np
+    import cv2
+    import locate_im
+    haystack, needle = synthetic_screen()
+
+    def legacy_locate_all():
+        # Implementação anterior: np.arange sobre todo o resultado antes do unravel_index
+        result = cv2.matchTemplate(haystack, needle, cv2.TM_CCOEFF_NORMED)
+        match_indices = np.arange(result.size)[(result > 0.5).flatten()]
+        return np.unravel_index(match_indices[:10000], result.shape)
+
+    # um "glifo" liso casa com milhares de posições vizinhas a uma confiança baixa
+    glyph_haystack = cv2.GaussianBlur(haystack, (0, 0), 8)
+    glyph = glyph_haystack[500:520, 900:920].copy()
+    n_all = len(tuple(locate_im.locate_all(glyph, glyph_haystack, confidence=0.8)))
+    n_top = len(locate_im.locate_top_k(glyph, glyph_haystack, k=10, confidence=0.8))
+    print(f"glifo: locate_all {n_all} caixas, locate_top_k {n_top} caixas (com supressão)")
+
+    cases = [("locate_all (antigo)", legacy_locate_all),
+             ("locate (primeira)", lambda: locate_im.locate(needle, haystack, confidence=0.9)),
+             ("locate_best", lambda: locate_im.locate_best(needle, haystack, confidence=0.9)),
+             ("locate_top_k k=5", lambda: locate_im.locate_top_k(needle, haystack, k=5, confidence=0.9))]
+    for name, func in cases:
+        calls, ms = rate(func, seconds)
+        print(f"{name:22s} {ms:8.2f} ms/chamada")
+
+
+def screens_with_templates(names, n_screens=4, seed=0):
+    """
+    Gera telas 1920x1080 com fundo texturizado e todos os templates pedidos colados em posições aleatórias.
+
+    Returns:
+        list: (haystack BGR, {nome: (x, y)}) para cada tela.
+    """
+    import numpy as np
+    import cv2
+    rng = np.random.default_rng(seed)
+    screens = []
+    for _ in range(n_screens):
+        noise = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+        haystack = cv2.GaussianBlur(noise, (0, 0), 3)
+        positions = {}
+        for name in names:
+            needle = cv2.imread(os.path.join(RESOURCES_DIR, name + ".png"))
+            h, w = needle.shape[:2]
+            while True:  # sem sobreposição entre os templates colados
+                x = int(rng.integers(0, 1920 - w))
+                y = int(rng.integers(0, 1080 - h))
+                if all(x + w <= px or px + pw <= x or y + h <= py or py + ph <= y
+                       for px, py, pw, ph in positions.values()):
+                    break
+            haystack[y:y + needle.shape[0], x:x + needle.shape[1]] = needle
+            positions[name] = (x, y, w, h)
+        screens.append((haystack, {name: (x, y) for name, (x, y, _, _) in positions.items()}))
+    return screens
+
+
+@benchmark
+def bench_pyramid(seconds):
+    """
+    Busca exata x busca em pirâmide (escala reduzida + refinamento) em tela cheia: latência e recall.
+
+    Recall é a fração de buscas em que a melhor posição fica a até 2 px da posição real com score >= 0.8.
+    """
+    from templates import Haystack, TemplateStore
+    names = ["icon_fish", "icon_bag", "navigate", "salvage", "white_unticked", "x", "accept", "pull"]
+    screens = screens_with_templates(names)
+    store = TemplateStore({name: os.path.join(RESOURCES_DIR, name + ".png") for name in names})
+    configs = [("exata", None)] + [(f"escala {scale} x{n}", (scale, n))
+                                   for scale in (0.5, 0.25) for n in (1, 3, 5)]
+    per_config = max(seconds / len(configs), 0.1)
+    for label, coarse in configs:
+        found = total = 0
+        elapsed = 0.0
+        t_end = time.perf_counter() + per_config
+        while True:
+            for haystack, positions in screens:
+                levels = Haystack(haystack)  # níveis recalculados a cada tela, como num quadro novo
+                t0 = time.perf_counter()
+                for name, (x, y) in positions.items():
+                    box, score = store.match(name, levels, coarse=coarse)
+                    total += 1
+                    found += box is not None and score >= 0.8 and abs(box.left - x) <= 2 and abs(box.top - y) <= 2
+                elapsed += time.perf_counter() - t0
+            if time.perf_counter() >= t_end:
+                break
+        print(f"{label:16s} {elapsed / total * 1000:8.2f} ms/busca, recall {found / total:.3f}")
+
+
+def synthetic_loot(seed=0):
+    """
+    Gera a região de coleta (1120x600, BGR) com textos de itens azuis, amarelos e laranjas sobre fundo ruidoso.
+    """
+    import numpy as np
+    import cv2
+    from loot import LOOT_COLORS
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, (600, 1120, 3), dtype=np.uint8)
+    for i, rgb in enumerate(list(LOOT_COLORS.values()) * 3):
+        x, y = int(rng.integers(0, 900)), int(rng.integers(20, 580))
+        cv2.putText(image, f"item {i}", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, rgb[::-1], 1)
+    return image
+
+
+@benchmark
+def bench_loot(seconds):
+    """
+    Classificação das cores dos itens em pickup_win32: três máscaras int64 (antes) x ColorLabeller (depois).
+    """
+    import numpy as np
+    from loot import LOOT_COLORS, ColorLabeller, pixel_count
+    image = synthetic_loot()
+    labeller = ColorLabeller(LOOT_COLORS, tolerance=5)
+    colors = {name: np.array(rgb) for name, rgb in LOOT_COLORS.items()}
+
+    def legacy():
+        im = image[:, :, ::-1]
+        masks = {name: (np.abs(np.array(im)[:, :, :3] - rgb) <= 5).all(axis=2) for name, rgb in colors.items()}
+        pts = np.argwhere(masks["blue"] | masks["yellow"] | masks["orange"])
+        orange = np.where((np.abs(np.array(im)[:, :, :3] - colors["orange"]) <= 5).all(axis=2))[0].shape[0]
+        return masks, pts, orange
+
+    masks, _, _ = legacy()
+    blobs = labeller.blobs(image)
+    for name in colors:
+        assert pixel_count(blobs[name]) == masks[name].sum(), name
+        print(f"{name:7s} {masks[name].sum():6d} pixels, {len(blobs[name]):4d} blobs")
+    before = rate(legacy, seconds)
+    after = rate(lambda: labeller.blobs(image), seconds)
+    print(f"antes  (máscaras int64):  {before[1]:8.2f} ms")
+    print(f"depois (ColorLabeller):   {after[1]:8.2f} ms")
+
+
+@benchmark
+def bench_pickup_plan(seconds):
+    """
+    Cliques por tentativa de coleta: grade de 120 px sobre a caixa de todos os pixels coloridos (antes) x um
+    clique por item, em caminho curto (depois). Mostra também o comprimento do caminho sem e com 2-opt.
+    """
+    import numpy as np
+    from loot import LOOT_COLORS, ColorLabeller, bounding_box, merge_blobs, plan_tour, tour_length
+    labeller = ColorLabeller(LOOT_COLORS, tolerance=5)
+    start = (960, 540)
+    for seed in range(3):
+        image = synthetic_loot(seed)
+        blobs = [blob for color_blobs in labeller.blobs(image, 400, 240).values() for blob in color_blobs]
+        x, y, w, h = bounding_box(blobs)
+        grid_clicks = (h + 120) // 120 * (w // 120 + 1)
+        items = merge_blobs(blobs)
+        points = [(item.cx, item.top + 90) for item in items]
+        greedy = tour_length(sorted(points, key=lambda q: np.hypot(q[0] - start[0], q[1] - start[1])), start)
+        planned = plan_tour(points, start)
+        calls, ms = rate(lambda: plan_tour(points, start), min(seconds, 1.0))
+        print(f"tela {seed}: grade {grid_clicks:3d} cliques, planejado {len(planned):3d} cliques ({len(items)} itens), "
+              f"caminho {greedy:.0f} px (por distância) -> {tour_length(planned, start):.0f} px, "
+              f"planejamento {ms:.2f} ms")
+
+
+@benchmark
+def bench_npc(seconds):
+    """
+    find_npc: diferença int16 + argwhere + mediana na tela inteira (antes) x NpcTracker (depois), com o NPC
+    parado e andando pela tela. Mostra também a diferença entre as posições encontradas.
+    """
+    import numpy as np
+    import cv2
+    from capture import Frame
+    from trackers import NpcTracker
+    color = (248, 198, 134)
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8), (0, 0), 3)
+
+    def screen(x, y):
+        image = background.copy()
+        cv2.putText(image, "Fisher", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, color[::-1], 2)
+        return Frame(image)
+
+    def legacy(frame):
+        matches = np.argwhere((np.abs(frame.image.astype(np.int16) - np.array(color)[::-1]) <= 5).all(axis=2))
+        if matches.shape[0] > 20:
+            position = np.median(matches, axis=0)[::-1]
+            return int(position[0]), int(position[1]) + 20
+
+    for label, frames in [("parado", [screen(900, 500)] * 20),
+                          ("andando", [screen(300 + 40 * i, 300 + 15 * i) for i in range(20)])]:
+        tracker = NpcTracker(color)
+        error = max(np.hypot(*np.subtract(tracker.locate(f), legacy(f))) for f in frames)
+        before = rate(lambda: [legacy(f) for f in frames], seconds / 4)
+        after = rate(lambda: [tracker.locate(f) for f in frames], seconds / 4)
+        print(f"{label:8s} antes {before[1] / len(frames):7.2f} ms/chamada, "
+              f"depois {after[1] / len(frames):6.2f} ms/chamada, diferença máx. {error:.1f} px")
+        print(f"         {tracker.summary()}")
+
+
+@benchmark
+def bench_ocr_crops(seconds):
+    """
+    OCR do nome do NPC: tela inteira filtrada pela cor (antes) x só os recortes das linhas de texto (depois).
+
+    Sem o Tesseract instalado, mostra apenas a área enviada ao OCR e o custo do recorte.
+    """
+    import numpy as np
+    import cv2
+    from pytesseract import pytesseract
+    from ocr import text_line_crops
+    color = np.array((248, 198, 134))
+    rng = np.random.default_rng(0)
+    screen = cv2.GaussianBlur(rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8), (0, 0), 3)
+    for i, (x, y) in enumerate([(900, 500), (300, 200), (1400, 800)]):
+        cv2.putText(screen, ["Fisher", "Ferretre", "Fisher"][i], (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0,
+                    color[::-1].tolist(), 2)
+    filtered = screen.copy()
+    filtered[np.where((np.abs(filtered - color[::-1]) >= 30).any(axis=2))] = np.array([0, 0, 0])
+    crops = text_line_crops(filtered)
+    area = sum(crop.shape[0] * crop.shape[1] for crop, _, _ in crops)
+    calls, ms = rate(lambda: text_line_crops(filtered), min(seconds, 1.0))
+    print(f"{len(crops)} recortes, {area / (1920 * 1080):.2%} da tela, recorte em {ms:.2f} ms")
+    config = "-c tessedit_char_whitelist=aBceFhlkimrst"
+    try:
+        t0 = time.perf_counter()
+        full = pytesseract.image_to_data(filtered, config=config, output_type=pytesseract.Output.DICT)
+        t1 = time.perf_counter()
+        texts = [pytesseract.image_to_data(crop, config=config, output_type=pytesseract.Output.DICT)["text"]
+                 for crop, _, _ in crops]
+        t2 = time.perf_counter()
+    except pytesseract.TesseractNotFoundError:
+        print("Tesseract não instalado: tempos de OCR não medidos")
+        return
+    print(f"antes  (tela inteira): {(t1 - t0) * 1000:8.1f} ms, {[t for t in full['text'] if t.strip()]}")
+    print(f"depois (recortes):     {(t2 - t1) * 1000:8.1f} ms, {[t for text in texts for t in text if t.strip()]}")
+
+
+def legacy_bar(row, dark_gray=70, bright_gray=165, n_dark=10, n_offset=8, green_rgb=(111, 44, 35), tolerance=20):
+    """
+    Implementação anterior da leitura da barra (laço do pull() do aa.py + percentual de verde do fishing.py).
+    """
+    import numpy as np
+    bar_g = np.dot(np.asarray(row)[0, :, :3], [0.2989, 0.5870, 0.1140])
+    dark = np.where(bar_g < dark_gray)[0]
+    diff_dark = np.diff(dark)
+    bounds = np.where(bar_g > bright_gray)[0]
+    bound_range = np.ptp(bounds) if bounds.shape[0] > 1 else 0
+    current = None
+    j = 0
+    while j < len(diff_dark) - n_dark:
+        next_dark = np.where(diff_dark[j:j + n_dark] != 1)[0]
+        if next_dark.shape[0] == 0:
+            current = dark[j] - n_offset
+            break
+        j += next_dark[-1] + 1
+    green = np.mean((np.abs(np.asarray(row)[:, :, :3] - list(green_rgb)) < tolerance).all(axis=2))
+    return current, bounds, bound_range, green
+
+
+def synthetic_bar_rows(n=500, width=806, seed=0):
+    """
+    Gera linhas da barra (2 x largura x 3, RGB): fundo médio, zona alvo clara, marcador escuro, trechos verdes
+    e ruído, incluindo casos sem marcador e sequências escuras curtas.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        row = rng.integers(90, 140, (2, width, 3)).astype(np.uint8)
+        start = int(rng.integers(0, width - 300))
+        for x in (start, start + int(rng.integers(0, 300))):
+            row[:, x:x + int(rng.integers(1, 4))] = 230  # limites claros
+        for _ in range(int(rng.integers(0, 4))):
+            x = int(rng.integers(0, width - 20))
+            row[:, x:x + int(rng.integers(1, 20))] = rng.integers(0, 40)  # marcador ou sequências escuras curtas
+        x = int(rng.integers(0, width - 100))
+        row[:, x:x + int(rng.integers(0, 100))] = (111, 44, 35)  # verde
+        row[rng.random((2, width)) < 0.01] = 0  # ruído
+        rows.append(row)
+    return rows
+
+
+@benchmark
+def bench_bar_kernel(seconds):
+    """
+    Análise da linha da barra: laço em Python (antes) x analyze_bar vetorizado (depois).
+
+    A equivalência com a implementação anterior é verificada em tests/test_bar.py.
+    """
+    from bar import analyze_bar
+    rows = synthetic_bar_rows()
+    before = rate(lambda: [legacy_bar(row) for row in rows[:50]], seconds / 2)
+    after = rate(lambda: [analyze_bar(row, green_rgb=(111, 44, 35)) for row in rows[:50]], seconds / 2)
+    print(f"antes  (laço):        {before[1] / 50 * 1000:8.1f} µs/linha")
+    print(f"depois (analyze_bar): {after[1] / 50 * 1000:8.1f} µs/linha")
+
+
+@benchmark
+def bench_marker_tracker(seconds):
+    """
+    Erro da posição do marcador no instante do clique (50 ms depois da captura): última amostra (antes) x
+    previsão do MarkerTracker (depois), para vários intervalos entre amostras. O marcador simulado oscila
+    como no minigame, com ruído de ±2 px na leitura.
+    """
+    import numpy as np
+    from bar import BarReading
+    from trackers import MarkerTracker
+    latency = 0.05
+    rng = np.random.default_rng(0)
+
+    def marker_at(t):
+        return 400 + 250 * np.sin(2 * np.pi * 0.4 * t) + 60 * np.sin(2 * np.pi * 1.3 * t)
+
+    for interval in (0.005, 0.02, 0.05):
+        tracker = MarkerTracker(latency=latency)
+        tracker.start_catch()
+        errors_before, errors_after = [], []
+        for t in np.arange(0, 20, interval):
+            measured = int(marker_at(t) + rng.integers(-2, 3))
+            predicted, _, _ = tracker.update(BarReading(measured, 100, 700, 2, 600, None, 806), t)
+            errors_before.append(abs(measured - marker_at(t + latency)))
+            errors_after.append(abs(predicted - marker_at(t + latency)))
+        print(f"amostra a cada {interval * 1000:4.0f} ms: erro médio {np.mean(errors_before):5.1f} px (última amostra)"
+              f" -> {np.mean(errors_after):5.1f} px (previsto), p95 {np.percentile(errors_before, 95):5.1f}"
+              f" -> {np.percentile(errors_after, 95):5.1f} px")
+
+
+@benchmark
+def bench_input(seconds):
+    """
+    Latência de despacho das entradas: pyautogui com a pausa implícita (antes) x InputBackend (depois).
+
+    Para não clicar em nada na tela, os backends reais são medidos movendo o mouse para a posição atual;
+    os cliques (simples e multi-clique em lote) são medidos no RecordingBackend, que mostra o custo da própria
+    camada de despacho.
+    """
+    from inputs import RecordingBackend, open_input_backend
+    record = RecordingBackend()
+    cases = [("record click", lambda: record.click(10, 10)),
+             ("record click x5 (lote)", lambda: record.click(10, 10, clicks=5)),
+             ("record press", lambda: record.press(0x12))]
+    try:
+        import pyautogui
+        backend = open_input_backend(os.environ.get("DIABLO_INPUT_BACKEND", ""))
+        x, y = pyautogui.position()
+        cases += [("pyautogui moveTo (PAUSE)", lambda: pyautogui.moveTo(x, y)),
+                  (f"{backend.name} move", lambda: backend.move(x, y))]
+    except Exception as e:
+        print(f"sem display para os backends reais ({type(e).__name__}): medindo apenas o RecordingBackend")
+    for name, func in cases:
+        calls, ms = rate(func, seconds / len(cases))
+        print(f"{name:26s} {ms * 1000:10.1f} µs/chamada")
+
+
+
+@benchmark
+def bench_input_scheduler(seconds):
+    """
+    Tempo em que a thread de decisão fica bloqueada numa rajada de 15 teclas E: laço com sleeps (antes) x
+    InputScheduler (depois), e o tempo até um clique urgente interromper a rajada agendada.
+    """
+    import random
+    from inputs import URGENT, InputScheduler, RecordingBackend
+
+    def legacy(backend):
+        for _ in range(15):
+            backend.press(0x12, 0.01)
+            time.sleep(round(0.05 + random.random() * 0.1, 1))
+
+    record = RecordingBackend()
+    t0 = time.perf_counter()
+    legacy(record)
+    print(f"laço com sleeps        {(time.perf_counter() - t0) * 1000:8.1f} ms bloqueado")
+    scheduler = InputScheduler(record)
+    t0 = time.perf_counter()
+    scheduler.burst(0x12, 15)
+    print(f"InputScheduler.burst   {(time.perf_counter() - t0) * 1000:8.3f} ms bloqueado")
+    time.sleep(0.3)
+    record.events.clear()
+    t0 = time.monotonic()
+    scheduler.submit("click", 10, 10, priority=URGENT, preempt=True)
+    scheduler.wait_idle(5)
+    clicks = [e[0] for e in record.events if e[1] == "click"]
+    print(f"clique urgente         {(clicks[0] - t0) * 1000:8.3f} ms até o despacho, "
+          f"{sum(e[1] == 'key_down' for e in record.events)} teclas depois dele")
+    print(scheduler.summary())
+
+
+@benchmark
+def bench_state_prober(seconds):
+    """
+    Buscas de template por tick de check_status numa sessão de pesca simulada: ordem fixa com as três
+    interrupções (antes) x StateProber sem as interrupções, que ficam com a thread de interrupções (depois),
+    com a mesma tabela de transições de fishing.py, sem e com os estados críticos verificados primeiro.
+
+    Os primeiros ticks de cada minigame ainda mostram o botão de espera ou o pronto junto com o de puxar;
+    um tick está errado quando o estado retornado não é o de maior prioridade visível (o que a ordem fixa
+    sempre retorna).
+    """
+    from states import StateProber
+    fixed_order = ['l', 'i', 'd', 'p', 'r', 'w', 's', 'k']  # lair, party, raid, pulling, ready, waiting, standby, pick
+    states = ['p', 'r', 'w', 's', 'k']
+    transitions = {'': ('s', 'w', 'r', 'p'), 's': ('s', 'w', 'k'), 'w': ('w', 'r'), 'r': ('p', 'r', 'w'),
+                   'p': ('p', 'w', 'r', 's'), 'k': ('k', 's', 'w')}
+    # Um lançamento, a espera, a mordida (que às vezes cai entre dois ticks), o minigame (com o botão ainda
+    # visível no início) e, de vez em quando, a coleta; cada tick é o conjunto de estados visíveis
+    sequence = []
+    for i in range(200):
+        sequence += ([{'s'}] * 2 + [{'w'}] * 15 + ([{'r'}] if i % 3 else []) + [{'p', 'r'}] + [{'p', 'w'}] * 2
+                     + [{'p'}] * 4 + ([{'k'}] if i % 5 == 0 else []))
+
+    def run(prober):
+        prev, wrong = '', 0
+        for visible in sequence:
+            probes, found = 0, None
+            for state in prober.order(prev):
+                probes += 1
+                if state in visible:
+                    found = state
+                    break
+            prober.observe(prev, found, probes)
+            wrong += found != min(visible, key=states.index)
+            prev = found
+        return wrong
+
+    fixed = sum(fixed_order.index(min(visible, key=states.index)) + 1 for visible in sequence) / len(sequence)
+    print(f"ordem fixa                  {fixed:5.2f} buscas/tick, 0 ticks errados")
+    for label, first in (("StateProber", ()), ("StateProber + críticos", ('p', 'r'))):
+        prober = StateProber(states, transitions, full_sweep_every=10, first=first)
+        wrong = run(prober)
+        print(f"{label:27s} {prober.probes_per_tick:5.2f} buscas/tick, {wrong} ticks errados "
+              f"({prober.full_sweeps} varreduras completas)")
+
+
+@benchmark
+def bench_dialog_waits(seconds):
+    """
+    Tempo de um ciclo de trade_fish e buy_bait numa interface simulada, em que cada clique produz o seu efeito
+    (o diálogo seguinte aparece ou o botão clicado some) depois de uma latência aleatória: só pausas fixas
+    (antes) x wait_until nos passos que esperam um estado produzido pelo clique (depois). Os passos seguem
+    fishing.py; os tempos rodam em escala 1:10 e são relatados em segundos reais. O custo de cada busca de
+    template não entra na simulação (ver o benchmark locate).
+    """
+    import random
+    from control import WaitStats, wait_for
+    scale = 0.1
+    poll = 0.1  # WAIT_POLL_INTERVAL do util
+    # (pausa fixa antiga, o que o clique produz: None, "appears" ou "gone", latência da interface em s)
+    flows = {
+        "trade_fish": [(1, "appears", (0.2, 0.6)), (0.5, "appears", (0.1, 0.3)), (0.2, None, None),
+                       (0.2, "gone", (0.05, 0.15)), (15, "appears", (2.0, 6.0))],
+        "buy_bait": [(1, "appears", (0.2, 0.6)), (1, "appears", (0.2, 0.5)), (0.2, "appears", (0.05, 0.15)),
+                     (0.4, None, None), (0.2, None, None), (0.2, None, None), (0.2, None, None)],
+    }
+    rng = random.Random(0)
+
+    def cycle(steps, waits):
+        t0 = time.monotonic()
+        for budget, effect, latency in steps:
+            if waits is None or effect is None:
+                time.sleep(budget * scale)
+                continue
+            ready_at = time.monotonic() + rng.uniform(*latency) * scale
+            if effect == "appears":
+                wait_for(lambda: time.monotonic() >= ready_at, budget * scale, poll * scale, stats=waits)
+            else:
+                wait_for(lambda: time.monotonic() < ready_at, budget * scale, poll * scale, gone=True, stats=waits)
+        return (time.monotonic() - t0) / scale
+
+    for name, steps in flows.items():
+        waits = WaitStats()
+        n = max(int(seconds / 2 / (sum(step[0] for step in steps) * scale)), 1)
+        before = sum(cycle(steps, None) for _ in range(n)) / n
+        after = sum(cycle(steps, waits) for _ in range(n)) / n
+        print(f"{name:10s} antes {before:6.2f} s/ciclo, depois {after:6.2f} s/ciclo "
+              f"({n} ciclos, {waits.timeouts} de {waits.waits} esperas esgotadas)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks do auto-fish.")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--seconds", type=float, default=5.0, help="duração de cada medição")
+    args = parser.parse_args()
+    BENCHMARKS[args.name](args.seconds)
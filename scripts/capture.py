@@ -0,0 +1,518 @@
+import contextlib
+import ctypes
+import ctypes.util
+import glob
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class Frame:
+    """
+    Uma captura de tela única mantida em memória, compartilhada por vários detectores.
+
+    A imagem é sempre armazenada em BGR (convenção do OpenCV, a mesma dos templates lidos com cv2.imread),
+    junto com a origem da região capturada, para que coordenadas absolutas da tela possam ser convertidas
+    em índices da imagem. Quadros vindos da CaptureThread trazem também o instante da captura
+    (time.monotonic) e o número de sequência.
+    """
+
+    def __init__(self, image, left=0, top=0, timestamp=None, seq=None):
+        self.image = image
+        self.left = left
+        self.top = top
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.seq = seq
+        self.haystack = None  # níveis (cinza, escalas reduzidas) do quadro inteiro, criados sob demanda
+
+    @property
+    def age(self):
+        """
+        Idade do quadro, em segundos.
+        """
+        return time.monotonic() - self.timestamp
+
+    @property
+    def width(self):
+        return self.image.shape[1]
+
+    @property
+    def height(self):
+        return self.image.shape[0]
+
+    def crop(self, region=None):
+        """
+        Retorna uma visão (sem cópia) da região pedida, recortada aos limites do quadro.
+
+        Args:
+            region (tuple, opcional): Região absoluta (x, y, largura, altura). Se None, retorna o quadro inteiro.
+
+        Returns:
+            tuple: (imagem, left, top), onde left/top são as coordenadas absolutas do canto da visão.
+        """
+        if region is None:
+            return self.image, self.left, self.top
+        x1 = max(int(region[0]) - self.left, 0)
+        y1 = max(int(region[1]) - self.top, 0)
+        x2 = min(int(region[0] + region[2]) - self.left, self.width)
+        y2 = min(int(region[1] + region[3]) - self.top, self.height)
+        return self.image[y1:max(y1, y2), x1:max(x1, x2)], self.left + x1, self.top + y1
+
+    def pixel(self, x, y):
+        """
+        Retorna a cor RGB do pixel na coordenada absoluta (x, y).
+        """
+        return self.image[int(y) - self.top, int(x) - self.left, 2::-1]
+
+    def pixel_match_color(self, x, y, expected_RGB_color, tolerance=0):
+        """
+        Equivalente em memória de pixel_match_color: compara o pixel (x, y) do quadro com a cor esperada.
+        """
+        pix = self.pixel(x, y).astype(np.int16)
+        return bool((np.abs(pix - np.array(expected_RGB_color)) <= tolerance).all())
+
+
+def to_bgr(image, rgb_image=True):
+    """
+    Converte uma captura (PIL ou numpy) em um array BGR contíguo de 3 canais.
+
+    Args:
+        image: Imagem retornada pela função de captura da plataforma.
+        rgb_image (bool, opcional): True se a captura estiver em RGB (Pillow), False se já estiver em BGR (OpenCV).
+    """
+    im_array = np.asarray(image)[:, :, :3]
+    if rgb_image:
+        im_array = im_array[:, :, ::-1]
+    return np.ascontiguousarray(im_array)
+
+
+class RowSampler:
+    """
+    Lê repetidamente uma mesma região estreita da tela (ex.: a barra do mini-jogo) para um buffer pré-alocado.
+
+    Nenhum arquivo é gravado: a captura é feita em memória e copiada para o mesmo array RGB a cada leitura.
+    O array retornado por read() é reutilizado na leitura seguinte, então não deve ser guardado entre chamadas.
+    """
+
+    def __init__(self, region, grab, rgb_image=True):
+        """
+        Args:
+            region (tuple): Região da tela (x, y, largura, altura).
+            grab (callable): Função de captura em memória que recebe a região e retorna a imagem.
+            rgb_image (bool, opcional): True se grab retornar RGB (Pillow), False se retornar BGR (OpenCV).
+        """
+        self.region = tuple(int(v) for v in region)
+        self.grab = grab
+        self.rgb_image = rgb_image
+        self.buffer = np.empty((self.region[3], self.region[2], 3), dtype=np.uint8)
+
+    def read(self, image=None):
+        """
+        Captura a região e a copia para o buffer.
+
+        Args:
+            image (numpy.ndarray, opcional): Recorte já capturado da região (na convenção de cores de grab);
+                se informado, nenhuma captura nova é feita.
+
+        Returns:
+            numpy.ndarray: O buffer (altura, largura, 3) em RGB.
+        """
+        if image is None:
+            image = self.grab(self.region)
+        image = np.asarray(image)[:self.buffer.shape[0], :self.buffer.shape[1], :3]
+        np.copyto(self.buffer, image if self.rgb_image else image[:, :, ::-1])
+        return self.buffer
+
+
+class FrameSource:
+    """
+    Interface comum das fontes de quadros usadas por screenshot/locate_on_screen.
+
+    grab() retorna a imagem em BGR (convenção do OpenCV). Sempre que possível o retorno é uma visão de um buffer
+    interno reutilizado, sem cópia nem arquivo; quem precisar guardar o quadro deve copiá-lo.
+    """
+
+    def grab(self, region=None):
+        """
+        Args:
+            region (tuple, opcional): Região (x, y, largura, altura). Se None, retorna o quadro inteiro.
+
+        Returns:
+            numpy.ndarray: Imagem (altura, largura, 3) em BGR.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def crop_region(image, region):
+    """
+    Recorta (como visão) uma região absoluta de uma imagem cuja origem é (0, 0).
+    """
+    if region is None:
+        return image
+    x, y, w, h = (int(v) for v in region)
+    return image[max(y, 0):max(y + h, 0), max(x, 0):max(x + w, 0)]
+
+
+class ScreenshotSource(FrameSource):
+    """
+    Fonte baseada na função de captura da plataforma (pyautogui no Windows, locate_im no macOS).
+    """
+
+    def __init__(self, grab_function, rgb_image=True):
+        self.grab_function = grab_function
+        self.rgb_image = rgb_image
+
+    def grab(self, region=None):
+        return to_bgr(self.grab_function(region=region), self.rgb_image)
+
+
+class XImage(ctypes.Structure):
+    # Apenas o início da struct XImage do Xlib; os campos seguintes não são usados
+    _fields_ = [("width", ctypes.c_int), ("height", ctypes.c_int), ("xoffset", ctypes.c_int),
+                ("format", ctypes.c_int), ("data", ctypes.c_void_p), ("byte_order", ctypes.c_int),
+                ("bitmap_unit", ctypes.c_int), ("bitmap_bit_order", ctypes.c_int), ("bitmap_pad", ctypes.c_int),
+                ("depth", ctypes.c_int), ("bytes_per_line", ctypes.c_int), ("bits_per_pixel", ctypes.c_int)]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int),
+                ("shmaddr", ctypes.c_void_p), ("readOnly", ctypes.c_int)]
+
+
+class XShmSource(FrameSource):
+    """
+    Captura persistente da tela X11 pela extensão MIT-SHM (funciona sob Xvfb no Linux).
+
+    Um único segmento de memória compartilhada do tamanho da tela é criado na abertura e reaproveitado em todas
+    as capturas: cada grab() pede ao servidor X que copie a tela para esse segmento e retorna uma visão numpy dele.
+    """
+
+    ZPIXMAP = 2
+    IPC_PRIVATE = 0
+    IPC_CREAT = 0o1000
+    IPC_RMID = 0
+    ALL_PLANES = 0xFFFFFFFF
+
+    def __init__(self, display_name=None):
+        x11 = ctypes.CDLL(ctypes.util.find_library("X11"))
+        xext = ctypes.CDLL(ctypes.util.find_library("Xext"))
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        for name in ("XDefaultScreen", "XDisplayWidth", "XDisplayHeight", "XDefaultDepth"):
+            getattr(x11, name).restype = ctypes.c_int
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        for name in ("XDisplayWidth", "XDisplayHeight", "XDefaultDepth"):
+            getattr(x11, name).argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XRootWindow.restype = ctypes.c_ulong
+        x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XFree.argtypes = [ctypes.c_void_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+        xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                         ctypes.c_char_p, ctypes.POINTER(XShmSegmentInfo),
+                                         ctypes.c_uint, ctypes.c_uint]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XImage),
+                                      ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+        self.x11, self.xext, self.libc = x11, xext, libc
+
+        self.display = x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            raise RuntimeError("Não foi possível abrir o display X11 (DISPLAY definido? Xvfb em execução?).")
+        if not xext.XShmQueryExtension(self.display):
+            x11.XCloseDisplay(self.display)
+            raise RuntimeError("O servidor X11 não suporta a extensão MIT-SHM.")
+        screen = x11.XDefaultScreen(self.display)
+        self.root = x11.XRootWindow(self.display, screen)
+        self.width = x11.XDisplayWidth(self.display, screen)
+        self.height = x11.XDisplayHeight(self.display, screen)
+        depth = x11.XDefaultDepth(self.display, screen)
+
+        self.shminfo = XShmSegmentInfo()
+        self.ximage = xext.XShmCreateImage(self.display, x11.XDefaultVisual(self.display, screen), depth,
+                                           self.ZPIXMAP, None, ctypes.byref(self.shminfo), self.width, self.height)
+        image = self.ximage.contents
+        if image.bits_per_pixel != 32:
+            raise RuntimeError(f"Profundidade de cor não suportada: {image.bits_per_pixel} bits por pixel.")
+        size = image.bytes_per_line * image.height
+        self.shminfo.shmid = libc.shmget(self.IPC_PRIVATE, size, self.IPC_CREAT | 0o600)
+        if self.shminfo.shmid < 0:
+            raise OSError(ctypes.get_errno(), "shmget falhou")
+        self.shminfo.shmaddr = libc.shmat(self.shminfo.shmid, None, 0)
+        self.shminfo.readOnly = 0
+        image.data = self.shminfo.shmaddr
+        xext.XShmAttach(self.display, ctypes.byref(self.shminfo))
+        x11.XSync(self.display, 0)
+        # O segmento é removido automaticamente quando o último processo se desanexar
+        libc.shmctl(self.shminfo.shmid, self.IPC_RMID, None)
+
+        buffer = (ctypes.c_ubyte * size).from_address(self.shminfo.shmaddr)
+        # ZPixmap de 32 bits little-endian: bytes B, G, R, X
+        self.bgrx = np.ctypeslib.as_array(buffer).reshape(image.height, image.bytes_per_line // 4, 4)
+        self._lock = threading.Lock()  # o Xlib não é seguro entre threads sem XInitThreads
+
+    def grab(self, region=None):
+        with self._lock:
+            self.xext.XShmGetImage(self.display, self.root, self.ximage, 0, 0, self.ALL_PLANES)
+        return crop_region(self.bgrx[:self.height, :self.width, :3], region)
+
+    def close(self):
+        if self.display:
+            self.xext.XShmDetach(self.display, ctypes.byref(self.shminfo))
+            self.libc.shmdt(self.shminfo.shmaddr)
+            self.ximage.contents.data = None
+            self.x11.XFree(self.ximage)
+            self.x11.XCloseDisplay(self.display)
+            self.display = None
+
+
+class ReplaySource(FrameSource):
+    """
+    Reproduz uma sequência de quadros gravados (PNG ou NPZ) como se fossem capturas da tela.
+
+    Todos os quadros são decodificados na abertura; grab() apenas avança o cursor e retorna uma visão do quadro,
+    sem E/S de arquivo por quadro. Aceita um diretório de PNGs (em ordem alfabética), um único PNG ou um .npz
+    (um array 'frames' de forma (N, altura, largura, 3) ou vários arrays, em ordem de nome), sempre em BGR.
+    """
+
+    def __init__(self, path, loop=True):
+        self.path = path
+        self.loop = loop
+        if os.path.isdir(path):
+            self.frames = [cv2.imread(f) for f in sorted(glob.glob(os.path.join(path, "*.png")))]
+        elif path.lower().endswith(".npz"):
+            with np.load(path) as data:
+                if "frames" in data:
+                    self.frames = list(data["frames"])
+                else:
+                    self.frames = [data[key] for key in sorted(data.files)]
+        else:
+            self.frames = [cv2.imread(path)]
+        self.frames = [np.ascontiguousarray(frame[:, :, :3]) for frame in self.frames if frame is not None]
+        if not self.frames:
+            raise FileNotFoundError(f"Nenhum quadro encontrado em {path}.")
+        self.index = -1
+
+    def grab(self, region=None):
+        if self.index + 1 < len(self.frames):
+            self.index += 1
+        elif self.loop:
+            self.index = 0
+        return crop_region(self.frames[self.index], region)
+
+
+class CaptureThread(threading.Thread):
+    """
+    Produtor em segundo plano que captura a tela a uma taxa fixa e mantém sempre o quadro mais recente.
+
+    Cada captura é copiada para um buffer pré-alocado que não é o mais recente nem está emprestado a um
+    leitor, e só então passa a ser o mais recente. Cada quadro recebe o instante da captura (time.monotonic)
+    e um número de sequência. Os consumidores leem o último quadro com latest(), que copia apenas a região
+    pedida, ou com lease(), que empresta o próprio buffer (sem cópia) enquanto o bloco with durar: um
+    buffer emprestado nunca é sobrescrito, e a thread aloca outro se todos estiverem em uso.
+    """
+
+    def __init__(self, source, region=None, fps=30):
+        """
+        Args:
+            source (FrameSource): Fonte das capturas.
+            region (tuple, opcional): Região capturada (x, y, largura, altura). Se None, a tela inteira.
+            fps (float, opcional): Capturas por segundo. Padrão é 30.
+        """
+        super().__init__(daemon=True)
+        self.source = source
+        self.region = region
+        self.period = 1.0 / fps
+        self.left, self.top = (int(region[0]), int(region[1])) if region else (0, 0)
+        self.buffers = []
+        self.leases = []
+        self.timestamps = []
+        self.seqs = []
+        self.latest_index = None
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def _back_buffer(self, image):
+        """
+        Índice de um buffer livre (nem o mais recente nem emprestado), alocando um novo se necessário.
+        """
+        with self._lock:
+            for index, buffer in enumerate(self.buffers):
+                if index != self.latest_index and not self.leases[index] and buffer.shape == image.shape:
+                    return index
+            self.buffers.append(np.empty_like(image))
+            self.leases.append(0)
+            self.timestamps.append(0.0)
+            self.seqs.append(0)
+            return len(self.buffers) - 1
+
+    def run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            timestamp = time.monotonic()
+            image = self.source.grab(self.region)
+            back = self._back_buffer(image)
+            np.copyto(self.buffers[back], image)
+            with self._lock:
+                self.seq += 1
+                self.timestamps[back] = timestamp
+                self.seqs[back] = self.seq
+                self.latest_index = back
+            deadline += self.period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                deadline = time.monotonic()  # atrasado: não tenta recuperar as capturas perdidas
+
+    def _fresh_index(self, max_age):
+        index = self.latest_index
+        if index is None or (max_age is not None and time.monotonic() - self.timestamps[index] > max_age):
+            return None
+        return index
+
+    def latest(self, max_age=None, region=None):
+        """
+        Retorna uma cópia do quadro mais recente (ou só da região pedida), segura para usos demorados.
+
+        Args:
+            max_age (float, opcional): Idade máxima aceita, em segundos. Quadros mais velhos são rejeitados.
+            region (tuple, opcional): Região absoluta (x, y, largura, altura) a copiar. Se None, o quadro inteiro.
+
+        Returns:
+            Frame ou None: O quadro, ou None se ainda não houver captura ou se ela for mais velha que max_age.
+        """
+        with self._lock:
+            index = self._fresh_index(max_age)
+            if index is None:
+                return None
+            # O buffer mais recente nunca é o que está sendo escrito, e não deixa de ser o mais recente
+            # enquanto o lock estiver com o leitor
+            frame = Frame(self.buffers[index], self.left, self.top, self.timestamps[index], self.seqs[index])
+            image, left, top = frame.crop(region)
+            return Frame(image.copy(), left, top, frame.timestamp, frame.seq)
+
+    @contextlib.contextmanager
+    def lease(self, max_age=None):
+        """
+        Empresta o buffer do quadro mais recente, sem cópia, enquanto o bloco with durar.
+
+            with capture_thread.lease(max_age) as frame:
+                ...  # frame é None se não houver quadro novo o bastante
+
+        Args:
+            max_age (float, opcional): Idade máxima aceita, em segundos.
+        """
+        with self._lock:
+            index = self._fresh_index(max_age)
+            if index is not None:
+                self.leases[index] += 1
+                frame = Frame(self.buffers[index], self.left, self.top, self.timestamps[index], self.seqs[index])
+        if index is None:
+            yield None
+            return
+        try:
+            yield frame
+        finally:
+            with self._lock:
+                self.leases[index] -= 1
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def open_frame_source(spec):
+    """
+    Cria uma FrameSource a partir de uma especificação em texto.
+
+    Args:
+        spec (str): "xshm", "xshm:<display>" ou "replay:<caminho>".
+
+    Returns:
+        FrameSource: A fonte de quadros correspondente.
+    """
+    kind, _, argument = spec.partition(":")
+    if kind == "xshm":
+        return XShmSource(argument or None)
+    if kind == "replay":
+        return ReplaySource(argument)
+    raise ValueError(f"Fonte de quadros desconhecida: {spec}")
+
+
+class ChangeGate:
+    """
+    Detector barato de mudança que evita refazer a busca de template quando a região não mudou.
+
+    Cada região é reduzida para uma grade de células de 'cell' pixels (média de cada canal BGR, para que uma
+    mudança só de cor, como o botão de puxar passando de cinza para colorido, também conte); se nenhuma
+    célula variou mais que 'threshold' em relação ao quadro em que o resultado foi calculado, o resultado anterior
+    é reutilizado. A comparação é sempre com o quadro da última busca real, então mudanças lentas acumulam
+    e acabam forçando uma nova busca; depois de 'max_reuse' segundos a busca é refeita de qualquer forma.
+    """
+
+    def __init__(self, cell=16, threshold=10, max_reuse=2.0):
+        self.cell = cell
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.entries = {}
+        self.lookups = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def signature(self, image):
+        """
+        Retorna a assinatura (grade de médias por canal BGR, int16) de uma imagem BGR.
+        """
+        h, w = image.shape[:2]
+        size = (max(w // self.cell, 1), max(h // self.cell, 1))
+        return cv2.resize(np.ascontiguousarray(image), size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def lookup(self, key, image):
+        """
+        Args:
+            key: Identificação da busca (ex.: template, região e confiança).
+            image (numpy.ndarray): Recorte atual da região, em BGR.
+
+        Returns:
+            tuple: (reutilizado, resultado, assinatura). Se reutilizado for False, o chamador deve refazer a busca
+            e chamar store() com a assinatura retornada.
+        """
+        signature = self.signature(image)
+        with self._lock:
+            self.lookups += 1
+            entry = self.entries.get(key)
+            if (entry is not None and entry[0].shape == signature.shape
+                    and time.monotonic() - entry[2] < self.max_reuse
+                    and np.abs(signature - entry[0]).max() <= self.threshold):
+                self.skipped += 1
+                return True, entry[1], signature
+        return False, None, signature
+
+    def store(self, key, signature, result):
+        with self._lock:
+            self.entries[key] = (signature, result, time.monotonic())
+
+    @property
+    def skip_ratio(self):
+        """
+        Fração das consultas em que a busca de template foi evitada.
+        """
+        return self.skipped / self.lookups if self.lookups else 0.0
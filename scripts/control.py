@@ -0,0 +1,182 @@
+import time
+
+import numpy as np
+
+
+class PhaseTimer:
+    """
+    Cronômetro das fases de uma iteração: cada lap(nome) registra o tempo desde a marcação anterior.
+    """
+
+    def __init__(self):
+        self.times = {}
+        self._last = time.perf_counter()
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.times.setdefault(phase, []).append(now - self._last)
+        self._last = now
+
+    def record(self, name, seconds):
+        """
+        Registra uma medida que não é uma fase (ex.: idade do quadro), sem mexer na marcação.
+        """
+        self.times.setdefault(name, []).append(seconds)
+
+
+class ControlLoop:
+    """
+    Executa um passo de controle a uma taxa fixa, com agendamento compensado (sem acumular atraso).
+
+    Cada iteração começa no instante previsto (início + n * período), e não "período depois do fim da
+    anterior", de modo que o tempo gasto pelo passo não altera a taxa. Iterações que passam do seu período
+    são contadas como overruns; se o atraso passar de um período inteiro, o agendamento é reiniciado em vez
+    de executar as iterações perdidas em sequência.
+
+    O passo recebe um PhaseTimer para marcar as suas fases (por exemplo leitura, decisão e entrada), e
+    report() resume p50/p95/p99 de cada fase e do período real.
+    """
+
+    def __init__(self, rate_hz=60):
+        """
+        Args:
+            rate_hz (float, opcional): Taxa alvo, em iterações por segundo. Padrão é 60.
+        """
+        self.rate_hz = rate_hz
+        self.period = 1 / rate_hz
+        self.reset()
+
+    def reset(self):
+        self.timer = PhaseTimer()
+        self.periods = []
+        self.iterations = 0
+        self.overruns = 0
+
+    def run(self, step):
+        """
+        Executa step(timer) a cada período até ele retornar False.
+
+        Returns:
+            int: Número de iterações executadas.
+        """
+        self.reset()
+        next_time = time.perf_counter()
+        last_start = None
+        while True:
+            start = time.perf_counter()
+            if last_start is not None:
+                self.periods.append(start - last_start)
+            last_start = start
+            self.timer.start()
+            keep_going = step(self.timer)
+            self.iterations += 1
+            if not keep_going:
+                return self.iterations
+            next_time += self.period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.overruns += 1
+                if -delay > self.period:
+                    next_time = time.perf_counter()
+
+    def report(self):
+        """
+        Retorna linhas com p50/p95/p99 (ms) de cada fase e do período real, e o número de overruns.
+        """
+        lines = [f"control loop: {self.iterations} iterations at {self.rate_hz:g} Hz, {self.overruns} overruns"]
+        for name, values in list(self.timer.times.items()) + [("period", self.periods)]:
+            if values:
+                p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+                lines.append(f"  {name}: p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms")
+        return lines
+
+
+def wait_for(condition, timeout, poll, gone=False, stats=None):
+    """
+    Espera uma condição em vez de uma pausa fixa: retorna assim que ela for satisfeita.
+
+    A condição é verificada imediatamente, a cada 'poll' segundos e uma última vez no fim do prazo, de modo
+    que o timeout pode ser o valor da pausa fixa substituída: no pior caso a espera dura o mesmo que antes.
+
+    Args:
+        condition (callable): Função sem argumentos cujo retorno verdadeiro encerra a espera.
+        timeout (float): Tempo máximo de espera, em segundos.
+        poll (float): Intervalo entre verificações, em segundos.
+        gone (bool, opcional): Se True, espera a condição deixar de ser verdadeira. Padrão é False.
+        stats (WaitStats, opcional): Onde registrar o tempo esperado e o timeout.
+
+    Returns:
+        O retorno da condição (True quando gone=True), ou None se o tempo esgotar.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while True:
+        result = condition()
+        if gone:
+            result = None if result else True
+        now = time.monotonic()
+        if result or now >= deadline:
+            if stats is not None:
+                stats.observe(now - start, timeout, bool(result))
+            return result or None
+        time.sleep(min(poll, deadline - now))
+
+
+class WaitStats:
+    """
+    Contabiliza as esperas por condição (wait_until): o tempo realmente esperado e o tempo que as pausas fixas
+    que elas substituem teriam custado (o timeout de cada espera).
+    """
+
+    def __init__(self):
+        self.waits = 0
+        self.timeouts = 0
+        self.waited = 0.0
+        self.budget = 0.0
+
+    def observe(self, waited, budget, satisfied):
+        self.waits += 1
+        self.timeouts += not satisfied
+        self.waited += waited
+        self.budget += budget
+
+    def summary(self):
+        return (f"wait_until: {self.waits} waits ({self.timeouts} timed out), {self.waited:.1f} s waited "
+                f"instead of {self.budget:.1f} s of fixed sleeps")
+
+
+class ReactionStats:
+    """
+    Tempo entre um prompt aparecer na tela e a reação a ele (por exemplo, do botão de puxar ao primeiro clique).
+
+    O instante exato em que o prompt apareceu não é observado: ele está entre a última verificação em que o
+    prompt não estava na tela e a primeira em que estava. A latência usa o ponto médio desse intervalo; o
+    pior caso usa o seu início.
+    """
+
+    def __init__(self, name="reaction"):
+        self.name = name
+        self.latencies = []
+        self.worst = []
+
+    def observe(self, last_absent, first_seen, reacted):
+        """
+        Args:
+            last_absent (float): Instante (time.time()) da última verificação sem o prompt.
+            first_seen (float): Instante da primeira verificação com o prompt.
+            reacted (float): Instante da reação.
+        """
+        self.latencies.append(reacted - (last_absent + first_seen) / 2)
+        self.worst.append(reacted - last_absent)
+
+    def summary(self):
+        if not self.latencies:
+            return f"{self.name}: no samples"
+        p50, p95 = np.percentile(np.array(self.latencies) * 1000, [50, 95])
+        return (f"{self.name}: {len(self.latencies)} samples, p50 {p50:.0f} ms, p95 {p95:.0f} ms, "
+                f"worst case {max(self.worst) * 1000:.0f} ms")
@@ -4,124 +4,244 @@ from util import *
 # Remove capturas de tela temporárias antes de iniciar
 clear_temp_screenshots()
 
+# Laço do minigame a taxa fixa, com estatísticas de leitura, decisão, entrada e idade do quadro por pesca
+pull_loop = ControlLoop(PULL_LOOP_HZ)
 
-def pull(box):
+# Máquina de estados da pesca: os estados na ordem de prioridade da varredura completa e, para cada status,
+# os estados esperados em seguida (do mais para o menos provável), usados antes de haver transições observadas
+# (os pop-ups de interrupção são detectados pela thread de interrupções e fechados em wait_interrupts)
+FISHING_STATES = [PULLING, READY, WAITING, STANDBY, PICK]
+# Estados que não podem ficar escondidos por um estado mais provável na mesma tela (o minigame ainda mostra o
+# botão de espera; o botão pronto é a mordida): sempre verificados primeiro
+FISHING_CRITICAL_STATES = [PULLING, READY]
+FISHING_TRANSITIONS = {
+    '':                 (STANDBY, WAITING, READY, PULLING),
+    STANDBY:            (STANDBY, WAITING, PICK),
+    WAITING:            (WAITING, READY),
+    READY:              (PULLING, READY, WAITING),
+    BONUS_NOT_REACHED:  (READY, WAITING),
+    PULLING:            (PULLING, WAITING, READY, STANDBY),
+    PICK:               (PICK, STANDBY, WAITING),
+    INTERRUPTED_LAIR:   (STANDBY, WAITING, READY),
+    INTERRUPTED_PARTY:  (STANDBY, WAITING, READY),
+    INTERRUPTED_RAID:   (STANDBY, WAITING, READY),
+}
+STATUS_LOG_MESSAGES = {
+    PULLING:            "puxando peixe, verifique levou {:.2f} seconds.",
+    STANDBY:            "standby, check took {:.2f} seconds.",
+    PICK:               "escolha um item, check took {:.2f} seconds.",
+}
+state_prober = StateProber(FISHING_STATES, FISHING_TRANSITIONS, STATE_FULL_SWEEP_EVERY, FISHING_CRITICAL_STATES)
+# Do botão de puxar aparecer na tela ao primeiro clique
+ready_reaction = ReactionStats("READY to click")
+
+
+def pull(box, timer=None, last_seq=None):
     """
     Verifica a presença da cor verde na barra e pressiona espaço se não estiver verde.
+
+    A linha da barra vem do quadro mais recente da thread de captura; se for o mesmo quadro já analisado
+    (last_seq), nada é feito. Se um PhaseTimer for informado, marca as fases de leitura, decisão e entrada,
+    e registra em "frame age" a idade do quadro no momento da decisão.
+
+    Returns:
+        tuple: (porcentagem de verde se espaço foi pressionado, senão None; número de sequência do quadro).
     """
+    x0, y0 = window_origin()
     # Coordenadas da região da barra (ajuste conforme necessário)
     bar_region = (x0 + 560, y0 + 160, 806, 2)
     
-    # Captura a região da barra EM CORES (não escala de cinza)
-    im_bar = screenshot(os.path.join(TEMP_DIR, "temp.png"), region=bar_region)
+    # Lê a região da barra EM CORES (não escala de cinza), em memória e sem arquivo temporário
+    im_bar, t_capture, seq = sample_row(bar_region)
+    if seq is not None and seq == last_seq:
+        return None, seq
+    if timer:
+        timer.lap("read")
     
     # Define a cor verde desejada (RGB) e tolerância (ajuste conforme seu jogo)
     target_green = [111, 44, 35] 
     tolerance = 20  # Margem para variação de cor
     
-    # Converte a imagem para array numpy e verifica pixels verdes
-    im_array = np.array(im_bar)
-    green_pixels = np.abs(im_array[:, :, :3] - target_green) < tolerance
-    green_percentage = np.mean(green_pixels.all(axis=2)) * 100  # % de pixels verdes
+    # Cobertura de verde da barra (mesma análise vetorizada usada para o marcador)
+    green_percentage = analyze_bar(im_bar, green_rgb=target_green, green_tolerance=tolerance).green * 100
+    if timer:
+        timer.lap("decision")
+        timer.record("frame age", time.monotonic() - t_capture)
     # Lógica de ação
     if green_percentage > 1:  # Se menos de % da barra estiver verde
         click_box(box)
-        print(f"Barra fora do verde ({green_percentage:.1f}% verde). Espaço pressionado.")
-        return green_percentage
+        result = green_percentage
     else:
-        print(f"Barra estável ({green_percentage:.1f}% verde).")
+        result = None
+    if timer:
+        timer.lap("input")
+    return result, seq
+
+
+def play_minigame(box):
+    """
+    Chama pull() a uma taxa fixa (PULL_LOOP_HZ) até a barra sumir (MAX_TIMEOUT sem leitura válida) ou até
+    MAX_FISHING_TIME, e registra no log as estatísticas de tempo do laço ao fim de cada pesca.
+
+    Iterações em que a thread de captura ainda não trouxe um quadro novo não fazem nada (e são contadas).
+    O log registra só as mudanças da barra (entrou ou saiu do verde), e não cada iteração.
+
+    Returns:
+        bool: True se a pesca foi bem-sucedida: a barra apareceu e o minigame terminou porque ela sumiu, e não
+        pelo tempo máximo (mesmo critério do play_minigame do aa.py).
+    """
+    # Os cliques do minigame têm prioridade sobre qualquer rajada de teclas ainda na fila
+    input_scheduler.cancel(LOW)
+    t = time.time()
+    bar_or_bounds_not_found_time = time.time()
+    last_seq = None
+    out_of_green = None
+    bar_seen = False
+    repeated = 0
+
+    def step(timer):
+        nonlocal bar_or_bounds_not_found_time, last_seq, out_of_green, bar_seen, repeated
+        green_percentage, seq = pull(box, timer, last_seq)
+        if seq is not None and seq == last_seq:
+            repeated += 1
+        else:
+            last_seq = seq
+            if green_percentage:  # Se o puxão foi bem-sucedido, atualiza o tempo
+                bar_or_bounds_not_found_time = time.time()
+                bar_seen = True
+            if bool(green_percentage) != out_of_green:
+                out_of_green = bool(green_percentage)
+                if out_of_green:
+                    log(f"Barra fora do verde ({green_percentage:.1f}% verde). Espaço pressionado.")
+                else:
+                    log("Barra estável.")
+        return time.time() - t < MAX_FISHING_TIME and time.time() - bar_or_bounds_not_found_time < MAX_TIMEOUT
+
+    pull_loop.run(step)
+    for line in pull_loop.report():
+        log(line)
+    log(f"  repeated frames skipped: {repeated}")
+    return bar_seen and time.time() - t < MAX_FISHING_TIME
 
+
+def probe_status(state, prev_status, fish_type="yellow", frame=None, t0=None):
+    """
+    Verifica um único estado da pesca (uma busca de template), registrando no log quando o estado muda.
+
+    Args:
+        state (str): Estado a verificar (um dos FISHING_STATES).
+        prev_status (str): Status anterior, utilizado para evitar logs repetitivos.
+        fish_type (str, opcional): Tipo de peixe ("yellow", "white", "blue"). Padrão é "yellow".
+        frame (Frame, opcional): Quadro já capturado. Se None, a região é capturada diretamente.
+        t0 (float, opcional): Início da verificação (time.time()), para os tempos do log.
+
+    Returns:
+        tuple ou None: (status, box) se o estado foi encontrado (READY pode resultar em BONUS_NOT_REACHED),
+        ou None caso contrário.
+    """
+    x0, y0 = window_origin()
+    t0 = t0 or time.time()
+    if state == READY:
+        box = check(READY, confidence=0.99, frame=frame)
+        if not box:
+            return None
+        # Certifique-se de que todos os valores são inteiros
+        region_tuple = Box(int(box.left), int(box.top), int(box.width), int(box.height))
+        is_gray = image_is_gray(region_tuple, frame=frame)
+        if sys.platform != "darwin" and is_gray:
+            return None
+        if prev_status not in [WAITING, BONUS_NOT_REACHED]:
+            log(f"pescar, check took {time.time() - t0:.2f} seconds.")
+        fish_type_coords = (x0 + FISH_TYPE_X_COORD[fish_type], y0 + FISH_TYPE_Y_COORD)
+        if frame is None:
+            fish_type_matched = pixel_match_color(*fish_type_coords, FISH_TYPE_COLOR, FISH_TYPE_X_COORD_TOLERANCE)
+        else:
+            fish_type_matched = frame.pixel_match_color(*fish_type_coords, FISH_TYPE_COLOR, FISH_TYPE_X_COORD_TOLERANCE)
+        if fish_type_matched or fish_type == "white":
+            if prev_status != READY:
+                log(f"pronto para pescar {time.time() - t0:.2f} seconds.")
+            return READY, box
+        if prev_status not in [WAITING, BONUS_NOT_REACHED]:
+            log(f"bônus não chegou amarelo, check took {time.time() - t0:.2f} segundos.")
+        return BONUS_NOT_REACHED, box
+    if state == WAITING:
+        box = check(WAITING, confidence=0.99, frame=frame)
+        if not box:
+            return None
+        # Certifique-se de que todos os valores são inteiros
+        region_tuple = Box(int(box.left), int(box.top), int(box.width), int(box.height))
+        if sys.platform != "darwin" and not image_is_gray(region_tuple, frame=frame):
+            return None
+        if prev_status not in [WAITING, BONUS_NOT_REACHED]:
+            log(f"waiting for fish, check took {time.time() - t0:.2f} seconds.")
+        return WAITING, box
+    box = check(state, frame=frame)
+    if not box:
         return None
+    if prev_status != state:
+        log(STATUS_LOG_MESSAGES[state].format(time.time() - t0))
+    return state, box
 
 
-def check_status(prev_status, fish_type="yellow"):
+def check_status(prev_status, fish_type="yellow", frame=None):
     """
     Verifica o status atual da pesca, comparando as imagens da tela com referências conhecidas.
     
-    A função checa, na ordem, por interrupções (lair, party, raid), pela ação de puxar,
-    pelo estado pronto para pescar, esperando o peixe morder ou em standby, registrando
-    os tempos de execução para log.
+    Os estados são verificados na ordem dada por state_prober a partir do status anterior, parando no
+    primeiro encontrado: primeiro puxando e pronto (FISHING_CRITICAL_STATES), que têm prioridade sobre
+    qualquer outro estado visível ao mesmo tempo, depois os estados seguintes mais prováveis (pelas
+    transições já observadas e por FISHING_TRANSITIONS). Periodicamente é feita uma varredura completa na
+    ordem de prioridade original (puxando, pronto, esperando, standby e coleta). Os pop-ups de interrupção
+    não são verificados aqui: a thread de interrupções (watching_interrupts) os detecta, e fish() os
+    fecha com wait_interrupts().
+
+    Com SINGLE_CAPTURE_PER_TICK ativo, a tela é capturada uma única vez e todos os detectores,
+    o teste de cinza e a cor do tipo de peixe são avaliados sobre esse mesmo quadro.
     
     Args:
-        prev_status (str): Status anterior, utilizado para evitar logs repetitivos.
+        prev_status (str): Status anterior, utilizado para ordenar as verificações e evitar logs repetitivos.
         fish_type (str, opcional): Tipo de peixe ("yellow", "white", "blue"). Padrão é "yellow".
+        frame (Frame, opcional): Quadro já capturado. Se None e SINGLE_CAPTURE_PER_TICK estiver ativo, captura um novo.
     
     Returns:
         tuple: (status, box), onde status é uma string representando o estado atual e box é a área (Box) detectada.
     """
     t0 = time.time()
-    box = check(INTERRUPTED_LAIR)
-    
-    if box:
-        if prev_status != INTERRUPTED_LAIR:
-            log(f"interrompido por covil, cheque levou {time.time() - t0:.2f} seconds.")
-        return INTERRUPTED_LAIR, box
-    box = check(INTERRUPTED_PARTY)
-    if box:
-        if prev_status != INTERRUPTED_PARTY:
-            log(f"interrompido pela festa, cheque levou {time.time() - t0:.2f} seconds.")
-        return INTERRUPTED_PARTY, box
-    if sys.platform == "win32":
-        box = check(INTERRUPTED_RAID)
-        if box:
-            if prev_status != INTERRUPTED_RAID:
-                log(f"interrompido por ataque, cheque levou {time.time() - t0:.2f} seconds.")
-            return INTERRUPTED_RAID, box
-    box = check(PULLING)
-    if box:
-        if prev_status != PULLING:
-            log(f"puxando peixe, verifique levou {time.time() - t0:.2f} seconds.")
-        return PULLING, box
-    box = check(READY, confidence=0.99)
-    if box:
-        # Certifique-se de que todos os valores são inteiros
-        region_tuple = (int(box.left), int(box.top), int(box.width), int(box.height))
-        try:
-            img = screenshot(region=region_tuple)
-            is_gray = image_is_gray(img)
-            if sys.platform == "darwin" or not is_gray:
-                if prev_status not in [WAITING, BONUS_NOT_REACHED]:
-                    log(f"pescar, check took {time.time() - t0:.2f} seconds.")
-                fish_type_coords = (x0 + FISH_TYPE_X_COORD[fish_type], y0 + FISH_TYPE_Y_COORD)
-                if pixel_match_color(*fish_type_coords, FISH_TYPE_COLOR, FISH_TYPE_X_COORD_TOLERANCE) or fish_type == "white":
-                    if prev_status != READY:
-                        log(f"pronto para pescar {time.time() - t0:.2f} seconds.")
-                    return READY, box
-                if prev_status not in [WAITING, BONUS_NOT_REACHED]:
-                    log(f"bônus não chegou amarelo, check took {time.time() - t0:.2f} segundos.")
-                return BONUS_NOT_REACHED, box
-        except Exception as e:
-            print(f"Erro ao capturar ou analisar a tela: {e}")
-            return None, None
-    box = check(WAITING, confidence=0.99)
-    if box:
+    if frame is None and SINGLE_CAPTURE_PER_TICK:
+        frame = get_frame()
+    probes = 0
+    for state in state_prober.order(prev_status):
+        probes += 1
         try:
-            # Certifique-se de que todos os valores são inteiros
-            region_tuple = (int(box.left), int(box.top), int(box.width), int(box.height))
-            img = screenshot(region=region_tuple)
-            if sys.platform == "darwin" or image_is_gray(img):
-                if prev_status not in [WAITING, BONUS_NOT_REACHED]:
-                    log(f"waiting for fish, check took {time.time() - t0:.2f} seconds.")
-                return WAITING, box
+            result = probe_status(state, prev_status, fish_type, frame, t0)
         except Exception as e:
             print(f"Erro ao capturar ou analisar a tela: {e}")
+            state_prober.observe(prev_status, None, probes)
             return None, None
-    
-    box = check(STANDBY, confidence=0.8)
-    if box:
-        if prev_status != STANDBY:
-            log(f"standby, check took {time.time() - t0:.2f} seconds.")
-        return STANDBY, box
-    
-    box = check(PICK)
-    if box:
-        if prev_status != PICK:
-            log(f"escolha um item, check took {time.time() - t0:.2f} seconds.")
-        return PICK, box
-    
+        if result:
+            state_prober.observe(prev_status, state, probes)
+            return result
+    state_prober.observe(prev_status, None, probes)
     return None, None
 
 
+def poll_interval(status, waiting_time=0.0, since_bonus_missed=float("inf")):
+    """
+    Intervalo até a próxima verificação de fish(), conforme o status (FISH_POLL_INTERVALS).
+
+    Args:
+        status (str): Status da verificação atual.
+        waiting_time (float, opcional): Há quantos segundos a pesca está em WAITING.
+        since_bonus_missed (float, opcional): Segundos desde o último BONUS_NOT_REACHED.
+    """
+    if since_bonus_missed < BONUS_RETRY_DELAY and status in (READY, BONUS_NOT_REACHED):
+        return FISH_POLL_INTERVALS.get(BONUS_NOT_REACHED, FISH_POLL_DEFAULT)
+    if status == WAITING and waiting_time < BITE_WINDOW_START:
+        return FISH_POLL_DEFAULT
+    return FISH_POLL_INTERVALS.get(status, FISH_POLL_DEFAULT)
+
+
+@watching_interrupts()
 def fish(fish_type="yellow", fish_key='5', brightness=50, stop=None):
     """
     Controla o ciclo completo de pesca, integrando a detecção de status e as ações correspondentes.
@@ -157,80 +277,122 @@ def fish(fish_type="yellow", fish_key='5', brightness=50, stop=None):
         
     prev_status = ''
     pickup_attempted = 0
+    pickup_pending = False  # rajada de E da coleta agendada, aguardando para coletar por cor
     last_pickup_time = time.time()
     fishing_attempted = 0
     n_standby_cont = 0
     last_fish_up_time = 0  # Tempo do último evento de peixe levantado sem atingir o bônus amarelo
+    waiting_since = time.time()  # início da espera atual pela mordida
+    last_tick_time = time.time()  # instante da verificação anterior
+    ready_seen = None  # (última verificação sem o botão de puxar, primeira com ele)
+    catches = 0
+    t_start = time.time()
     activate_diablo()
-    while fishing_attempted < 30 and n_standby_cont < 3:
-        if stop():
-            return False
-        status, box = check_status(prev_status, fish_type)
-        if not status:
-            continue
-        if status == PULLING:
-            t = time.time()
-            bar_or_bounds_not_found_time = time.time()
-            while time.time() - t < MAX_FISHING_TIME and time.time() - bar_or_bounds_not_found_time < MAX_TIMEOUT:
-                if pull(brightness):  # Se o puxão foi bem-sucedido, atualiza o tempo\n
-                    bar_or_bounds_not_found_time = time.time()
-            continue
-        if status in [INTERRUPTED_PARTY, INTERRUPTED_LAIR, INTERRUPTED_RAID]:
-            activate_diablo()
-            click_box(box)
-        elif status == PICK:
-            activate_diablo()
-            click_box(box)
-        elif status == STANDBY:
-            activate_diablo()
-            time.sleep(1)
-            if sys.platform == "darwin":
+    start_capture()
+    try:
+        watcher = start_interrupt_watcher()
+        while fishing_attempted < 30 and n_standby_cont < 3:
+            if stop():
+                return False
+            interrupted = wait_interrupts()
+            if interrupted:
+                log(f"interrupted by pop-up ({interrupted}), dismissed")
+                prev_status = interrupted
+                continue
+            t_tick = time.time()
+            status, box = check_status(prev_status, fish_type)
+            if status == READY and ready_seen is None and t_tick - last_fish_up_time > BONUS_RETRY_DELAY:
+                ready_seen = (last_tick_time, t_tick)
+            elif status != READY:
+                ready_seen = None
+            last_tick_time = t_tick
+            if not status:
+                p.sleep(poll_interval(None))
+                continue
+            if status == PULLING:
+                # O minigame clica no botão de puxar (o último READY visto), e não no rótulo de PULLING
+                pull_box = boxes.get(READY) or check(READY)
+                if pull_box:
+                    catches += play_minigame(pull_box)
+                else:
+                    log("pull button not located yet, waiting for READY")
+                    p.sleep(poll_interval(status))
+                continue
+            if status == PICK:
+                activate_diablo()
                 click_box(box)
-            else:
-                # Para Windows, simula o lançamento da vara de pesca\n
-                cast_fishing_rod(fish_key, box)
-                p.moveTo(box.left, box.top)
-                if fishing_attempted == 0:
-                    p.sleep(0.5)
-                    for _ in range(10):
-                        DIKeys.press(hexKeyMap.DIK_E, 0.01)
-                        p.sleep(round(0.05 + random.random() * 0.1, 1))
-            fishing_attempted += 1
-            if time.time() - last_pickup_time > 600:
-                pickup_attempted = 0
-            if prev_status == STANDBY:
-                n_standby_cont += 1
-            else:
-                n_standby_cont = 1
-            p.sleep(1)
-            log(f"número de tentativas de pesca: {fishing_attempted}")
-        elif status == READY and time.time() - last_fish_up_time > 10:
-            activate_diablo()
-            p.sleep(0.1)
-            click_box(box)
-            p.sleep(0.1)
-            status = PULLING
-            t = time.time()
-            bar_or_bounds_not_found_time = time.time()
-            while time.time() - t < MAX_FISHING_TIME and time.time() - bar_or_bounds_not_found_time < MAX_TIMEOUT:
-                if pull(box):  # Se o puxão foi bem-sucedido\n
-                    bar_or_bounds_not_found_time = time.time()
-            if sys.platform == "win32":
-                p.moveTo(find_npc() or (960, 540))
-        elif status == BONUS_NOT_REACHED:
-            last_fish_up_time = time.time()
-        elif status == WAITING and sys.platform == "win32" and pickup_attempted < PICKUP_LIMIT:
-            log("pick up items...")
-            last_pickup_time = time.time()
-            for _ in range(15):
-                DIKeys.press(hexKeyMap.DIK_E, 0.01)
-                p.sleep(round(0.05 + random.random() * 0.1, 1))
-            if pickup_win32(pickup_attempted):
-                pickup_attempted += 1
-            else:
-                pickup_attempted = PICKUP_LIMIT
-        prev_status = status
-        p.sleep(1)
+            elif status == STANDBY:
+                activate_diablo()
+                time.sleep(1)
+                if sys.platform == "darwin":
+                    click_box(box)
+                else:
+                    # Para Windows, simula o lançamento da vara de pesca\n
+                    cast_fishing_rod(fish_key, box)
+                    input_backend.move(box.left, box.top)
+                    if fishing_attempted == 0:
+                        input_scheduler.burst(hexKeyMap.DIK_E, 10, delay=0.5)
+                fishing_attempted += 1
+                if time.time() - last_pickup_time > 600:
+                    pickup_attempted = 0
+                if prev_status == STANDBY:
+                    n_standby_cont += 1
+                else:
+                    n_standby_cont = 1
+                p.sleep(1)
+                log(f"número de tentativas de pesca: {fishing_attempted}")
+            elif status == READY and time.time() - last_fish_up_time > BONUS_RETRY_DELAY:
+                activate_diablo()
+                # O peixe mordeu: descarta o que sobrou das rajadas de E antes de puxar
+                input_scheduler.cancel(LOW)
+                boxes[READY] = box
+                p.sleep(0.1)
+                click_box(box)
+                if ready_seen:
+                    ready_reaction.observe(*ready_seen, time.time())
+                    ready_seen = None
+                p.sleep(0.1)
+                status = PULLING
+                catches += play_minigame(box)
+                if sys.platform == "win32":
+                    input_backend.move(*(find_npc() or (960, 540)))
+            elif status == BONUS_NOT_REACHED:
+                last_fish_up_time = time.time()
+            elif status == WAITING and sys.platform == "win32" and pickup_attempted < PICKUP_LIMIT:
+                if not pickup_pending:
+                    log("pick up items...")
+                    last_pickup_time = time.time()
+                    # A rajada de E roda em segundo plano; a coleta por cor fica para quando ela terminar
+                    input_scheduler.burst(hexKeyMap.DIK_E, 15)
+                    pickup_pending = True
+                elif input_scheduler.idle():
+                    pickup_pending = False
+                    if pickup_win32(pickup_attempted):
+                        pickup_attempted += 1
+                    else:
+                        pickup_attempted = PICKUP_LIMIT
+            if status != WAITING:
+                pickup_pending = False
+            elif prev_status != WAITING:
+                waiting_since = time.time()
+            prev_status = status
+            p.sleep(poll_interval(status, time.time() - waiting_since, time.time() - last_fish_up_time))
+    finally:
+        # A captura em tela cheia a 30 fps só é necessária durante a pesca
+        stop_capture()
+    for line in templates.report(only_used=True):
+        log(line)
+    log(f"change gating skipped {change_gate.skip_ratio:.0%} of {change_gate.lookups} template checks")
+    log(pickup_stats.summary())
+    for tracker in npc_trackers.values():
+        log(tracker.summary())
+    log(ocr_service.summary())
+    log(input_scheduler.summary())
+    log(state_prober.summary())
+    log(watcher.summary())
+    log(ready_reaction.summary())
+    elapsed = time.time() - t_start
+    log(f"{catches} catches in {elapsed / 60:.1f} min ({catches / elapsed * 3600:.0f}/h)")
     return True
 
 
@@ -239,12 +401,8 @@ def check_npc_or_fish():
     Verifica a presença de NPCs ou a disponibilidade de peixes na tela.
     
     Returns:
-        tuple: (status, box), onde status pode ser INTERRUPTED_PARTY, TALK, STANDBY ou PICK, e box é a área (Box) detectada.
+        tuple: (status, box), onde status pode ser TALK, STANDBY ou PICK, e box é a área (Box) detectada.
     """
-    box = check(INTERRUPTED_PARTY)
-    if box:
-        return INTERRUPTED_PARTY, box
-
     box = check(TALK)
     if box:
         return TALK, box
@@ -271,11 +429,12 @@ def walk(key, duration=0.1):
     """
     activate_diablo()
     p.sleep(0.3)
-    p.keyDown(key)
+    input_backend.key_down(key)
     p.sleep(duration)
-    p.keyUp(key)
+    input_backend.key_up(key)
 
 
+@watching_interrupts()
 def trade_fish_buy_bait_go_back(key_to_npc, key_to_fish):
     """
     Executa a sequência de troca de peixes, compra de iscas e retorno à pesca.
@@ -294,12 +453,10 @@ def trade_fish_buy_bait_go_back(key_to_npc, key_to_fish):
     stage = "trade"
     while True:
         log(stage)
+        wait_interrupts()
         status, box = check_npc_or_fish()
 
-        if status == INTERRUPTED_PARTY:
-            activate_diablo()
-            click_box(box)
-        elif status == TALK and stage == "trade":
+        if status == TALK and stage == "trade":
             trade_fish()
             stage = "buy"
             p.sleep(1)
@@ -313,7 +470,7 @@ def trade_fish_buy_bait_go_back(key_to_npc, key_to_fish):
         elif status == PICK:
             activate_diablo()
             p.sleep(0.1)
-            p.press('space')
+            input_backend.press('space')
         elif stage == "trade":
             walk(key_to_npc)
         elif stage == "buy":
@@ -331,47 +488,50 @@ def trade_fish():
       - Pressionar a barra de espaço.\n
       - Executar cliques em posições pré-definidas para selecionar e confirmar a troca.
     
-    Após a troca, aguarda um tempo para que a operação seja concluída.
+    Após a troca, aguarda a conversa com o NPC voltar a ficar disponível. Os cliques que abrem um diálogo
+    esperam o botão seguinte aparecer, e o de trocar espera o próprio botão sumir (wait_until), com as pausas
+    fixas antigas como tempo máximo; depois de selecionar, cujo efeito não tem um template, a pausa continua fixa.
     """
+    x0, y0 = window_origin()
     log("selling fish to npc...")
-    p.press('space')
-    p.sleep(1)
-    p.click(x0 // 2 + 850, y0 // 2 + 540)
-    p.sleep(0.5)
-    p.click(x0 // 2 + 530, y0 // 2 + 660)
-    p.sleep(0.2)
-    p.click(x0 // 2 + 880, y0 // 2 + 650)
-    p.sleep(0.2)
-    p.click(x0 // 2 + 1010, y0 // 2 + 170)
-    p.sleep(15)
+    input_backend.press('space')
+    wait_until("trade", 1)
+    input_backend.click(x0 // 2 + 850, y0 // 2 + 540)
+    wait_until("select", 0.5)
+    input_backend.click(x0 // 2 + 530, y0 // 2 + 660)
+    p.sleep(0.2)  # o botão de trocar já está na tela antes da seleção
+    input_backend.click(x0 // 2 + 880, y0 // 2 + 650)
+    wait_until("exchange", 0.2, gone=True, confidence=0.95)
+    input_backend.click(x0 // 2 + 1010, y0 // 2 + 170)
+    wait_until(TALK, 15)
 
 
 def buy_bait():
     """
     Realiza a compra de iscas por meio de uma sequência de cliques em posições específicas na tela.
     
-    A função simula cliques com intervalos curtos para assegurar o registro correto da ação.
+    Os cliques que abrem um diálogo esperam o botão seguinte aparecer (wait_until), com as pausas fixas
+    antigas como tempo máximo; os três cliques no 9 mantêm o intervalo de 0.2 s entre si. Os botões de comprar
+    e de fechar já estão na tela antes dos cliques seguintes, então essas pausas continuam fixas.
     """
+    x0, y0 = window_origin()
     log("buying baits...")
-    p.press('space')
-    p.sleep(1)
-    p.click(x0 // 2 + 840, y0 // 2 + 600)
-    p.sleep(1)
-    p.click(x0 // 2 + 890, y0 // 2 + 600)
-    p.sleep(0.2)
-    p.click(x0 // 2 + 960, y0 // 2 + 470)
-    p.sleep(0.2)
-    p.click(x0 // 2 + 960, y0 // 2 + 470)
+    input_backend.press('space')
+    wait_until("shop", 1)
+    input_backend.click(x0 // 2 + 840, y0 // 2 + 600)
+    wait_until("amount", 1)
+    input_backend.click(x0 // 2 + 890, y0 // 2 + 600)
+    wait_until("9", 0.2)
+    input_backend.click(x0 // 2 + 960, y0 // 2 + 470, clicks=3, interval=0.2)
     p.sleep(0.2)
-    p.click(x0 // 2 + 960, y0 // 2 + 470)
+    input_backend.click(x0 // 2 + 900, y0 // 2 + 655)
     p.sleep(0.2)
-    p.click(x0 // 2 + 900, y0 // 2 + 655)
+    input_backend.click(x0 // 2 + 1010, y0 // 2 + 170)
     p.sleep(0.2)
-    p.click(x0 // 2 + 1010, y0 // 2 + 170)
-    p.sleep(0.2)
-    p.click(x0 // 2 + 1010, y0 // 2 + 170)
+    input_backend.click(x0 // 2 + 1010, y0 // 2 + 170)
 
 
+@watching_interrupts()
 def trade_with_gui(attempts_trade=3, attempts_sell=3):
     """
     Gerencia a troca de peixes utilizando a interface gráfica (GUI).
@@ -386,44 +546,40 @@ def trade_with_gui(attempts_trade=3, attempts_sell=3):
         int: 0 se a operação for concluída com sucesso.
     """
     if attempts_trade > 0:
-        p.sleep(1)
         log("selling based on gui")
-        position = find_npc()
+        position = wait_until(find_npc, 1)
         if not position:
             return trade_with_gui(attempts_trade - 1)
-        p.click(position)
+        input_backend.click(*position)
         error = 0
         error += click_image("trade", time.time(), 5)
-        time.sleep(1)
+        # O diálogo de troca está aberto quando o botão de trocar aparece; "select" com confiança 0.30 casaria
+        # com qualquer coisa antes disso
+        wait_until("exchange", 1, confidence=0.95)
         error += click_image("select", time.time(), 3, confidence=0.30)
         error += click_image("exchange", time.time(), 3, confidence=0.97)
-        p.sleep(1)
+        wait_until("exchange", 1, gone=True, confidence=0.95)
         if error > 0:
-            p.click(window.center)
+            input_backend.click(*window.center)
             p.sleep(0.3)
-            p.click(window.center)
+            input_backend.click(*window.center)
             p.sleep(0.3)
             click_image("x", time.time(), 1)
-            p.sleep(0.5)
-            p.click(window.center)
+            wait_until("x", 0.5, gone=True)
+            input_backend.click(*window.center)
             p.sleep(1)
             return trade_with_gui(attempts_trade - 1)
         else:
             return trade_with_gui(0)
     elif attempts_sell > 0:
-        p.sleep(3)
+        wait_until("x", 3, gone=True)
         log("comprando iscas...")
-        while True:
-            for status in [INTERRUPTED_LAIR, INTERRUPTED_PARTY, INTERRUPTED_RAID]:
-                box = check(status)
-                if box:
-                    click_box(box)
-            if not box:
-                break
+        # Fecha um pop-up sinalizado pela thread de interrupções antes de procurar o NPC
+        wait_interrupts()
         position = find_npc()
         if not position:
             return trade_with_gui(0, attempts_sell - 1)
-        p.click(position)
+        input_backend.click(*position)
         error = 0
         error += click_image("shop", time.time(), 3)
         error += click_image("amount", time.time(), 3, offset=(0.2, 0.7, -0.2, -0.1))
@@ -432,7 +588,7 @@ def trade_with_gui(attempts_trade=3, attempts_sell=3):
         error += click_image("x", time.time(), 3)
         if error > 0:
             return trade_with_gui(0, attempts_sell - 1)
-        p.sleep(1)
+        wait_until("x", 1, gone=True)
     return 0
 
 
@@ -451,43 +607,30 @@ def pickup_win32(attempted=0, pickup_blue=True, legendary_alarm=False):
     Returns:
         bool: True se a coleta foi realizada com sucesso, False se nenhum item for detectado.
     """
-    blue_rgb = np.array([89, 96, 241])
-    yellow_rgb = np.array([233, 231, 77])
-    orange_rgb = np.array([243, 143, 36])
-    color_threshold = 5
-    min_y_offset = 30
-    max_y_offset = 150
-    click_span = 120
-    click_flex = 30
     region = (400, 240, 1120, 600)  # (x, y, largura, altura)
-    im = screenshot(os.path.join(TEMP_DIR, "items_check.png"), region=region)
-    if pickup_blue:
-        pts = np.argwhere((np.abs(np.array(im)[:, :, :3] - blue_rgb) <= color_threshold).all(axis=2) |
-                          (np.abs(np.array(im)[:, :, :3] - yellow_rgb) <= color_threshold).all(axis=2) |
-                          (np.abs(np.array(im)[:, :, :3] - orange_rgb) <= color_threshold).all(axis=2))
-    else:
-        pts = np.argwhere((np.abs(np.array(im)[:, :, :3] - yellow_rgb) <= color_threshold).all(axis=2) |
-                          (np.abs(np.array(im)[:, :, :3] - blue_rgb) <= color_threshold).all(axis=2))
-    if pts.shape[0] == 0:
+    # Uma única passada classifica azul, amarelo e laranja; a verificação de lendários reutiliza os mesmos blobs
+    blobs = loot_labeller.blobs(*get_frame(region).crop(region))
+    colors = ("blue", "yellow", "orange") if pickup_blue else ("yellow", "blue")
+    # As letras de cada nome viram um único item; pixels soltos da mesma cor são descartados
+    items = merge_blobs([blob for color in colors for blob in blobs[color]])
+    pickup_stats.observe(len(items))
+    if not items:
         return False
-    top_left = pts.min(axis=0)  # Determina o canto superior esquerdo da região dos itens\n
-    height_width = pts.max(axis=0) - top_left
-    click_region = (region[0] + top_left[1], region[1] + top_left[0] + min_y_offset,
-                    height_width[1], height_width[0] + max_y_offset - min_y_offset)
-    for j in range(0, click_region[3] // click_span + 1):
-        y = int(click_region[1] + click_span * (j + 0.5) + (random.random() - 0.5) * click_flex)
-        for i in range(0, click_region[2] // click_span + 1):
-            x = int(click_region[0] + click_span * (i + 0.5) + (random.random() - 0.5) * click_flex)
-            p.click(x, y)
-            p.sleep(0.1)
+    # Um clique por item, na ordem de um caminho curto a partir da posição atual do mouse
+    for x, y in plan_tour([(item.cx, item.top + PICKUP_CLICK_Y_OFFSET) for item in items], tuple(p.position())):
+        input_backend.click(x + (random.random() - 0.5) * PICKUP_CLICK_JITTER,
+                            y + (random.random() - 0.5) * PICKUP_CLICK_JITTER)
+        pickup_stats.clicks += 1
+        p.sleep(0.1)
     if legendary_alarm and attempted >= PICKUP_LIMIT - 1:
-        if np.where((np.abs(np.array(im)[:, :, :3] - orange_rgb) <= color_threshold).all(axis=2))[0].shape[0] > 10:
+        if pixel_count(blobs["orange"]) > 10:
             alarm_legendary()
     log(f"finished picking attempt #{attempted + 1}")
     return True
 
 
-def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=None):
+@watching_interrupts()
+def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=None, ocr_interval=2):
     """
     Realiza o processo de salvamento de itens (salvage) quando a bolsa está cheia.
     
@@ -501,6 +644,7 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
         stuck_limit (int, opcional): Número máximo de ciclos sem mudança de estágio antes de considerar travado. Padrão é 30.
         navigation_time_limit (int, opcional): Tempo máximo para navegar até o NPC (em segundos). Padrão é 60.
         stop (callable, opcional): Função que retorna True para interromper a operação. Se None, a operação não é interrompida.
+        ocr_interval (float, opcional): Intervalo mínimo (em segundos) entre leituras do nome do NPC durante a navegação. Padrão é 2.
     
     Returns:
         bool: True se o salvamento for concluído com sucesso, False caso contrário.
@@ -512,6 +656,7 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
     #     return False
     stuck_count = 0
     activate_diablo()
+    x0, y0 = window_origin()
 
     stage = "opening_map"
     prev_stage = ""
@@ -519,15 +664,12 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
     t = 0
     minimap_box = Box(x0 + 1700, y0 + 100, 250, 180) if sys.platform == "darwin" else Box(1620, 10, 220, 150)
     npc_box = None
+    ocr_future = None
+    ocr_time = 0
     while True:
         if stop():
             return False
-        for status in [INTERRUPTED_LAIR, INTERRUPTED_PARTY, INTERRUPTED_RAID]:
-            box = check(status)
-            if box:
-                click_box(box)
-                break
-        if box:
+        if wait_interrupts():
             continue
 
         if stage == "opening_map":
@@ -537,7 +679,7 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
                 stage = "find_npc"
             else:
                 click_box(minimap_box)
-                p.sleep(2)
+                wait_until("find_npc", 2)
         elif stage == "find_npc":
             box = check(f"icon_{destination}")
             if box:
@@ -550,26 +692,35 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
             if box:
                 click_box(box)
                 if sys.platform == "win32":
-                    p.moveTo(960, 1000)
+                    input_backend.move(960, 1000)
                 stage = "navigating"
                 t = time.time()
+                ocr_future = None
+                ocr_time = time.time()
         elif stage == "navigating":
-            p.sleep(2)
-            # new_npc_box = find_npc_2(im_data[f"npc_{destination}"])
-            new_npc_box = find_npc_3(destination)
-            if npc_box and new_npc_box:
-                if match_box(npc_box, new_npc_box):
-                    stage = "reached_npc"
-                    if sys.platform == "win32":
-                        boxes.update({f"npc_{destination}": new_npc_box})  # test save npc box
-            npc_box = new_npc_box
+            # O OCR roda em segundo plano; enquanto isso o laço continua verificando interrupções e o tempo limite
+            if ocr_future is None:
+                if time.time() - ocr_time >= ocr_interval:
+                    # new_npc_box = find_npc_2(im_data[f"npc_{destination}"])
+                    ocr_future = find_npc_3_async(destination)
+                    ocr_time = time.time()
+            elif ocr_future.done():
+                new_npc_box = ocr_future.result()
+                ocr_future = None
+                log(f"navigating, npc box: {new_npc_box}")
+                if npc_box and new_npc_box:
+                    if match_box(npc_box, new_npc_box):
+                        stage = "reached_npc"
+                        if sys.platform == "win32":
+                            boxes.update({f"npc_{destination}": new_npc_box})  # test save npc box
+                npc_box = new_npc_box
         elif stage == "reached_npc":
             if destination == "bs":
                 stage = "salv"
                 destination = "fish"
             else:  # back to fish
                 if sys.platform == "win32":
-                    DIKeys.press(KEY_MOVE.get(location), 0.3)
+                    input_backend.press(KEY_MOVE.get(location), 0.3)
                     # p.click(BACK_TO_FISHING_COORD[location], button=p.MIDDLE)  # test: trying to go to the ideal spot
                 return True
         elif stage == "npc_name_not_found":
@@ -578,7 +729,7 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
                 destination = "fish"
             elif destination == "fish":
                 if sys.platform == "win32":
-                    p.click(BACK_TO_FISHING_COORD[location], button=p.MIDDLE)  # test: trying to go to the ideal spot
+                    input_backend.click(*BACK_TO_FISHING_COORD[location], button=p.MIDDLE)  # test: trying to go to the ideal spot
                 log("Fisher npc not found, possibly blocked by other players. Assuming it reached Fisher npc.")
                 return True
         elif stage == "salv" or stage == "salv_without_box":
@@ -601,19 +752,23 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
         elif stage == "salvaging":
             salvage_attempts_left = 5
             while stage != "salvaged":
+                # As três caixas de seleção e o botão de salvage são buscados numa única passada sobre o mesmo quadro
+                hits = check_many(["white_unticked", "blue_unticked", "yellow_unticked", "salvage"],
+                                  confidence={"salvage": 0.95})
                 for item_color in ["white", "blue", "yellow"]:
-                    box = check(f"{item_color}_unticked")
+                    box = hits[f"{item_color}_unticked"]
                     if box:
                         click_box(box)
-                    p.sleep(1)
-                box = check("salvage", confidence=0.98)
-                if not box:
-                    box = check("salvage", confidence=0.95)
+                        wait_until(f"{item_color}_unticked", 1, gone=True)
+                # O botão é procurado de novo depois das marcações: o quadro acima é de antes dos cliques, quando
+                # ele pode ainda não estar habilitado
+                box = check("salvage", confidence=0.95) if any(
+                    hits[f"{item_color}_unticked"] for item_color in ["white", "blue", "yellow"]) else hits["salvage"]
                 if box:
                     click_box(box)
-                    p.sleep(1)
+                    wait_until(lambda: all(check_many(["no_white", "no_blue", "no_yellow"]).values()), 1)
                 salvage_attempts_left -= 1
-                if (check("no_white") and check("no_blue") and check("no_yellow")) or salvage_attempts_left <= 0:
+                if all(check_many(["no_white", "no_blue", "no_yellow"]).values()) or salvage_attempts_left <= 0:
                     stage = "salvaged"
         elif stage == "salvaged":
             box = check("x")
@@ -631,7 +786,8 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
                 stage = "npc_name_not_found"
         prev_stage = stage
         # log(stuck_count)
-        log(stage)
+        if stage != "navigating":  # durante a navegação o laço roda a cada 0.2 s; o log é feito a cada leitura do OCR
+            log(stage)
         if stuck_count > stuck_limit:
             log(f"salvage got stuck at stage: {stage}, tries left: {tries}")
             while not check("icon_bag"):  # improved logic of returning to normal game screen
@@ -640,10 +796,10 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
                     if cross_box:
                         click_box(cross_box)
                     else:
-                        p.press("space")
+                        input_backend.press("space")
                 else:
-                    DIKeys.press(hexKeyMap.DIK_ESCAPE)
-                p.sleep(3)
+                    input_backend.press(hexKeyMap.DIK_ESCAPE, 0.1)
+                wait_until("icon_bag", 3)
             # cross_box = check("x", confidence=0.8)
             # if cross_box:
             #     click_box(cross_box)
@@ -657,8 +813,16 @@ def salvage(location, tries=3, stuck_limit=30, navigation_time_limit=60, stop=No
             #     cross_box = check("x", confidence=0.8)
             #     if cross_box:
             #         click_box(cross_box)
-            return salvage(location, tries=tries - 1)
-        p.sleep(1)
+            return salvage(location, tries=tries - 1, stop=stop)
+        # Fora da navegação, espera a imagem que o próximo estágio procura em vez de uma pausa fixa de 1 s
+        expected = {"opening_map": "find_npc", "find_npc": f"icon_{destination}", "found_npc": "navigate",
+                    "dialog_bs": "services", "salvaged": "x"}.get(stage)
+        if stage == "navigating":
+            p.sleep(0.2)
+        elif expected:
+            wait_until(expected, 1)
+        else:
+            p.sleep(1)
 
 
 def check_bag_capacity():
@@ -673,16 +837,11 @@ def check_bag_capacity():
         se não for possível verificar (por exemplo, se a captura da região falhar).
     """
     activate_diablo()
-    p.sleep(1)
-    box = check("icon_bag")
+    x0, y0 = window_origin()
+    box = wait_until("icon_bag", 1)
     if box:
         click_box(box)
-        t = time.time()
-        p.sleep(3)
-        box = check("x")
-        while not box and time.time() - t < 10:
-            p.sleep(1)
-            box = check("x")
+        box = wait_until("x", 10)
         if not box:
             return None
         if sys.platform == "darwin":
@@ -734,13 +893,13 @@ def trade(location):
     else:
         trade_with_gui()
         if location == "ashwold":
-            DIKeys.press(hexKeyMap.DIK_D, 0.5)
-            DIKeys.press(hexKeyMap.DIK_W, 1.5)
+            input_backend.press(hexKeyMap.DIK_D, 0.5)
+            input_backend.press(hexKeyMap.DIK_W, 1.5)
         elif location == "bilefen":
             activate_diablo()
-            DIKeys.press(hexKeyMap.DIK_A, 0.05)
+            input_backend.press(hexKeyMap.DIK_A, 0.05)
         else:
-            DIKeys.press(hexKeyMap.DIK_D, 0.05)
+            input_backend.press(hexKeyMap.DIK_D, 0.05)
             
 def fish_and_trade(location, fish_type, fish_key, auto_salv, salv_capacity, brightness=50, stop=None):
     """
@@ -764,6 +923,7 @@ def fish_and_trade(location, fish_type, fish_key, auto_salv, salv_capacity, brig
         def stop():
             return False
     if fish(fish_type, fish_key, brightness, stop):
+        t_cycle = time.time()
         p.sleep(1)
         # Verifica a capacidade da bolsa e realiza o salvamento, se necessário
         if auto_salv:
@@ -780,6 +940,8 @@ def fish_and_trade(location, fish_type, fish_key, auto_salv, salv_capacity, brig
                         log("Failed to salvage.")
                 p.sleep(1)
         trade(location)
+        log(f"trade cycle took {time.time() - t_cycle:.1f} s")
+        log(wait_stats.summary())
         p.sleep(1)
 
 
@@ -812,7 +974,7 @@ def auto_fishing(location, fish_type, fish_key=None, auto_salv=False, salv_capac
             log("Fail-safe do PyAutoGUI acionado. Reposicionando o mouse para o centro e continuando...")
             # Mover o mouse para o centro da tela
             largura_tela, altura_tela = p.size()
-            p.moveTo(largura_tela // 2, altura_tela // 2)
+            input_backend.move(largura_tela // 2, altura_tela // 2)
             # Aguardar um momento antes de continuar
             p.sleep(2)
 
@@ -944,7 +1106,7 @@ if __name__ == '__main__':
                     return False
                     
             while not stop():
-                DIKeys.press(hexKeyMap.DIK_SPACE, 0.01)
+                input_backend.press(hexKeyMap.DIK_SPACE, 0.01)
                 p.sleep(0.3)
         def auto_cura(stop=None):
             if stop is None:
@@ -952,9 +1114,10 @@ if __name__ == '__main__':
                     return False
                     
             while not stop():
-                DIKeys.press(hexKeyMap.DIK_Q, 0.01)
+                input_backend.press(hexKeyMap.DIK_Q, 0.01)
                 p.sleep(3)
             
+        @watching_interrupts()
         def auto_attack(stop=None):
             """
             Executa o loop de ataque automático.
@@ -972,24 +1135,19 @@ if __name__ == '__main__':
                 print(f"Aviso: Não foi possível ativar a janela do Diablo: {e}")
                 
             while not stop():
+                # Fecha um pop-up sinalizado pela thread de interrupções antes de pressionar as teclas
+                wait_interrupts()
                 # Lógica de ataque automático aqui
                 # Por exemplo:
                 p.sleep(2)
-                DIKeys.press(hexKeyMap.DIK_2, 0.01)  # Tecla 2
+                input_backend.press(hexKeyMap.DIK_2, 0.01)  # Tecla 2
                 p.sleep(0.2)
-                DIKeys.press(hexKeyMap.DIK_3, 0.01)  # Tecla 3
+                input_backend.press(hexKeyMap.DIK_3, 0.01)  # Tecla 3
                 p.sleep(0.2)
-                DIKeys.press(hexKeyMap.DIK_1, 0.01)  # Tecla 1
+                input_backend.press(hexKeyMap.DIK_1, 0.01)  # Tecla 1
                 p.sleep(0.2)
-                DIKeys.press(hexKeyMap.DIK_4, 0.01)  # Tecla 4
+                input_backend.press(hexKeyMap.DIK_4, 0.01)  # Tecla 4
                 p.sleep(0.2)
-                
-                # Verificar interrupções como em outras funções
-                for status in [INTERRUPTED_LAIR, INTERRUPTED_PARTY, INTERRUPTED_RAID]:
-                    box = check(status)
-                    if box:
-                        click_box(box)
-                        break
             
             
             
@@ -0,0 +1,420 @@
+import ctypes
+import ctypes.util
+import heapq
+import random
+import sys
+import threading
+import time
+
+BUTTON_ALIASES = {"primary": "left", "secondary": "right"}  # constantes p.PRIMARY/p.SECONDARY do pyautogui
+X_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+X_KEYSYMS = {"space": "space", "enter": "Return", "esc": "Escape"}  # nomes do pyautogui -> keysyms do X
+BATCH_INTERVAL = 1 / 60  # intervalos entre cliques menores que um quadro do jogo: cliques enviados de uma vez
+
+
+class InputBackend:
+    """
+    Interface de entrada (mouse e teclado) usada pelos cliques e teclas do bot.
+
+    Diferente das funções do pyautogui, nenhuma chamada dorme o pyautogui.PAUSE depois de executar: as únicas
+    pausas são as pedidas explicitamente (interval entre cliques, duration de uma tecla). Teclas podem ser
+    códigos de varredura do DirectInput (hexKeyMap.DIK_*) ou nomes de tecla do pyautogui ('n', 'space').
+    """
+
+    name = "base"
+
+    def move(self, x, y):
+        raise NotImplementedError
+
+    def click(self, x, y, clicks=1, interval=0.0, button="left"):
+        """
+        Move o cursor para (x, y) e envia 'clicks' cliques numa única chamada, com 'interval' segundos entre eles.
+
+        Intervalos menores que BATCH_INTERVAL não separam cliques em quadros diferentes do jogo; os backends que
+        conseguem enviar vários cliques numa única chamada o fazem nesse caso.
+        """
+        raise NotImplementedError
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def press(self, key, duration=0.0, presses=1):
+        """
+        Pressiona a tecla 'presses' vezes, mantendo-a pressionada por 'duration' segundos em cada uma.
+        """
+        for _ in range(presses):
+            self.key_down(key)
+            if duration:
+                time.sleep(duration)
+            self.key_up(key)
+
+    def write(self, text):
+        """
+        Digita cada caractere do texto, sem pausas entre eles.
+        """
+        for char in text:
+            self.press(char)
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiBackend(InputBackend):
+    """
+    pyautogui sem a pausa implícita (_pause=False). Usado no macOS e quando não há backend nativo.
+    """
+
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self.p = pyautogui
+
+    def move(self, x, y):
+        self.p.moveTo(x, y, _pause=False)
+
+    def click(self, x, y, clicks=1, interval=0.0, button="left"):
+        self.p.click(x, y, clicks=clicks, interval=interval, button=button, _pause=False)
+
+    def key_down(self, key):
+        self.p.keyDown(key, _pause=False)
+
+    def key_up(self, key):
+        self.p.keyUp(key, _pause=False)
+
+    def press(self, key, duration=0.0, presses=1):
+        if isinstance(key, str) and not duration:
+            self.p.press(key, presses=presses, _pause=False)
+        else:
+            super().press(key, duration, presses)
+
+    def write(self, text):
+        self.p.write(text, _pause=False)
+
+
+class SendInputBackend(InputBackend):
+    """
+    Windows: eventos enviados pelo SendInput (DIKeys), com todos os cliques de um multi-clique numa única chamada.
+    """
+
+    name = "sendinput"
+
+    def __init__(self):
+        import DIKeys
+        import hexKeyMap
+        self.dikeys = DIKeys
+        self.keys = hexKeyMap.DI_KEYS
+
+    def _scancode(self, key):
+        return key if isinstance(key, int) else self.keys[key.lower()]
+
+    def move(self, x, y):
+        self.dikeys.SetCursorPos(int(x), int(y))
+
+    def click(self, x, y, clicks=1, interval=0.0, button="left"):
+        button = BUTTON_ALIASES.get(button, button)
+        if interval < BATCH_INTERVAL:
+            self.dikeys.click(x, y, clicks, button)
+            return
+        for i in range(clicks):
+            if i:
+                time.sleep(interval)
+            self.dikeys.click(x, y, 1, button)
+
+    def key_down(self, key):
+        self.dikeys.send([self.dikeys.key_event(self._scancode(key))])
+
+    def key_up(self, key):
+        self.dikeys.send([self.dikeys.key_event(self._scancode(key), up=True)])
+
+    def press(self, key, duration=0.0, presses=1):
+        if duration:
+            return super().press(key, duration, presses)
+        code = self._scancode(key)
+        self.dikeys.send([self.dikeys.key_event(code, up) for _ in range(presses) for up in (False, True)])
+
+
+class XTestBackend(InputBackend):
+    """
+    Linux (X11/Xvfb): eventos sintéticos pela extensão XTest, enviados ao servidor com um único XFlush por chamada.
+
+    Códigos de varredura do DirectInput são convertidos para keycodes do X somando 8 (layout evdev).
+    """
+
+    name = "xtest"
+
+    def __init__(self, display_name=None):
+        xlib_path = ctypes.util.find_library("X11")
+        xtst_path = ctypes.util.find_library("Xtst")
+        if not xlib_path or not xtst_path:
+            raise OSError("libX11/libXtst não encontradas.")
+        self.xlib = ctypes.CDLL(xlib_path)
+        self.xtst = ctypes.CDLL(xtst_path)
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.xlib.XFlush.argtypes = [ctypes.c_void_p]
+        self.xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xlib.XStringToKeysym.restype = ctypes.c_ulong
+        self.xlib.XStringToKeysym.argtypes = [ctypes.c_char_p]
+        self.xlib.XKeysymToKeycode.restype = ctypes.c_ubyte
+        self.xlib.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        self.xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                                   ctypes.c_ulong]
+        self.xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+        self.xtst.XTestFakeKeyEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+        self.display = self.xlib.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            raise OSError(f"Não foi possível abrir o display X {display_name or ''}.")
+        self._lock = threading.Lock()  # Xlib não é seguro entre threads sem XInitThreads
+
+    def _keycode(self, key):
+        if isinstance(key, int):
+            return key + 8
+        keysym = self.xlib.XStringToKeysym(X_KEYSYMS.get(key, key).encode())
+        return self.xlib.XKeysymToKeycode(self.display, keysym)
+
+    def move(self, x, y):
+        with self._lock:
+            self.xtst.XTestFakeMotionEvent(self.display, -1, int(x), int(y), 0)
+            self.xlib.XFlush(self.display)
+
+    def click(self, x, y, clicks=1, interval=0.0, button="left"):
+        number = X_BUTTONS[BUTTON_ALIASES.get(button, button)]
+        with self._lock:
+            self.xtst.XTestFakeMotionEvent(self.display, -1, int(x), int(y), 0)
+            for i in range(clicks):
+                if i and interval >= BATCH_INTERVAL:
+                    self.xlib.XFlush(self.display)
+                    time.sleep(interval)
+                self.xtst.XTestFakeButtonEvent(self.display, number, True, 0)
+                self.xtst.XTestFakeButtonEvent(self.display, number, False, 0)
+            self.xlib.XFlush(self.display)
+
+    def _key(self, key, is_press):
+        with self._lock:
+            self.xtst.XTestFakeKeyEvent(self.display, self._keycode(key), is_press, 0)
+            self.xlib.XFlush(self.display)
+
+    def key_down(self, key):
+        self._key(key, True)
+
+    def key_up(self, key):
+        self._key(key, False)
+
+    def press(self, key, duration=0.0, presses=1):
+        if duration:
+            return super().press(key, duration, presses)
+        keycode = self._keycode(key)
+        with self._lock:
+            for _ in range(presses):
+                self.xtst.XTestFakeKeyEvent(self.display, keycode, True, 0)
+                self.xtst.XTestFakeKeyEvent(self.display, keycode, False, 0)
+            self.xlib.XFlush(self.display)
+
+    def close(self):
+        with self._lock:
+            if self.display:
+                self.xlib.XCloseDisplay(self.display)
+                self.display = None
+
+
+class RecordingBackend(InputBackend):
+    """
+    Não envia nada: registra cada ação em 'events' como (time.monotonic(), ação, argumentos).
+    Útil para testes, replays (DIABLO_FRAME_SOURCE=replay:...) e para medir o custo de despacho.
+    """
+
+    name = "record"
+
+    def __init__(self):
+        self.events = []
+
+    def move(self, x, y):
+        self.events.append((time.monotonic(), "move", (int(x), int(y))))
+
+    def click(self, x, y, clicks=1, interval=0.0, button="left"):
+        self.events.append((time.monotonic(), "click", (int(x), int(y), clicks, interval, button)))
+
+    def key_down(self, key):
+        self.events.append((time.monotonic(), "key_down", (key,)))
+
+    def key_up(self, key):
+        self.events.append((time.monotonic(), "key_up", (key,)))
+
+    def press(self, key, duration=0.0, presses=1):
+        self.events.append((time.monotonic(), "press", (key, duration, presses)))
+
+    def write(self, text):
+        self.events.append((time.monotonic(), "write", (text,)))
+
+
+URGENT, NORMAL, LOW = 0, 1, 2
+
+
+class InputScheduler:
+    """
+    Fila de entradas com horário marcado, drenada por uma thread dedicada.
+
+    Rajadas de teclas (por exemplo, E para coletar itens) são agendadas de uma vez, com intervalos aleatórios
+    entre as teclas, e executadas em segundo plano: a thread de decisão continua detectando os estados em vez
+    de ficar parada em sleeps. Teclas com duração viram um key_down agora e um key_up agendado, sem bloquear a
+    fila. Ações urgentes (preempt=True) descartam as ações de baixa prioridade ainda na fila.
+
+    Cada ação guarda o horário previsto; o atraso real de despacho é contabilizado em summary().
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.dispatched = 0
+        self.cancelled = 0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+        self._queue = []
+        self._seq = 0
+        self._busy = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def submit(self, method, *args, delay=0.0, jitter=0.0, priority=NORMAL, preempt=False, cancellable=True):
+        """
+        Agenda backend.<method>(*args) para daqui a delay (+ até 'jitter' segundos aleatórios).
+
+        Args:
+            method (str): Nome do método do backend ("click", "press", "key_down", "key_up", "move", "write").
+            delay (float, opcional): Atraso, em segundos, a partir de agora. Padrão é 0.
+            jitter (float, opcional): Atraso aleatório adicional máximo, em segundos. Padrão é 0.
+            priority (int, opcional): URGENT, NORMAL ou LOW; desempata ações com o mesmo horário. Padrão é NORMAL.
+            preempt (bool, opcional): Se True, descarta antes as ações LOW da fila. Padrão é False.
+            cancellable (bool, opcional): Se False, a ação nunca é descartada (ex.: key_up). Padrão é True.
+        """
+        due = time.monotonic() + delay + random.random() * jitter
+        with self._condition:
+            if preempt:
+                self._cancel(LOW)
+            self._push(due, priority, method, args, cancellable)
+            self._start()
+            self._condition.notify()
+        return due
+
+    def burst(self, key, count, gap=(0.05, 0.15), duration=0.01, delay=0.0, priority=LOW):
+        """
+        Agenda 'count' pressionamentos da tecla, com intervalos aleatórios uniformes em 'gap' segundos entre eles.
+
+        Returns:
+            float: Horário (time.monotonic) previsto para o último pressionamento.
+        """
+        due = time.monotonic() + delay
+        with self._condition:
+            for i in range(count):
+                if i:
+                    due += random.uniform(*gap)
+                self._push(due, priority, "press", (key, duration), True)
+            self._start()
+            self._condition.notify()
+        return due
+
+    def cancel(self, priority=LOW):
+        """
+        Descarta as ações da fila com a prioridade dada (ou menos urgentes) que ainda podem ser descartadas.
+        """
+        with self._condition:
+            self._cancel(priority)
+
+    def idle(self):
+        """
+        True se não há nenhuma ação na fila nem em execução.
+        """
+        with self._condition:
+            return not self._queue and not self._busy
+
+    def wait_idle(self, timeout=None):
+        """
+        Espera a fila esvaziar; retorna False se o tempo esgotar antes.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def summary(self):
+        mean = self.total_lateness / self.dispatched * 1000 if self.dispatched else 0.0
+        return (f"input scheduler: {self.dispatched} dispatched, {self.cancelled} cancelled, "
+                f"lateness mean {mean:.1f} ms, max {self.max_lateness * 1000:.1f} ms")
+
+    def _push(self, due, priority, method, args, cancellable):
+        self._seq += 1
+        heapq.heappush(self._queue, (due, priority, self._seq, method, args, cancellable))
+
+    def _cancel(self, priority):
+        kept = [item for item in self._queue if item[1] < priority or not item[5]]
+        self.cancelled += len(self._queue) - len(kept)
+        heapq.heapify(kept)
+        self._queue = kept
+        self._condition.notify_all()
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="input-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._queue:
+                        self._condition.notify_all()
+                        self._condition.wait()
+                        continue
+                    delay = self._queue[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                due, priority, _, method, args, _ = heapq.heappop(self._queue)
+                self._busy = True
+            lateness = time.monotonic() - due
+            try:
+                if method == "press" and len(args) > 1 and args[1]:
+                    # Tecla com duração: solta a tecla numa ação agendada, sem bloquear a fila
+                    key, duration = args[0], args[1]
+                    self.backend.key_down(key)
+                    with self._condition:
+                        self._push(time.monotonic() + duration, URGENT, "key_up", (key,), False)
+                else:
+                    getattr(self.backend, method)(*args)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self.dispatched += 1
+                    self.total_lateness += max(lateness, 0.0)
+                    self.max_lateness = max(self.max_lateness, lateness)
+                    if not self._queue:
+                        self._condition.notify_all()
+
+
+def open_input_backend(spec=""):
+    """
+    Cria o backend de entrada a partir de uma especificação:
+
+    - "" (padrão): SendInput no Windows, XTest no Linux (se disponível) e pyautogui sem pausa nos demais;
+    - "sendinput", "xtest[:display]", "pyautogui" ou "record".
+    """
+    name, _, arg = spec.partition(":")
+    if not name:
+        if sys.platform == "win32":
+            return SendInputBackend()
+        if sys.platform.startswith("linux"):
+            try:
+                return XTestBackend()
+            except OSError:
+                pass
+        return PyAutoGuiBackend()
+    if name == "sendinput":
+        return SendInputBackend()
+    if name == "xtest":
+        return XTestBackend(arg or None)
+    if name == "pyautogui":
+        return PyAutoGuiBackend()
+    if name == "record":
+        return RecordingBackend()
+    raise ValueError(f"Backend de entrada desconhecido: {spec}")
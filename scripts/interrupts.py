@@ -0,0 +1,80 @@
+import collections
+import threading
+import time
+
+
+class InterruptWatcher(threading.Thread):
+    """
+    Thread de baixa frequência que detecta os pop-ups (covil, festa, ataque) e apenas sinaliza.
+
+    A cada 'interval' segundos chama detect(); se houver um pop-up, guarda (status, box) em 'pending' e
+    sinaliza o evento 'interrupted'. A thread não envia nenhuma entrada: quem fecha o pop-up é o fluxo ativo
+    (pesca, troca, salvage, ataque), num ponto seguro do seu laço, para que o clique de fechar nunca se
+    intercale com os cliques e teclas do fluxo. Depois de fechar, o fluxo chama resolved(); se o pop-up
+    ainda estiver na tela, a verificação seguinte volta a sinalizá-lo.
+    """
+
+    def __init__(self, detect, interval=0.5):
+        """
+        Args:
+            detect (callable): Retorna (status, box) do pop-up na tela, ou (None, None).
+            interval (float, opcional): Intervalo entre verificações, em segundos. Padrão é 0.5.
+        """
+        super().__init__(name="interrupt-watcher", daemon=True)
+        self.detect = detect
+        self.interval = interval
+        self.interrupted = threading.Event()
+        self.pending = None
+        self.last_status = None
+        self.checks = 0
+        self.dismissed = collections.Counter()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            self.checks += 1
+            try:
+                status, box = self.detect()
+            except Exception as e:
+                print(f"Erro ao verificar interrupções: {e}")
+                status, box = None, None
+            with self._lock:
+                if box:
+                    self.pending = (status, box)
+                    self.last_status = status
+                    self.interrupted.set()
+                else:
+                    self.pending = None
+                    self.interrupted.clear()
+            deadline += self.interval
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                deadline = time.monotonic()
+
+    def take(self):
+        """
+        Retorna o pop-up sinalizado (status, box), ou None se não houver nenhum.
+        """
+        with self._lock:
+            return self.pending
+
+    def resolved(self, status):
+        """
+        Registra que o fluxo fechou o pop-up e limpa o sinal até a próxima verificação.
+        """
+        with self._lock:
+            self.dismissed[status] += 1
+            self.pending = None
+            self.interrupted.clear()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def summary(self):
+        dismissed = ", ".join(f"{status}: {n}" for status, n in self.dismissed.items()) or "none"
+        return (f"interrupt watcher: {self.checks} checks every {self.interval:g} s, "
+                f"{sum(self.dismissed.values())} pop-ups dismissed ({dismissed})")
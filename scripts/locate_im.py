@@ -5,6 +5,13 @@ import subprocess
 import os
 import datetime
 
+try:
+    import Quartz  # pyobjc-framework-Quartz (macOS): captura a tela em memória, sem o screencapture
+except ImportError:
+    Quartz = None
+
+_quartz_warned = False  # o aviso da captura sem Quartz é mostrado uma única vez
+
 Box = collections.namedtuple('Box', 'left top width height')
 RGB = collections.namedtuple('RGB', 'red green blue')
 # Point = collections.namedtuple('Point', 'x y')
@@ -36,6 +43,56 @@ def screenshot(image_name=None, region=None):
         os.unlink(tmp_filename)
     return im
 
+def grab_region(region):
+    """
+    Captura uma região da tela em memória, sem gravar arquivo.
+
+    Usa o Quartz (pyobjc-framework-Quartz, em requirements.txt); se ele não estiver instalado, avisa uma vez e
+    recorre a screenshot(), que passa pelo screencapture e por um arquivo temporário.
+
+    Args:
+        region (tuple): Região da tela a ser capturada no formato (x, y, largura, altura), em pixels da tela Retina.
+            Se None, captura a tela inteira.
+
+    Returns:
+        numpy.ndarray: Imagem capturada em formato OpenCV (BGR).
+    """
+    global _quartz_warned
+    if Quartz is None:
+        if not _quartz_warned:
+            _quartz_warned = True
+            print("Aviso: pyobjc-framework-Quartz não está instalado; a tela será capturada pelo screencapture, "
+                  "gravando um arquivo a cada leitura (pip install -r requirements.txt).")
+        return screenshot(region=region)
+    if region is None:
+        cg_image = Quartz.CGWindowListCreateImage(Quartz.CGRectInfinite, Quartz.kCGWindowListOptionOnScreenOnly,
+                                                  Quartz.kCGNullWindowID, Quartz.kCGWindowImageDefault)
+        return _cg_image_to_array(cg_image)
+    rect = Quartz.CGRectMake(region[0] // 2, region[1] // 2, region[2] // 2 + 1, region[3] // 2 + 1)
+    cg_image = Quartz.CGWindowListCreateImage(rect, Quartz.kCGWindowListOptionOnScreenOnly,
+                                              Quartz.kCGNullWindowID, Quartz.kCGWindowImageDefault)
+    im = _cg_image_to_array(cg_image)
+    return im[region[1] % 2:region[1] % 2 + region[3], region[0] % 2:region[0] % 2 + region[2], :]
+
+def _cg_image_to_array(cg_image):
+    width, height = Quartz.CGImageGetWidth(cg_image), Quartz.CGImageGetHeight(cg_image)
+    bytes_per_row = Quartz.CGImageGetBytesPerRow(cg_image)
+    data = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(cg_image))
+    return np.frombuffer(data, dtype=np.uint8).reshape(height, bytes_per_row // 4, 4)[:, :width, :3]  # BGRA
+
+def _load_images(needle_image, haystack_image):
+    if type(needle_image) == str:
+        needle_image = cv2.imread(needle_image)
+        if needle_image is None:
+            raise FileNotFoundError("Não foi possível abrir o arquivo. Verifique o caminho e a integridade da imagem.")
+    if type(haystack_image) == str:
+        haystack_image = cv2.imread(haystack_image)
+        if haystack_image is None:
+            raise FileNotFoundError("Não foi possível abrir o arquivo. Verifique o caminho e a integridade da imagem.")
+    if (haystack_image.shape[0] < needle_image.shape[0] or haystack_image.shape[1] < needle_image.shape[1]):
+        raise ValueError("Dimensões da imagem de busca são menores que a imagem a ser localizada.")
+    return needle_image, haystack_image
+
 def locate_all(needle_image, haystack_image, limit=10000, confidence=0.999, show=False):
     """
     Localiza todas as ocorrências de uma imagem dentro de outra.
@@ -50,34 +107,71 @@ def locate_all(needle_image, haystack_image, limit=10000, confidence=0.999, show
     Yields:
         Box: Coordenadas (x, y, largura, altura) das correspondências encontradas.
     """
-    if type(needle_image) == str:
-        needle_image = cv2.imread(needle_image)
-        if needle_image is None:
-            raise FileNotFoundError("Não foi possível abrir o arquivo. Verifique o caminho e a integridade da imagem.")
-    if type(haystack_image) == str:
-        haystack_image = cv2.imread(haystack_image)
-        if haystack_image is None:
-            raise FileNotFoundError("Não foi possível abrir o arquivo. Verifique o caminho e a integridade da imagem.")
-
+    needle_image, haystack_image = _load_images(needle_image, haystack_image)
     needle_height, needle_width = needle_image.shape[:2]
-    from PIL import Image
     if show:
+        from PIL import Image
         Image._show(Image.fromarray(needle_image[:, :, -1]))
         Image._show(Image.fromarray(haystack_image[:, :, -1]))
 
-    if (haystack_image.shape[0] < needle_image.shape[0] or haystack_image.shape[1] < needle_image.shape[1]):
-        raise ValueError("Dimensões da imagem de busca são menores que a imagem a ser localizada.")
-
     result = cv2.matchTemplate(haystack_image, needle_image, cv2.TM_CCOEFF_NORMED)
-    match_indices = np.arange(result.size)[(result > confidence).flatten()]
-    matches = np.unravel_index(match_indices[:limit], result.shape)
+    ys, xs = np.nonzero(result > confidence)  # em ordem de varredura, como antes
 
-    if len(matches[0]) == 0:
-        return
-
-    for x, y in zip(matches[1], matches[0]):
+    for x, y in zip(xs[:limit], ys[:limit]):
         yield Box(x, y, needle_width, needle_height)
 
+def locate_best(needle_image, haystack_image, confidence=0.999):
+    """
+    Localiza a melhor ocorrência de uma imagem dentro de outra, sem gerar a lista de todas as posições.
+    
+    Args:
+        needle_image (str ou numpy.ndarray): Imagem ou caminho da imagem a ser localizada.
+        haystack_image (str ou numpy.ndarray): Imagem ou caminho da imagem onde será feita a busca.
+        confidence (float, opcional): Nível mínimo de correspondência para considerar um match. Padrão é 0.999.
+    
+    Returns:
+        tuple: (Box, score) da melhor posição; Box é None se o score ficar abaixo da confiança.
+    """
+    needle_image, haystack_image = _load_images(needle_image, haystack_image)
+    result = cv2.matchTemplate(haystack_image, needle_image, cv2.TM_CCOEFF_NORMED)
+    _, score, _, (x, y) = cv2.minMaxLoc(result)
+    if score < confidence:
+        return None, score
+    return Box(x, y, needle_image.shape[1], needle_image.shape[0]), score
+
+def locate_top_k(needle_image, haystack_image, k=10, confidence=0.999, max_overlap=0.5):
+    """
+    Localiza as k melhores ocorrências de uma imagem, com supressão de não-máximos.
+    
+    Posições vizinhas a uma ocorrência melhor são descartadas quando a sobreposição com ela passa de
+    max_overlap nos dois eixos, de modo que um mesmo elemento na tela gera uma única caixa.
+    
+    Args:
+        needle_image (str ou numpy.ndarray): Imagem ou caminho da imagem a ser localizada.
+        haystack_image (str ou numpy.ndarray): Imagem ou caminho da imagem onde será feita a busca.
+        k (int, opcional): Número máximo de ocorrências retornadas. Padrão é 10.
+        confidence (float, opcional): Nível mínimo de correspondência. Padrão é 0.999.
+        max_overlap (float, opcional): Fração de sobreposição por eixo acima da qual uma caixa é suprimida. Padrão é 0.5.
+    
+    Returns:
+        list: Lista de (Box, score), do maior para o menor score.
+    """
+    needle_image, haystack_image = _load_images(needle_image, haystack_image)
+    needle_height, needle_width = needle_image.shape[:2]
+    result = cv2.matchTemplate(haystack_image, needle_image, cv2.TM_CCOEFF_NORMED)
+    ys, xs = np.nonzero(result >= confidence)
+    scores = result[ys, xs]
+    order = np.argsort(-scores, kind="stable")
+    min_dx = needle_width * (1 - max_overlap)
+    min_dy = needle_height * (1 - max_overlap)
+    kept = []
+    while order.size and len(kept) < k:
+        best = order[0]
+        kept.append(best)
+        order = order[1:]
+        order = order[(np.abs(xs[order] - xs[best]) >= min_dx) | (np.abs(ys[order] - ys[best]) >= min_dy)]
+    return [(Box(int(xs[i]), int(ys[i]), needle_width, needle_height), float(scores[i])) for i in kept]
+
 def locate(needle_image, haystack_image, limit=10000, confidence=0.999):
     """
     Localiza a primeira ocorrência de uma imagem dentro de outra.
@@ -85,14 +179,20 @@ def locate(needle_image, haystack_image, limit=10000, confidence=0.999):
     Args:
         needle_image (str ou numpy.ndarray): Imagem ou caminho da imagem a ser localizada.
         haystack_image (str ou numpy.ndarray): Imagem ou caminho da imagem onde será feita a busca.
-        limit (int, opcional): Número máximo de ocorrências a serem processadas. Padrão é 10000.
+        limit (int, opcional): Mantido por compatibilidade; apenas a primeira ocorrência é calculada.
         confidence (float, opcional): Nível mínimo de correspondência para considerar um match. Padrão é 0.999.
     
     Returns:
         Box ou None: Retorna as coordenadas da primeira ocorrência ou None se não for encontrado.
     """
-    results = tuple(locate_all(needle_image, haystack_image, limit, confidence))
-    return results[0] if results else None
+    needle_image, haystack_image = _load_images(needle_image, haystack_image)
+    result = cv2.matchTemplate(haystack_image, needle_image, cv2.TM_CCOEFF_NORMED)
+    mask = result > confidence
+    first = mask.argmax()  # primeira ocorrência em ordem de varredura, sem listar as demais
+    if not mask.flat[first]:
+        return None
+    y, x = np.unravel_index(first, result.shape)
+    return Box(int(x), int(y), needle_image.shape[1], needle_image.shape[0])
 
 def locate_all_on_screen(im_name, region=None, confidence=0.999):
     """
@@ -128,8 +228,12 @@ def locate_on_screen(im_name, region=None, confidence=0.999):
     Returns:
         Box ou None: Retorna as coordenadas da primeira ocorrência ou None se não for encontrado.
     """
-    results = locate_all_on_screen(im_name, region, confidence)
-    return results[0] if results else None
+    box = locate(im_name, screenshot(region=region), confidence=confidence)
+    if box is None:
+        return None
+    if region is None:
+        region = (0, 0, 0, 0)
+    return Box(box[0] + region[0], box[1] + region[1], box[2], box[3])
 
 def pixel_match_color(x, y, expected_RGB_color, tolerance=0):
     """
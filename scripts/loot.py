@@ -0,0 +1,215 @@
+import collections
+
+import cv2
+import numpy as np
+
+# Cores (RGB) do texto dos itens no chão
+LOOT_COLORS = {
+    "blue": (89, 96, 241),
+    "yellow": (233, 231, 77),
+    "orange": (243, 143, 36),
+}
+
+Blob = collections.namedtuple('Blob', 'color left top width height cx cy pixels')
+Item = collections.namedtuple('Item', 'left top width height cx cy pixels colors')
+
+
+class ColorLabeller:
+    """
+    Classifica os pixels de uma imagem BGR em várias cores de uma só vez.
+
+    Para cada canal é montada uma tabela (LUT) de 256 entradas com um bit por cor: o bit da cor está ligado
+    se o valor do canal está a até 'tolerance' do valor da cor. Uma única passada de cv2.LUT sobre a imagem
+    uint8, seguida do E bit a bit dos três canais, produz o rótulo de todas as cores ao mesmo tempo, sem as
+    cópias int64 das diferenças absolutas.
+    """
+
+    def __init__(self, colors, tolerance=5):
+        """
+        Args:
+            colors (dict): Nome -> cor RGB. No máximo 8 cores.
+            tolerance (int, opcional): Diferença máxima por canal. Padrão é 5.
+        """
+        if len(colors) > 8:
+            raise ValueError("ColorLabeller suporta no máximo 8 cores.")
+        self.colors = dict(colors)
+        self.bits = {name: 1 << i for i, name in enumerate(self.colors)}
+        values = np.arange(256)
+        lut = np.zeros((1, 256, 3), dtype=np.uint8)
+        for name, rgb in self.colors.items():
+            for channel, value in enumerate(rgb[::-1]):  # BGR
+                lut[0, np.abs(values - value) <= tolerance, channel] |= self.bits[name]
+        self.lut = lut
+
+    def label(self, image):
+        """
+        Retorna a imagem de rótulos (uint8, um bit por cor) de uma imagem BGR.
+        """
+        b, g, r = cv2.split(cv2.LUT(np.ascontiguousarray(image[:, :, :3]), self.lut))
+        return cv2.bitwise_and(cv2.bitwise_and(b, g), r)
+
+    def blobs(self, image, left=0, top=0, min_pixels=1):
+        """
+        Encontra os componentes conexos (vizinhança 8) de cada cor.
+
+        Args:
+            image (numpy.ndarray): Imagem BGR.
+            left (int, opcional): Coordenada x absoluta do canto da imagem. Padrão é 0.
+            top (int, opcional): Coordenada y absoluta do canto da imagem. Padrão é 0.
+            min_pixels (int, opcional): Tamanho mínimo, em pixels, de um componente. Padrão é 1.
+
+        Returns:
+            dict: Nome da cor -> lista de Blob (em coordenadas absolutas), uma entrada para cada cor.
+        """
+        labels = self.label(image)
+        result = {name: [] for name in self.colors}
+        if not labels.any():
+            return result
+        for name, bit in self.bits.items():
+            mask = cv2.bitwise_and(labels, bit)
+            if not mask.any():
+                continue
+            n, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+            for i in range(1, n):  # o componente 0 é o fundo
+                x, y, w, h, pixels = (int(v) for v in stats[i])
+                if pixels >= min_pixels:
+                    result[name].append(Blob(name, left + x, top + y, w, h,
+                                             left + float(centroids[i][0]), top + float(centroids[i][1]), pixels))
+        return result
+
+
+def pixel_count(blobs):
+    """
+    Total de pixels de uma lista de Blob.
+    """
+    return sum(blob.pixels for blob in blobs)
+
+
+def bounding_box(blobs):
+    """
+    Retorna o retângulo (x, y, largura, altura) que envolve todos os Blob, ou None se a lista estiver vazia.
+    """
+    if not blobs:
+        return None
+    x1 = min(blob.left for blob in blobs)
+    y1 = min(blob.top for blob in blobs)
+    x2 = max(blob.left + blob.width for blob in blobs)
+    y2 = max(blob.top + blob.height for blob in blobs)
+    return x1, y1, x2 - x1, y2 - y1
+
+
+def merge_blobs(blobs, gap_x=30, gap_y=8, min_pixels=10):
+    """
+    Junta os blobs próximos (as letras de um mesmo nome de item) em itens.
+
+    Dois blobs pertencem ao mesmo item se os retângulos, aumentados de gap_x na horizontal e gap_y na
+    vertical, se tocam; a junção é transitiva. Itens com menos de 'min_pixels' pixels (pixels isolados
+    que por acaso têm a cor de um item) são descartados.
+
+    Args:
+        blobs (list): Lista de Blob, de qualquer cor.
+        gap_x (int, opcional): Distância horizontal máxima entre letras do mesmo nome. Padrão é 30.
+        gap_y (int, opcional): Distância vertical máxima entre partes do mesmo nome. Padrão é 8.
+        min_pixels (int, opcional): Tamanho mínimo, em pixels, de um item. Padrão é 10.
+
+    Returns:
+        list: Lista de Item, com o centróide ponderado pelo número de pixels de cada blob.
+    """
+    if not blobs:
+        return []
+    rects = np.array([(b.left, b.top, b.left + b.width, b.top + b.height) for b in blobs])
+    near = ((rects[:, None, 0] <= rects[None, :, 2] + gap_x) & (rects[None, :, 0] <= rects[:, None, 2] + gap_x) &
+            (rects[:, None, 1] <= rects[None, :, 3] + gap_y) & (rects[None, :, 1] <= rects[:, None, 3] + gap_y))
+    # Propaga o menor índice de cada grupo até estabilizar (componentes conexos do grafo de vizinhança)
+    labels = np.arange(len(blobs))
+    while True:
+        merged = np.where(near, labels[None, :], len(blobs)).min(axis=1)
+        if (merged == labels).all():
+            break
+        labels = merged[merged]
+    items = []
+    for label in np.unique(labels):
+        group = [blobs[i] for i in np.flatnonzero(labels == label)]
+        pixels = sum(b.pixels for b in group)
+        if pixels < min_pixels:
+            continue
+        x, y, w, h = bounding_box(group)
+        items.append(Item(x, y, w, h, sum(b.cx * b.pixels for b in group) / pixels,
+                          sum(b.cy * b.pixels for b in group) / pixels, pixels,
+                          tuple(sorted({b.color for b in group}))))
+    return items
+
+
+def tour_length(points, start):
+    """
+    Comprimento do caminho que parte de 'start' e visita os pontos na ordem dada.
+    """
+    path = np.array([start] + list(points), dtype=float)
+    return float(np.hypot(*np.diff(path, axis=0).T).sum())
+
+
+def plan_tour(points, start):
+    """
+    Ordena os pontos de clique num caminho curto a partir de 'start' (posição atual do mouse).
+
+    Usa o vizinho mais próximo como solução inicial e a melhora com 2-opt (inversão de trechos do caminho)
+    enquanto houver ganho. O caminho é aberto: não volta ao ponto de partida.
+
+    Returns:
+        list: Os mesmos pontos, na ordem de visita.
+    """
+    def dist(a, b):
+        return np.hypot(a[0] - b[0], a[1] - b[1])
+
+    remaining = list(points)
+    order = []
+    current = start
+    while remaining:
+        current = remaining.pop(min(range(len(remaining)), key=lambda k: dist(remaining[k], current)))
+        order.append(current)
+
+    improved = True
+    while improved:
+        improved = False
+        path = [start] + order
+        for i in range(1, len(path) - 1):
+            for j in range(i + 1, len(path)):
+                # Inverte path[i..j]: troca as arestas (i-1, i) e (j, j+1) por (i-1, j) e (i, j+1)
+                before = dist(path[i - 1], path[i]) + (dist(path[j], path[j + 1]) if j + 1 < len(path) else 0)
+                after = dist(path[i - 1], path[j]) + (dist(path[i], path[j + 1]) if j + 1 < len(path) else 0)
+                if after < before - 1e-9:
+                    path[i:j + 1] = path[i:j + 1][::-1]
+                    improved = True
+        order = path[1:]
+    return order
+
+
+class PickupStats:
+    """
+    Contabiliza os cliques da coleta e os itens que sumiram da tela entre duas tentativas (coletados).
+    """
+
+    def __init__(self):
+        self.attempts = 0
+        self.clicks = 0
+        self.items_collected = 0
+        self._pending = None
+
+    def observe(self, n_items):
+        """
+        Registra quantos itens estão visíveis no início de uma tentativa; os que sumiram desde a anterior contam
+        como coletados.
+        """
+        if self._pending is not None:
+            self.items_collected += max(self._pending - n_items, 0)
+        self._pending = n_items if n_items else None
+        if n_items:
+            self.attempts += 1
+
+    @property
+    def clicks_per_item(self):
+        return self.clicks / self.items_collected if self.items_collected else float("nan")
+
+    def summary(self):
+        return (f"pickup: {self.attempts} attempts, {self.clicks} clicks, {self.items_collected} items collected, "
+                f"{self.clicks_per_item:.2f} clicks/item")
@@ -0,0 +1,185 @@
+import collections
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from pytesseract import pytesseract
+
+
+def _image_to_data(image, config, tesseract_cmd):
+    """
+    Executado nas threads do pool: roda o Tesseract sobre a imagem e retorna o dicionário do image_to_data.
+
+    Retorna None se o Tesseract não estiver instalado.
+    """
+    if tesseract_cmd:
+        pytesseract.tesseract_cmd = tesseract_cmd
+    try:
+        return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+    except pytesseract.TesseractNotFoundError:
+        return None
+
+
+def gather(futures, func):
+    """
+    Retorna um Future com o resultado de func aplicado à lista de resultados, quando todos terminarem.
+    """
+    futures = list(futures)
+    chained = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def finish():
+        try:
+            chained.set_result(func([f.result() for f in futures]))
+        except Exception as e:
+            chained.set_exception(e)
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        finish()
+
+    if not futures:
+        finish()
+    for future in futures:
+        future.add_done_callback(done)
+    return chained
+
+
+def text_line_crops(image, gap_x=12, gap_y=3, min_width=16, min_height=8, padding=6, max_crops=6):
+    """
+    Recorta as linhas de texto de uma imagem filtrada por cor (texto colorido sobre fundo preto).
+
+    Os pixels não pretos são dilatados na horizontal, para que as letras de uma mesma linha se juntem, e cada
+    componente conexo vira um recorte (com uma margem preta), de poucas dezenas de pixels de altura, em vez
+    da tela inteira. Numa tela cheia de textos da mesma cor, só as 'max_crops' maiores linhas são lidas, para
+    limitar o número de execuções do Tesseract por consulta.
+
+    Args:
+        image (numpy.ndarray): Imagem BGR com tudo que não é da cor do texto zerado.
+        gap_x (int, opcional): Distância horizontal máxima entre letras da mesma linha. Padrão é 12.
+        gap_y (int, opcional): Distância vertical máxima entre partes da mesma linha. Padrão é 3.
+        min_width (int, opcional): Largura mínima de uma linha. Padrão é 16.
+        min_height (int, opcional): Altura mínima de uma linha. Padrão é 8.
+        padding (int, opcional): Margem adicionada em volta de cada recorte. Padrão é 6.
+        max_crops (int, opcional): Número máximo de recortes, os de maior área. Padrão é 6; None não limita.
+
+    Returns:
+        list: (recorte, left, top), com left/top relativos à imagem, do maior para o menor.
+    """
+    # Soma saturada dos canais: diferente de zero onde qualquer canal é diferente de zero
+    mask = cv2.transform(image, np.ones((1, 3), np.float32)) if image.ndim == 3 else image
+    _, mask = cv2.threshold(mask, 0, 1, cv2.THRESH_BINARY)
+    mask = cv2.dilate(mask, np.ones((gap_y, gap_x), np.uint8))
+    n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    crops = []
+    lines = [line for line in stats[1:] if line[2] >= min_width and line[3] >= min_height]  # 0 é o fundo
+    lines.sort(key=lambda line: int(line[4]), reverse=True)  # maior número de pixels primeiro
+    for x, y, w, h, _ in lines[:max_crops]:
+        x1, y1 = max(x - padding, 0), max(y - padding, 0)
+        x2, y2 = min(x + w + padding, image.shape[1]), min(y + h + padding, image.shape[0])
+        crops.append((np.ascontiguousarray(image[y1:y2, x1:x2]), int(x1), int(y1)))
+    return crops
+
+
+class OcrService:
+    """
+    Serviço de OCR em segundo plano, com um pequeno pool de threads.
+
+    O pytesseract já roda o Tesseract num processo separado (um executável por chamada), então as threads
+    só esperam por ele, e as leituras rodam em paralelo de verdade. Um pool de processos não traria ganho e,
+    no Windows (spawn), cada processo reimportaria o script principal com todos os efeitos colaterais dele.
+
+    submit() retorna imediatamente um Future com o resultado do pytesseract.image_to_data, de modo que quem
+    chama pode continuar verificando a tela enquanto o Tesseract trabalha. Pedidos para uma imagem idêntica
+    (mesmo conteúdo e mesma configuração) a uma que ainda está em processamento recebem o mesmo Future, e os
+    resultados das últimas 'cache_size' imagens ficam guardados: um nome de NPC parado na tela não é lido
+    de novo a cada consulta.
+    """
+
+    def __init__(self, workers=2, tesseract_cmd=None, cache_size=64):
+        """
+        Args:
+            workers (int, opcional): Número de threads do pool (leituras simultâneas). Padrão é 2.
+            tesseract_cmd (str, opcional): Caminho do executável do Tesseract. Se None, usa o do PATH.
+            cache_size (int, opcional): Número de resultados guardados (por hash da imagem). Padrão é 64.
+        """
+        self.workers = workers
+        self.tesseract_cmd = tesseract_cmd
+        self.cache_size = cache_size
+        self.requests = 0
+        self.deduplicated = 0
+        self.cache_hits = 0
+        self._executor = None
+        self._pending = {}
+        self._results = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(image, config):
+        """
+        Chave de deduplicação: hash do conteúdo da imagem, do formato e da configuração do Tesseract.
+        """
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+        digest.update(repr((image.shape, str(image.dtype), config)).encode())
+        return digest.hexdigest()
+
+    def submit(self, image, config="", tesseract_cmd=None):
+        """
+        Envia uma imagem (numpy.ndarray) para o OCR.
+
+        Args:
+            image (numpy.ndarray): Imagem (ou recorte) a ser lida.
+            config (str, opcional): Configuração do Tesseract. Padrão é "".
+            tesseract_cmd (str, opcional): Caminho do executável; se None, usa o do serviço.
+
+        Returns:
+            Future: Resultado do image_to_data (dicionário), ou None se o Tesseract não estiver instalado.
+        """
+        key = self.key(image, config)
+        with self._lock:
+            self.requests += 1
+            if key in self._results:
+                self.cache_hits += 1
+                self._results.move_to_end(key)
+                future = Future()
+                future.set_result(self._results[key])
+                return future
+            future = self._pending.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+            future = self._executor.submit(_image_to_data, image, config, tesseract_cmd or self.tesseract_cmd)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._done(key, f))
+        return future
+
+    def _done(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if not future.cancelled() and future.exception() is None:
+                self._results[key] = future.result()
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+
+    def summary(self):
+        return (f"ocr: {self.requests} requests, {self.cache_hits} cached, {self.deduplicated} deduplicated, "
+                f"{self.requests - self.cache_hits - self.deduplicated} tesseract runs")
+
+    def close(self):
+        """
+        Encerra o pool de threads, sem esperar pelos pedidos em andamento.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._pending.clear()
+            self._results.clear()
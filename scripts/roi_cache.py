@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class RoiCache:
+    """
+    Cache das regiões da tela onde cada template costuma aparecer, aprendido automaticamente e salvo em JSON.
+
+    A primeira vez que um template é encontrado numa busca em tela cheia, a caixa encontrada (com uma margem)
+    passa a ser a região de busca daquele template. Depois de 'max_misses' buscas consecutivas sem sucesso
+    na região aprendida, miss() pede uma busca em tela cheia: a região só muda se o template for encontrado
+    em outro lugar (learn); se ele simplesmente não estiver na tela, como o botão de puxar fora do minigame,
+    a região é mantida. Regiões fixas (static) nunca são verificadas em tela cheia. O cache é invalidado
+    quando a origem da janela do jogo (x0, y0) muda.
+
+    Todas as operações são protegidas por um lock (o cache é usado pelas threads de busca e pela thread de
+    interrupções). As mudanças são gravadas no máximo a cada 'save_interval' segundos; flush() grava o que
+    estiver pendente (por exemplo, ao sair).
+
+    O objeto se comporta como um dicionário somente leitura (name in cache, cache[name]).
+    """
+
+    def __init__(self, path, origin, padding=20, max_misses=30, static=None, save_interval=5.0):
+        """
+        Args:
+            path (str): Caminho do arquivo JSON (resources/regions.json).
+            origin (tuple): Origem (x0, y0) da janela do jogo.
+            padding (int, opcional): Margem, em pixels, adicionada em volta da caixa aprendida. Padrão é 20.
+            max_misses (int, opcional): Falhas consecutivas na região aprendida antes de uma busca em tela cheia. Padrão é 30.
+            static (dict, opcional): Regiões fixas, que nunca são aprendidas nem descartadas.
+            save_interval (float, opcional): Intervalo mínimo, em segundos, entre gravações do arquivo. Padrão é 5.
+        """
+        self.path = path
+        self.origin = tuple(origin)
+        self.padding = padding
+        self.max_misses = max_misses
+        self.static = dict(static or {})
+        self.save_interval = save_interval
+        self.learned = {}
+        self.misses = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self._lock = threading.RLock()
+        self.load()
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self.static or name in self.learned
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name in self.static:
+                return self.static[name]
+            return self.learned[name]
+
+    def get(self, name, default=None):
+        with self._lock:
+            if name in self.static:
+                return self.static[name]
+            return self.learned.get(name, default)
+
+    def load(self):
+        """
+        Lê o arquivo JSON, ignorando o conteúdo se ele foi salvo com outra origem de janela.
+
+        Arquivos no formato antigo (um dicionário simples nome -> região) são aceitos como se tivessem
+        sido salvos com a origem atual.
+        """
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if "regions" in data and "origin" in data:
+            if tuple(data["origin"]) != self.origin:
+                return
+            data = data["regions"]
+        with self._lock:
+            self.learned = {name: tuple(region) for name, region in data.items() if name not in self.static}
+
+    def save(self):
+        """
+        Grava as regiões aprendidas de forma atômica (arquivo temporário no mesmo diretório + os.replace).
+        """
+        with self._lock:
+            self._dirty = False
+            self._last_save = time.monotonic()
+            contents = {"origin": list(self.origin), "regions": {k: list(v) for k, v in self.learned.items()}}
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(contents, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+
+    def flush(self):
+        """
+        Grava o arquivo se houver mudanças ainda não gravadas.
+        """
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+    def _changed(self):
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def learn(self, name, box):
+        """
+        Registra a região (com margem) de um template encontrado numa busca em tela cheia.
+        """
+        if name in self.static:
+            return
+        with self._lock:
+            self.learned[name] = (max(int(box.left) - self.padding, 0), max(int(box.top) - self.padding, 0),
+                                  int(box.width) + 2 * self.padding, int(box.height) + 2 * self.padding)
+            self.misses[name] = 0
+            self._changed()
+
+    def hit(self, name):
+        with self._lock:
+            self.misses[name] = 0
+
+    def miss(self, name):
+        """
+        Conta uma busca sem sucesso na região aprendida.
+
+        Returns:
+            bool: True a cada max_misses falhas seguidas, quando quem chamou deve procurar o template em tela
+            cheia (e chamar learn() se o encontrar). A região é mantida até lá.
+        """
+        with self._lock:
+            if name in self.static or name not in self.learned:
+                return False
+            self.misses[name] = self.misses.get(name, 0) + 1
+            if self.misses[name] < self.max_misses:
+                return False
+            self.misses[name] = 0
+            return True
+
+    def set_origin(self, origin):
+        """
+        Atualiza a origem da janela; se ela mudou, todas as regiões aprendidas são descartadas.
+        """
+        origin = tuple(origin)
+        with self._lock:
+            if origin != self.origin:
+                self.origin = origin
+                self.learned.clear()
+                self.misses.clear()
+                self.save()
+
+    def reset(self):
+        """
+        Descarta as regiões aprendidas e remove o arquivo JSON.
+        """
+        with self._lock:
+            self.learned.clear()
+            self.misses.clear()
+            self._dirty = False
+            if os.path.exists(self.path):
+                os.unlink(self.path)
@@ -0,0 +1,72 @@
+import collections
+
+
+class StateProber:
+    """
+    Decide em que ordem verificar os estados de uma máquina de estados detectada por templates.
+
+    A partir do estado anterior, os estados são verificados do mais provável para o menos provável: a
+    probabilidade vem das transições observadas, somadas a uma tabela declarativa de transições esperadas
+    (usada enquanto ainda há poucas observações). Como quem chama para no primeiro estado encontrado, o
+    estado mais provável costuma custar uma única busca de template em vez de percorrer a lista inteira.
+
+    Parar no primeiro estado encontrado pode esconder um estado de maior prioridade visível ao mesmo tempo
+    (por exemplo, o minigame ainda mostrando o botão de espera). Os estados em 'first' nunca ficam escondidos:
+    são sempre verificados antes dos demais, na ordem de prioridade. Para os outros, a cada 'full_sweep_every'
+    verificações é feita uma varredura completa na ordem de prioridade original, para que um estado
+    sobreposto não fique escondido por muito tempo.
+    """
+
+    def __init__(self, states, transitions=None, full_sweep_every=10, first=()):
+        """
+        Args:
+            states (iterable): Estados na ordem de prioridade original (a ordem da varredura completa).
+            transitions (dict, opcional): Estado anterior -> estados seguintes esperados, do mais para o menos
+                provável. Estados anteriores ausentes usam só as transições observadas.
+            full_sweep_every (int, opcional): A cada quantas verificações fazer uma varredura completa. Padrão é 10.
+            first (iterable, opcional): Estados sempre verificados primeiro, na ordem de prioridade.
+        """
+        self.states = list(states)
+        self.transitions = transitions or {}
+        self.full_sweep_every = full_sweep_every
+        self.first = [state for state in self.states if state in set(first)]
+        self.counts = collections.defaultdict(collections.Counter)
+        self.ticks = 0
+        self.probes = 0
+        self.full_sweeps = 0
+
+    def order(self, prev_status):
+        """
+        Retorna a lista de estados a verificar, na ordem, a partir do estado anterior.
+        """
+        if self.full_sweep_every and self.ticks % self.full_sweep_every == 0:
+            self.full_sweeps += 1
+            return list(self.states)
+        likely = self.transitions.get(prev_status, ())
+        # A tabela declarativa vale menos que uma observação: só desempata enquanto não há transições vistas
+        prior = {state: (len(likely) - i) / (len(likely) + 1) for i, state in enumerate(likely)}
+        counts = self.counts[prev_status]
+        rest = [state for state in self.states if state not in self.first]
+        return self.first + sorted(rest, key=lambda state: -(counts[state] + prior.get(state, 0)))
+
+    def observe(self, prev_status, state, probes):
+        """
+        Registra o resultado de uma verificação.
+
+        Args:
+            prev_status: Estado anterior.
+            state: Estado encontrado (um dos estados verificados), ou None se nenhum foi encontrado.
+            probes (int): Número de buscas de template feitas nesta verificação.
+        """
+        self.ticks += 1
+        self.probes += probes
+        if state is not None:
+            self.counts[prev_status][state] += 1
+
+    @property
+    def probes_per_tick(self):
+        return self.probes / self.ticks if self.ticks else 0.0
+
+    def summary(self):
+        return (f"state prober: {self.ticks} ticks, {self.probes_per_tick:.2f} template matches/tick "
+                f"(full sweep: {len(self.states)}), {self.full_sweeps} full sweeps")
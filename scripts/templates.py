@@ -0,0 +1,281 @@
+import collections
+import os
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import cv2
+import numpy as np
+
+Box = collections.namedtuple('Box', 'left top width height')
+COARSE_MIN_SIZE = 8  # menor lado, em pixels, de um template reduzido na busca em pirâmide
+
+
+class Template:
+    """
+    Um template decodificado uma única vez, com a versão em cinza e as escalas reduzidas guardadas.
+
+    Attributes:
+        bgr (numpy.ndarray): Imagem em BGR, como lida pelo cv2.imread.
+        gray (numpy.ndarray): Versão em escala de cinza.
+        decode_time (float): Tempo (s) gasto para ler e decodificar o PNG.
+    """
+
+    def __init__(self, path):
+        t0 = time.perf_counter()
+        bgr = cv2.imread(path)
+        if bgr is None:
+            raise FileNotFoundError(f"Não foi possível abrir o template {path}.")
+        self.path = path
+        self.bgr = bgr
+        self.gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        self.decode_time = time.perf_counter() - t0
+        self.n_matches = 0
+        self.match_time = 0.0
+        self._levels = {}
+
+    def level(self, grayscale=False, scale=1.0):
+        """
+        Retorna o template em BGR ou cinza, na escala pedida (reduções calculadas uma única vez).
+        """
+        if scale == 1.0:
+            return self.gray if grayscale else self.bgr
+        key = (grayscale, scale)
+        image = self._levels.get(key)
+        if image is None:
+            base = self.level(grayscale)
+            size = (max(int(base.shape[1] * scale), 1), max(int(base.shape[0] * scale), 1))
+            image = self._levels[key] = cv2.resize(base, size, interpolation=cv2.INTER_AREA)
+        return image
+
+    @property
+    def width(self):
+        return self.bgr.shape[1]
+
+    @property
+    def height(self):
+        return self.bgr.shape[0]
+
+
+class Haystack:
+    """
+    Imagem onde vários templates serão procurados, com as conversões (cinza, escalas reduzidas) feitas uma
+    única vez e compartilhadas entre todas as buscas.
+    """
+
+    def __init__(self, bgr):
+        self.bgr = bgr
+        self._levels = {}
+
+    def level(self, grayscale=False, scale=1.0):
+        """
+        Retorna a imagem em BGR ou cinza, na escala pedida, calculando-a apenas na primeira vez.
+        """
+        key = (grayscale, scale)
+        image = self._levels.get(key)
+        if image is None:
+            if scale != 1.0:
+                base = self.level(grayscale)
+                size = (max(int(base.shape[1] * scale), 1), max(int(base.shape[0] * scale), 1))
+                image = cv2.resize(base, size, interpolation=cv2.INTER_AREA)
+            elif grayscale and self.bgr.ndim == 3:
+                image = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+            else:
+                image = self.bgr
+            self._levels[key] = image
+        return image
+
+
+def crop_rect(image, rect):
+    """
+    Recorta (como visão) o retângulo (x, y, largura, altura) de uma imagem, limitado às bordas dela.
+    """
+    if rect is None:
+        return image, 0, 0
+    x1, y1 = max(int(rect[0]), 0), max(int(rect[1]), 0)
+    x2, y2 = min(int(rect[0] + rect[2]), image.shape[1]), min(int(rect[1] + rect[3]), image.shape[0])
+    return image[y1:max(y1, y2), x1:max(x1, x2)], x1, y1
+
+
+class TemplateStore:
+    """
+    Carrega todos os templates PNG dos diretórios de recursos uma única vez e faz as buscas em memória.
+
+    Os templates podem ser pedidos pelo nome (chave de im_data) ou pelo caminho do arquivo; caminhos
+    que não estavam nos diretórios pré-carregados são lidos na primeira vez e mantidos em cache.
+    """
+
+    def __init__(self, names=None, directories=()):
+        self.names = dict(names or {})
+        self._templates = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._executor = None
+        for directory in directories:
+            for filename in sorted(os.listdir(directory)):
+                if filename.lower().endswith(".png"):
+                    self.get(os.path.join(directory, filename))
+
+    def get(self, name_or_path):
+        """
+        Retorna o Template correspondente a um nome de im_data ou a um caminho de arquivo.
+        """
+        path = os.path.normpath(self.names.get(name_or_path, name_or_path))
+        template = self._templates.get(path)
+        if template is None:
+            # Buscas do match_many em threads diferentes podem pedir o mesmo template ainda não carregado
+            with self._load_lock:
+                template = self._templates.get(path)
+                if template is None:
+                    template = Template(path)
+                    self._templates[path] = template
+        return template
+
+    def match(self, name_or_path, haystack, grayscale=False, coarse=None):
+        """
+        Calcula a melhor correspondência do template na imagem.
+
+        Args:
+            name_or_path (str): Nome do template em im_data ou caminho do arquivo.
+            haystack (numpy.ndarray ou Haystack): Imagem BGR onde procurar (convertida para cinza se grayscale=True).
+            grayscale (bool, opcional): Se True, compara as versões em escala de cinza. Padrão é False.
+            coarse (tuple, opcional): (escala, candidatos) para a busca em pirâmide: a busca é feita primeiro
+                na imagem reduzida e só os 'candidatos' melhores picos são refinados em resolução total.
+                Se None, a busca é exata em resolução total.
+
+        Returns:
+            tuple: (Box, score) da melhor posição, relativa à imagem, ou (None, 0.0) se o template não couber nela.
+        """
+        template = self.get(name_or_path)
+        if coarse is not None and not isinstance(haystack, Haystack):
+            haystack = Haystack(haystack)
+        source = haystack if isinstance(haystack, Haystack) else None
+        if source is not None:
+            haystack = source.level(grayscale)
+        elif grayscale and haystack.ndim == 3:
+            haystack = cv2.cvtColor(haystack, cv2.COLOR_BGR2GRAY)
+        needle = template.level(grayscale)
+        if haystack.shape[0] < needle.shape[0] or haystack.shape[1] < needle.shape[1]:
+            return None, 0.0
+        t0 = time.perf_counter()
+        if coarse is None:
+            x, y, score = self._match_exact(haystack, needle)
+        else:
+            x, y, score = self._match_coarse_to_fine(template, source, haystack, grayscale, *coarse)
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            template.n_matches += 1
+            template.match_time += elapsed
+        return Box(x, y, template.width, template.height), score
+
+    @staticmethod
+    def _match_exact(haystack, needle):
+        result = cv2.matchTemplate(haystack, needle, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (x, y) = cv2.minMaxLoc(result)
+        return x, y, score
+
+    def _match_coarse_to_fine(self, template, source, haystack, grayscale, scale, candidates):
+        needle = template.level(grayscale)
+        # Templates pequenos usam uma escala menos reduzida (em passos de 1/8, para compartilhar os níveis),
+        # de forma que a versão reduzida mantenha pelo menos COARSE_MIN_SIZE pixels no menor lado
+        scale = max(scale, float(np.ceil(COARSE_MIN_SIZE / min(needle.shape[:2]) * 8)) / 8)
+        if scale > 0.5:
+            return self._match_exact(haystack, needle)
+        coarse_haystack = source.level(grayscale, scale)
+        coarse_needle = template.level(grayscale, scale)
+        if coarse_haystack.shape[0] < coarse_needle.shape[0] or coarse_haystack.shape[1] < coarse_needle.shape[1]:
+            return self._match_exact(haystack, needle)
+        result = cv2.matchTemplate(coarse_haystack, coarse_needle, cv2.TM_CCOEFF_NORMED)
+        needle_h, needle_w = needle.shape[:2]
+        coarse_h, coarse_w = coarse_needle.shape[:2]
+        margin = int(np.ceil(1 / scale)) + 2
+        best = (0, 0, -1.0)
+        for _ in range(candidates):
+            _, peak, _, (cx, cy) = cv2.minMaxLoc(result)
+            if peak <= -1.0:
+                break
+            # Refina em resolução total apenas numa janela em volta do pico do nível reduzido
+            x1 = max(int(cx / scale) - margin, 0)
+            y1 = max(int(cy / scale) - margin, 0)
+            x2 = min(int(cx / scale) + needle_w + margin, haystack.shape[1])
+            y2 = min(int(cy / scale) + needle_h + margin, haystack.shape[0])
+            if x2 - x1 >= needle_w and y2 - y1 >= needle_h:
+                x, y, score = self._match_exact(haystack[y1:y2, x1:x2], needle)
+                if score > best[2]:
+                    best = (x + x1, y + y1, score)
+            # Suprime a vizinhança do pico para que o próximo candidato seja outro elemento da tela
+            result[max(cy - coarse_h // 2, 0):cy + coarse_h // 2 + 1,
+                   max(cx - coarse_w // 2, 0):cx + coarse_w // 2 + 1] = -1.0
+        return best
+
+    def match_many(self, jobs, haystack, grayscale=False, workers=4, coarse=None):
+        """
+        Busca vários templates sobre a mesma imagem de uma só vez.
+
+        A conversão para cinza é feita uma única vez para todos os templates, e as buscas rodam em paralelo num
+        pequeno pool de threads (o cv2.matchTemplate libera o GIL). Buscas repetidas (mesmo template e mesmo
+        retângulo) são feitas uma única vez.
+
+        Args:
+            jobs (dict): Chave -> (nome ou caminho do template, retângulo (x, y, largura, altura) ou None).
+            haystack (numpy.ndarray ou Haystack): Imagem BGR onde procurar.
+            grayscale (bool, opcional): Se True, compara as versões em escala de cinza. Padrão é False.
+            workers (int, opcional): Número de threads do pool. Padrão é 4; 1 executa tudo na thread atual.
+            coarse (tuple, opcional): (escala, candidatos) da busca em pirâmide, usada nos jobs sem retângulo.
+
+        Returns:
+            dict: Chave -> (Box relativo à imagem inteira, score), ou (None, 0.0) se o template não couber.
+        """
+        if not isinstance(haystack, Haystack):
+            haystack = Haystack(haystack)
+        image = haystack.level(grayscale)
+        if coarse is not None:
+            haystack.level(grayscale, coarse[0])  # calculado antes de distribuir as buscas entre as threads
+
+        def task(name_or_path, rect):
+            if rect is None:
+                return self.match(name_or_path, haystack, grayscale, coarse)
+            crop, left, top = crop_rect(image, rect)
+            box, score = self.match(name_or_path, crop, grayscale)
+            if box is not None:
+                box = Box(box.left + left, box.top + top, box.width, box.height)
+            return box, score
+
+        unique = {}
+        for name_or_path, rect in jobs.values():
+            unique.setdefault((name_or_path, rect and tuple(rect)), None)
+        if workers > 1 and len(unique) > 1:
+            with self._load_lock:  # match_many também é chamado pela thread de interrupções
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="match")
+            futures = {job: self._executor.submit(task, *job) for job in unique}
+            unique = {job: future.result() for job, future in futures.items()}
+        else:
+            unique = {job: task(*job) for job in unique}
+        return {key: unique[(name_or_path, rect and tuple(rect))] for key, (name_or_path, rect) in jobs.items()}
+
+    def locate(self, name_or_path, haystack, confidence=0.8, grayscale=False):
+        """
+        Localiza o template na imagem, retornando o Box relativo à imagem ou None se o score ficar abaixo da confiança.
+        """
+        box, score = self.match(name_or_path, haystack, grayscale)
+        return box if box is not None and score >= confidence else None
+
+    def report(self, only_used=False):
+        """
+        Retorna um resumo, por template, do custo de decodificação e do custo médio de busca.
+
+        Args:
+            only_used (bool, opcional): Se True, lista apenas templates que já foram buscados. Padrão é False.
+
+        Returns:
+            list: Linhas de texto no formato "<arquivo>: decode X ms, N matches, Y ms/match".
+        """
+        lines = []
+        for path, template in sorted(self._templates.items()):
+            if only_used and not template.n_matches:
+                continue
+            per_match = template.match_time / template.n_matches * 1000 if template.n_matches else 0.0
+            lines.append(f"{os.path.basename(path)}: decode {template.decode_time * 1000:.2f} ms, "
+                         f"{template.n_matches} matches, {per_match:.2f} ms/match")
+        return lines
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do bot ficam em scripts/ e são importados pelo nome, como nos próprios scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from bar import analyze_bar
+from benchmark import legacy_bar, synthetic_bar_rows
+
+GREEN = (111, 44, 35)
+
+
+def assert_same_as_legacy(row):
+    current, bounds, bound_range, green = legacy_bar(row, green_rgb=GREEN)
+    reading = analyze_bar(row, green_rgb=GREEN)
+    assert reading.marker == current
+    assert reading.n_bounds == bounds.shape[0]
+    assert reading.bound_range == bound_range
+    if bounds.shape[0]:
+        assert (reading.first_bound, reading.last_bound) == (bounds[0], bounds[-1])
+    else:
+        assert reading.first_bound is None and reading.last_bound is None
+    assert reading.green == pytest.approx(green)
+    assert reading.width == row.shape[1]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_legacy_loop_on_synthetic_rows(seed):
+    rows = synthetic_bar_rows(n=200, seed=seed)
+    for row in rows:
+        assert_same_as_legacy(row)
+    assert any(analyze_bar(row).marker is not None for row in rows)
+    assert any(analyze_bar(row).marker is None for row in rows)
+
+
+def uniform_row(width=100, value=120):
+    return np.full((2, width, 3), value, dtype=np.uint8)
+
+
+def test_marker_position():
+    row = uniform_row()
+    row[:, 40:60] = 0
+    assert analyze_bar(row).marker == 40 - 8
+    assert_same_as_legacy(row)
+
+
+def test_short_dark_run_is_not_a_marker():
+    row = uniform_row()
+    row[:, 40:51] = 0  # sequência de 11 pixels, mas sem o pixel escuro extra exigido pelo laço antigo
+    assert analyze_bar(row).marker is None
+    assert_same_as_legacy(row)
+    row[:, 90] = 0
+    assert analyze_bar(row).marker == 40 - 8
+    assert_same_as_legacy(row)
+
+
+def test_first_long_run_wins_over_short_runs_before_it():
+    row = uniform_row()
+    row[:, 10:15] = 0
+    row[:, 30:45] = 0
+    row[:, 70:90] = 0
+    assert analyze_bar(row).marker == 30 - 8
+    assert_same_as_legacy(row)
+
+
+@pytest.mark.parametrize("value", [0, 120, 255])
+def test_uniform_rows(value):
+    assert_same_as_legacy(uniform_row(value=value))
+
+
+def test_bounds_and_green():
+    row = uniform_row()
+    row[:, 20] = 230
+    row[:, 80] = 230
+    row[0, 50:75] = GREEN
+    reading = analyze_bar(row, green_rgb=GREEN)
+    assert (reading.first_bound, reading.last_bound, reading.n_bounds, reading.bound_range) == (20, 80, 2, 60)
+    assert reading.green == pytest.approx(25 / 200)
+    assert analyze_bar(row).green is None
+    assert_same_as_legacy(row)
+
+
+def test_single_bound_has_zero_range():
+    row = uniform_row()
+    row[:, 20] = 230
+    reading = analyze_bar(row)
+    assert (reading.first_bound, reading.last_bound, reading.bound_range) == (20, 20, 0)
+    assert_same_as_legacy(row)
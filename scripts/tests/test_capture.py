@@ -0,0 +1,143 @@
+import threading
+import time
+
+import numpy as np
+
+from capture import CaptureThread, ChangeGate, Frame, FrameSource, ReplaySource, crop_region
+
+
+def test_frame_crop_is_clipped_view_with_absolute_origin():
+    image = np.arange(10 * 20 * 3, dtype=np.uint8).reshape(10, 20, 3)
+    frame = Frame(image, left=100, top=50)
+    view, left, top = frame.crop((95, 55, 10, 20))
+    assert (left, top) == (100, 55)
+    assert view.shape == (5, 5, 3)
+    assert np.shares_memory(view, image)
+    assert frame.crop((0, 0, 10, 10))[0].size == 0
+    assert frame.crop()[0] is image
+
+
+def test_frame_pixel_is_rgb():
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    image[1, 2] = (10, 20, 30)  # BGR
+    frame = Frame(image, left=5, top=5)
+    assert tuple(frame.pixel(7, 6)) == (30, 20, 10)
+    assert frame.pixel_match_color(7, 6, (32, 18, 10), tolerance=2)
+    assert not frame.pixel_match_color(7, 6, (33, 20, 10), tolerance=2)
+
+
+def test_crop_region():
+    image = np.zeros((10, 20, 3), dtype=np.uint8)
+    assert crop_region(image, (5, 2, 100, 3)).shape == (3, 15, 3)
+    assert crop_region(image, None) is image
+
+
+class CounterSource(FrameSource):
+    """
+    Cada captura é um quadro uniforme com o número da captura, para detectar quadros misturados.
+    """
+
+    def __init__(self, shape=(40, 60, 3)):
+        self.shape = shape
+        self.n = 0
+
+    def grab(self, region=None):
+        self.n += 1
+        return np.full(self.shape, self.n % 256, dtype=np.uint8)
+
+
+def started(source, **kwargs):
+    thread = CaptureThread(source, **kwargs)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while thread.latest() is None and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return thread
+
+
+def test_latest_copies_only_the_region():
+    thread = started(CounterSource(), region=(10, 20, 60, 40), fps=200)
+    try:
+        frame = thread.latest(region=(15, 25, 4, 3))
+        assert frame.image.shape == (3, 4, 3)
+        assert (frame.left, frame.top) == (15, 25)
+        assert frame.seq >= 1
+        assert not any(np.shares_memory(frame.image, buffer) for buffer in thread.buffers)
+    finally:
+        thread.stop()
+        thread.join()
+
+
+def test_latest_rejects_old_frames():
+    thread = started(CounterSource(), fps=200)
+    thread.stop()
+    thread.join()
+    assert thread.latest(max_age=10) is not None
+    time.sleep(0.02)
+    assert thread.latest(max_age=0.01) is None
+    with thread.lease(max_age=0.01) as frame:
+        assert frame is None
+
+
+def test_leased_buffer_is_never_overwritten():
+    thread = started(CounterSource(), fps=1000)
+    torn = []
+
+    def reader():
+        for _ in range(200):
+            with thread.lease() as frame:
+                value = frame.image[0, 0, 0]
+                time.sleep(0.0005)
+                if not (frame.image == value).all():
+                    torn.append(frame.seq)
+
+    try:
+        readers = [threading.Thread(target=reader) for _ in range(3)]
+        for r in readers:
+            r.start()
+        for r in readers:
+            r.join()
+    finally:
+        thread.stop()
+        thread.join()
+    assert not torn
+    assert not any(thread.leases)
+
+
+def test_replay_source_loops(tmp_path):
+    frames = np.stack([np.full((4, 6, 3), i, dtype=np.uint8) for i in range(3)])
+    path = str(tmp_path / "frames.npz")
+    np.savez(path, frames=frames)
+    source = ReplaySource(path)
+    assert [source.grab()[0, 0, 0] for _ in range(4)] == [0, 1, 2, 0]
+    assert source.grab((1, 1, 2, 2)).shape == (2, 2, 3)
+
+
+def test_change_gate_reuses_until_the_region_changes():
+    gate = ChangeGate(cell=4, threshold=10, max_reuse=60)
+    image = np.full((16, 16, 3), 100, dtype=np.uint8)
+    reused, _, signature = gate.lookup("key", image)
+    assert not reused
+    gate.store("key", signature, "result")
+    assert gate.lookup("key", image + 5)[:2] == (True, "result")
+    assert not gate.lookup("key", image + 20)[0]
+    assert not gate.lookup("other", image)[0]
+    assert gate.skip_ratio == 1 / 4
+
+
+def test_change_gate_sees_colour_only_changes():
+    gate = ChangeGate(cell=4, threshold=10, max_reuse=60)
+    gray = np.full((16, 16, 3), 100, dtype=np.uint8)
+    coloured = gray.copy()
+    coloured[:, :] = (70, 100, 125)  # cinza quase igual (104), outra cor
+    _, _, signature = gate.lookup("key", gray)
+    gate.store("key", signature, "result")
+    assert not gate.lookup("key", coloured)[0]
+
+
+def test_change_gate_expires():
+    gate = ChangeGate(cell=4, max_reuse=0.01)
+    image = np.zeros((16, 16, 3), dtype=np.uint8)
+    gate.store("key", gate.signature(image), "result")
+    time.sleep(0.02)
+    assert not gate.lookup("key", image)[0]
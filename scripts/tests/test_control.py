@@ -0,0 +1,46 @@
+import time
+
+from control import ControlLoop, PhaseTimer, WaitStats, wait_for
+
+
+def test_phase_timer_laps_and_records():
+    timer = PhaseTimer()
+    timer.lap("read")
+    timer.record("frame age", 0.03)
+    timer.lap("decision")
+    assert list(timer.times) == ["read", "frame age", "decision"]
+    assert timer.times["frame age"] == [0.03]
+
+
+def test_control_loop_runs_until_step_returns_false():
+    loop = ControlLoop(rate_hz=500)
+    calls = []
+
+    def step(timer):
+        timer.lap("work")
+        calls.append(1)
+        return len(calls) < 10
+
+    assert loop.run(step) == 10
+    assert len(loop.periods) == 9
+    lines = loop.report()
+    assert lines[0].startswith("control loop: 10 iterations at 500 Hz")
+    assert any(line.strip().startswith("work:") for line in lines)
+
+
+def test_wait_for_returns_as_soon_as_the_condition_holds():
+    stats = WaitStats()
+    ready_at = time.monotonic() + 0.02
+    t0 = time.monotonic()
+    assert wait_for(lambda: time.monotonic() >= ready_at and "box", 1.0, 0.005, stats=stats) == "box"
+    assert time.monotonic() - t0 < 0.5
+    assert (stats.waits, stats.timeouts, stats.budget) == (1, 0, 1.0)
+
+
+def test_wait_for_gone_and_timeout():
+    stats = WaitStats()
+    assert wait_for(lambda: False, 1.0, 0.005, gone=True, stats=stats) is True
+    t0 = time.monotonic()
+    assert wait_for(lambda: None, 0.03, 0.01, stats=stats) is None
+    assert time.monotonic() - t0 >= 0.03
+    assert stats.timeouts == 1
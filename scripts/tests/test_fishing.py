@@ -0,0 +1,33 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# util (e, por ele, fishing) importa o pyautogui, que no Linux precisa de um display (Xvfb)
+pytestmark = pytest.mark.skipif(sys.platform.startswith("linux") and not os.environ.get("DISPLAY"),
+                                reason="pyautogui precisa de um display")
+
+
+@pytest.fixture
+def fishing(monkeypatch, tmp_path):
+    monkeypatch.setenv("DIABLO_INPUT_BACKEND", "record")
+    fishing = importlib.import_module("fishing")
+    util = importlib.import_module("util")
+    monkeypatch.setattr(util, "regions", util.RoiCache(str(tmp_path / "regions.json"), (0, 0)))
+    monkeypatch.setattr(fishing, "activate_diablo", lambda: None)
+    monkeypatch.setattr(fishing, "cast_fishing_rod", lambda key, box: None)
+    monkeypatch.setattr(fishing.p, "sleep", lambda seconds: None)
+    return fishing
+
+
+def test_fish_runs_to_completion_and_logs_the_summaries(fishing, monkeypatch):
+    # Três STANDBY seguidos encerram o ciclo, que então registra as estatísticas
+    standby = fishing.Box(1540, 860, 100, 100)
+    monkeypatch.setattr(fishing, "check_status", lambda prev_status, fish_type="yellow": (fishing.STANDBY, standby))
+    lines = []
+    monkeypatch.setattr(fishing, "log", lines.append)
+    assert fishing.fish() is True
+    assert any(line.startswith("interrupt watcher:") for line in lines)
+    assert importlib.import_module("util").interrupt_watcher is None  # a thread de interrupções para com o fluxo
+    assert lines[-1].startswith("0 catches in")
@@ -0,0 +1,64 @@
+import time
+
+from inputs import LOW, NORMAL, URGENT, InputScheduler, RecordingBackend
+
+
+def actions(backend):
+    return [(action, args) for _, action, args in backend.events]
+
+
+def test_actions_run_in_due_order():
+    backend = RecordingBackend()
+    scheduler = InputScheduler(backend)
+    scheduler.submit("press", "b", delay=0.04)
+    scheduler.submit("press", "a", delay=0.02)
+    scheduler.submit("click", 1, 2)
+    assert scheduler.wait_idle(2)
+    assert actions(backend) == [("click", (1, 2, 1, 0.0, "left")), ("press", ("a", 0.0, 1)),
+                                ("press", ("b", 0.0, 1))]
+    assert scheduler.dispatched == 3
+    assert scheduler.idle()
+
+
+def test_priority_breaks_ties():
+    backend = RecordingBackend()
+    scheduler = InputScheduler(backend)
+    due = time.monotonic() + 0.05
+    with scheduler._condition:
+        scheduler._push(due, LOW, "press", ("low",), True)
+        scheduler._push(due, URGENT, "press", ("urgent",), True)
+        scheduler._push(due, NORMAL, "press", ("normal",), True)
+        scheduler._start()
+        scheduler._condition.notify()
+    assert scheduler.wait_idle(2)
+    assert [args[0] for _, args in actions(backend)] == ["urgent", "normal", "low"]
+
+
+def test_burst_with_duration_becomes_key_down_and_key_up():
+    backend = RecordingBackend()
+    scheduler = InputScheduler(backend)
+    last = scheduler.burst("e", 3, gap=(0.05, 0.06), duration=0.005)
+    assert scheduler.wait_idle(2)
+    assert time.monotonic() >= last
+    assert [action for action, _ in actions(backend)] == ["key_down", "key_up"] * 3
+
+
+def test_preempt_cancels_low_priority_but_keeps_key_up():
+    backend = RecordingBackend()
+    scheduler = InputScheduler(backend)
+    scheduler.burst("e", 5, gap=(0.05, 0.05), duration=0.2)
+    time.sleep(0.01)  # o primeiro key_down já saiu; o key_up está agendado
+    scheduler.submit("click", 10, 10, priority=URGENT, preempt=True)
+    assert scheduler.wait_idle(2)
+    assert actions(backend) == [("key_down", ("e",)), ("click", (10, 10, 1, 0.0, "left")), ("key_up", ("e",))]
+    assert scheduler.cancelled == 4
+
+
+def test_cancel_keeps_more_urgent_actions():
+    backend = RecordingBackend()
+    scheduler = InputScheduler(backend)
+    scheduler.submit("press", "low", delay=0.05, priority=LOW)
+    scheduler.submit("press", "normal", delay=0.05, priority=NORMAL)
+    scheduler.cancel(LOW)
+    assert scheduler.wait_idle(2)
+    assert actions(backend) == [("press", ("normal", 0.0, 1))]
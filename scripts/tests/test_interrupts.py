@@ -0,0 +1,59 @@
+import time
+
+from interrupts import InterruptWatcher
+
+
+def wait_for_checks(watcher, n):
+    deadline = time.monotonic() + 2
+    while watcher.checks < n and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_watcher_only_signals_until_the_flow_resolves():
+    screen = {"popup": ("party", (1, 2, 3, 4))}
+    watcher = InterruptWatcher(lambda: screen.get("popup", (None, None)), interval=0.01)
+    watcher.start()
+    try:
+        wait_for_checks(watcher, 1)
+        assert watcher.interrupted.wait(1)
+        assert watcher.take() == ("party", (1, 2, 3, 4))
+        assert watcher.take() is not None  # take() não consome o sinal: só resolved() o limpa
+        del screen["popup"]
+        watcher.resolved("party")
+        checks = watcher.checks
+        wait_for_checks(watcher, checks + 2)
+        assert watcher.take() is None
+        assert watcher.dismissed["party"] == 1
+    finally:
+        watcher.stop()
+        watcher.join()
+
+
+def test_resolved_clears_the_signal():
+    watcher = InterruptWatcher(lambda: (None, None))
+    watcher.pending = ("raid", (0, 0, 1, 1))
+    watcher.interrupted.set()
+    watcher.resolved("raid")
+    assert watcher.take() is None and not watcher.interrupted.is_set()
+    assert watcher.dismissed == {"raid": 1}
+
+
+def test_watcher_clears_when_the_popup_goes_away_and_survives_errors():
+    calls = []
+
+    def detect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("screen")
+        return ("lair", (0, 0, 1, 1)) if len(calls) == 2 else (None, None)
+
+    watcher = InterruptWatcher(detect, interval=0.01)
+    watcher.start()
+    try:
+        wait_for_checks(watcher, 4)
+        assert watcher.take() is None
+        assert watcher.last_status == "lair"
+        assert not watcher.dismissed
+    finally:
+        watcher.stop()
+        watcher.join()
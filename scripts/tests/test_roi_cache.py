@@ -0,0 +1,98 @@
+import json
+import threading
+
+from roi_cache import RoiCache
+from templates import Box
+
+
+def test_learn_adds_padding_and_saves(tmp_path):
+    path = str(tmp_path / "regions.json")
+    cache = RoiCache(path, (10, 20), padding=5, save_interval=0)
+    cache.learn("x", Box(3, 50, 10, 10))
+    assert cache["x"] == (0, 45, 20, 20)
+    with open(path) as f:
+        assert json.load(f) == {"origin": [10, 20], "regions": {"x": [0, 45, 20, 20]}}
+    assert RoiCache(path, (10, 20)).get("x") == (0, 45, 20, 20)
+
+
+def test_saved_regions_with_another_origin_are_ignored(tmp_path):
+    path = str(tmp_path / "regions.json")
+    RoiCache(path, (10, 20), save_interval=0).learn("x", Box(100, 100, 10, 10))
+    assert "x" not in RoiCache(path, (11, 20))
+
+
+def test_legacy_file_format(tmp_path):
+    path = tmp_path / "regions.json"
+    path.write_text(json.dumps({"x": [1, 2, 3, 4]}))
+    assert RoiCache(str(path), (0, 0))["x"] == (1, 2, 3, 4)
+
+
+def test_full_screen_recheck_after_max_misses(tmp_path):
+    cache = RoiCache(str(tmp_path / "regions.json"), (0, 0), max_misses=3)
+    cache.learn("x", Box(100, 100, 10, 10))
+    region = cache["x"]
+    assert not cache.miss("x")
+    assert not cache.miss("x")
+    cache.hit("x")
+    assert not cache.miss("x")
+    assert not cache.miss("x")
+    assert cache.miss("x")
+    # A região é mantida: só muda se quem chamou reencontrar o template em outro lugar
+    assert cache["x"] == region
+    assert not cache.miss("x")
+    assert not cache.miss("y")
+
+
+def test_static_regions_are_never_learned_or_rechecked(tmp_path):
+    cache = RoiCache(str(tmp_path / "regions.json"), (0, 0), max_misses=1, static={"x": (1, 2, 3, 4)})
+    cache.learn("x", Box(100, 100, 10, 10))
+    assert not cache.miss("x")
+    assert cache["x"] == (1, 2, 3, 4)
+    assert cache.get("y", "default") == "default"
+
+
+def test_saves_are_debounced_until_flush(tmp_path):
+    path = tmp_path / "regions.json"
+    cache = RoiCache(str(path), (0, 0), save_interval=60)
+    cache.learn("x", Box(100, 100, 10, 10))  # a primeira mudança é gravada na hora
+    cache.learn("y", Box(200, 100, 10, 10))
+    assert set(json.loads(path.read_text())["regions"]) == {"x"}
+    cache.flush()
+    assert set(json.loads(path.read_text())["regions"]) == {"x", "y"}
+
+
+def test_origin_change_clears_regions(tmp_path):
+    path = tmp_path / "regions.json"
+    cache = RoiCache(str(path), (0, 0))
+    cache.learn("x", Box(100, 100, 10, 10))
+    cache.set_origin((0, 0))
+    assert "x" in cache
+    cache.set_origin((5, 5))
+    assert "x" not in cache
+    assert json.loads(path.read_text()) == {"origin": [5, 5], "regions": {}}
+    cache.reset()
+    assert not path.exists()
+
+
+def test_concurrent_updates(tmp_path):
+    cache = RoiCache(str(tmp_path / "regions.json"), (0, 0), max_misses=2, save_interval=0)
+    errors = []
+
+    def worker(i):
+        try:
+            for j in range(200):
+                name = f"t{(i + j) % 5}"
+                cache.learn(name, Box(j, j, 10, 10))
+                cache.miss(name)
+                cache.get(name)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    cache.flush()
+    assert RoiCache(cache.path, (0, 0)).learned == cache.learned
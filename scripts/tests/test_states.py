@@ -0,0 +1,44 @@
+from states import StateProber
+
+STATES = ["pulling", "ready", "waiting", "standby", "pick"]
+TRANSITIONS = {"waiting": ["waiting", "ready"], "ready": ["pulling", "ready"]}
+
+
+def test_full_sweep_uses_priority_order():
+    prober = StateProber(STATES, TRANSITIONS, full_sweep_every=3)
+    assert prober.order("waiting") == STATES
+    assert prober.full_sweeps == 1
+
+
+def test_declared_transitions_order_until_observed():
+    prober = StateProber(STATES, TRANSITIONS, full_sweep_every=0)
+    assert prober.order("waiting")[:2] == ["waiting", "ready"]
+    assert prober.order("ready")[:2] == ["pulling", "ready"]
+    assert prober.order("unknown") == STATES
+
+
+def test_observations_override_declared_transitions():
+    prober = StateProber(STATES, TRANSITIONS, full_sweep_every=0)
+    prober.observe("waiting", "standby", 4)
+    assert prober.order("waiting")[0] == "standby"
+    prober.observe("waiting", None, 5)
+    assert prober.probes_per_tick == 4.5
+    assert prober.ticks == 2
+
+
+def test_full_sweep_every_n_ticks():
+    prober = StateProber(STATES, TRANSITIONS, full_sweep_every=4)
+    sweeps = []
+    for _ in range(8):
+        sweeps.append(prober.order("waiting") == STATES)
+        prober.observe("waiting", "waiting", 1)
+    assert sweeps == [True, False, False, False, True, False, False, False]
+
+
+def test_first_states_are_always_probed_first():
+    prober = StateProber(STATES, TRANSITIONS, full_sweep_every=0, first=["ready", "pulling"])
+    for _ in range(5):
+        prober.observe("waiting", "waiting", 1)
+    order = prober.order("waiting")
+    assert order[:3] == ["pulling", "ready", "waiting"]
+    assert sorted(order) == sorted(STATES)
@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+import pytest
+
+from templates import Haystack, TemplateStore, crop_rect
+
+
+@pytest.fixture
+def screen_and_store(tmp_path):
+    rng = np.random.default_rng(0)
+    screen = cv2.GaussianBlur(rng.integers(0, 256, (300, 400, 3)).astype(np.uint8), (3, 3), 0)
+    template = screen[120:160, 250:310].copy()
+    path = str(tmp_path / "button.png")
+    cv2.imwrite(path, template)
+    return screen, TemplateStore({"button": path})
+
+
+def test_match_by_name_and_path(screen_and_store):
+    screen, store = screen_and_store
+    box, score = store.match("button", screen)
+    assert tuple(box) == (250, 120, 60, 40)
+    assert score > 0.99
+    assert store.get(store.names["button"]) is store.get("button")
+    assert store.get("button").n_matches == 1
+
+
+def test_grayscale_match(screen_and_store):
+    screen, store = screen_and_store
+    box, _ = store.match("button", screen, grayscale=True)
+    assert (box.left, box.top) == (250, 120)
+
+
+def test_coarse_to_fine_finds_the_same_box(screen_and_store):
+    screen, store = screen_and_store
+    exact = store.match("button", screen)
+    coarse = store.match("button", Haystack(screen), coarse=(0.25, 3))
+    assert coarse[0] == exact[0]
+    assert coarse[1] == pytest.approx(exact[1], abs=1e-4)
+
+
+def test_template_larger_than_haystack(screen_and_store):
+    screen, store = screen_and_store
+    assert store.match("button", screen[:10, :10]) == (None, 0.0)
+
+
+def test_match_many_returns_absolute_boxes(screen_and_store):
+    screen, store = screen_and_store
+    results = store.match_many({
+        "full": ("button", None),
+        "region": ("button", (200, 100, 150, 100)),
+        "same_region": ("button", (200, 100, 150, 100)),
+        "elsewhere": ("button", (0, 0, 100, 100)),
+    }, screen)
+    assert results["full"][0] == results["region"][0] == results["same_region"][0]
+    assert tuple(results["region"][0]) == (250, 120, 60, 40)
+    assert results["elsewhere"][1] < 0.9
+    assert store.get("button").n_matches == 3  # a busca repetida é feita uma única vez
+
+
+def test_locate_applies_confidence(screen_and_store):
+    screen, store = screen_and_store
+    assert store.locate("button", screen, confidence=0.9) is not None
+    assert store.locate("button", screen[:, :200], confidence=0.9) is None
+
+
+def test_missing_template_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        TemplateStore().get(str(tmp_path / "missing.png"))
+
+
+def test_crop_rect_is_clipped():
+    image = np.zeros((10, 20), dtype=np.uint8)
+    crop, x, y = crop_rect(image, (-5, 8, 10, 10))
+    assert crop.shape == (2, 5) and (x, y) == (0, 8)
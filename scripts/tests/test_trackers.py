@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from bar import BarReading
+from capture import Frame
+from trackers import AlphaBetaFilter, MarkerTracker, NpcTracker
+
+NPC_RGB = (200, 150, 50)
+
+
+def test_alpha_beta_filter_converges_on_constant_velocity():
+    f = AlphaBetaFilter(alpha=0.8, beta=0.5)
+    assert f.predict(0.0) is None
+    assert f.update(10, 0.0) == 10.0
+    for i in range(1, 60):
+        f.update(10 + 100 * i * 0.02, i * 0.02)
+    assert f.velocity == pytest.approx(100, rel=1e-3)
+    assert f.predict(59 * 0.02 + 0.05) == pytest.approx(10 + 100 * (59 * 0.02 + 0.05), rel=1e-3)
+    f.reset()
+    assert f.predict(1.0) is None
+
+
+def test_alpha_beta_filter_ignores_zero_dt_for_velocity():
+    f = AlphaBetaFilter()
+    f.update(0, 1.0)
+    f.update(10, 1.0)
+    assert f.velocity == 0.0
+    assert f.position == 5.0
+
+
+def reading(marker=None, first=None, last=None):
+    n_bounds = 0 if first is None else 2
+    return BarReading(marker, first, last, n_bounds, 0 if first is None else last - first, None, 800)
+
+
+def test_marker_tracker_predicts_latency_ahead():
+    tracker = MarkerTracker(latency=0.05)
+    tracker.start_catch()
+    for i in range(50):
+        t = i * 0.02
+        predicted = tracker.update(reading(100 + 200 * t, 300, 500), t)
+    marker, first, last = predicted
+    assert marker == pytest.approx(100 + 200 * (49 * 0.02 + 0.05), abs=1)
+    assert (first, last) == (300, 500)
+
+
+def test_marker_tracker_missing_coordinates_and_stats():
+    tracker = MarkerTracker()
+    tracker.start_catch()
+    assert tracker.update(reading(), 0.0) == (None, None, None)
+    assert tracker.update(reading(marker=42), 0.1) == (42, None, None)
+    tracker.end_catch(True)
+    tracker.start_catch()
+    assert tracker.predict(1.0) == (None, None, None)
+    tracker.end_catch(False)
+    assert (tracker.catches, tracker.successes, tracker.success_rate) == (2, 1, 0.5)
+    assert tracker.samples_per_catch == 1.0
+    assert tracker.catch_samples == 0
+
+
+def screen_with_name(x, y, size=(1080, 1920)):
+    image = np.zeros(size + (3,), dtype=np.uint8)
+    image[y:y + 6, x:x + 40] = NPC_RGB[::-1]
+    return Frame(image)
+
+
+def test_npc_tracker_full_scan_then_window_hit():
+    tracker = NpcTracker(NPC_RGB, y_offset=20)
+    x, y = tracker.locate(screen_with_name(500, 300))
+    assert abs(x - 520) <= 1 and abs(y - 323) <= 1
+    assert tracker.full_scans == 1
+    x, y = tracker.locate(screen_with_name(530, 310))
+    assert abs(x - 550) <= 1 and abs(y - 333) <= 1
+    assert tracker.window_hits == 1 and tracker.full_scans == 1
+    assert tracker.hit_rate == 0.5
+
+
+def test_npc_tracker_falls_back_to_full_scan_and_reports_missing():
+    tracker = NpcTracker(NPC_RGB)
+    tracker.locate(screen_with_name(100, 100))
+    assert tracker.locate(screen_with_name(1500, 900)) is not None
+    assert tracker.full_scans == 2
+    assert tracker.locate(Frame(np.zeros((1080, 1920, 3), dtype=np.uint8))) is None
+    assert tracker.last is None
+    assert tracker.found == 2
+
+
+def test_marker_tracker_skips_repeated_frames():
+    tracker = MarkerTracker()
+    assert tracker.fresh(None) and tracker.fresh(1)
+    tracker.update(reading(marker=10), 0.0, seq=1)
+    assert not tracker.fresh(1)
+    assert tracker.fresh(2)
+    tracker.update(reading(marker=12), 0.03, seq=None)
+    assert tracker.fresh(None) and tracker.fresh(1)
+    assert tracker.stale == 1
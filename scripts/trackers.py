@@ -0,0 +1,232 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class NpcTracker:
+    """
+    Localiza o nome de um NPC pela cor, procurando primeiro em volta da última posição conhecida.
+
+    A busca em tela cheia só é feita quando o nome não está na janela em volta da última posição, e mesmo assim
+    sobre uma amostragem reduzida da tela (um pixel a cada 'downsample' em cada direção, o que preserva as
+    cores exatas), seguida de uma confirmação em resolução total numa janela em volta do candidato. O teste
+    de cor é um cv2.inRange sobre os dados uint8, sem cópias int64.
+    """
+
+    def __init__(self, color_rgb, tolerance=5, min_pixels=20, window=(400, 200), downsample=4, y_offset=20):
+        """
+        Args:
+            color_rgb (tuple): Cor RGB do nome do NPC.
+            tolerance (int, opcional): Diferença máxima por canal. Padrão é 5.
+            min_pixels (int, opcional): Pixels da cor necessários para considerar o NPC encontrado. Padrão é 20.
+            window (tuple, opcional): Largura e altura da janela de busca em volta da última posição. Padrão é (400, 200).
+            downsample (int, opcional): Passo da amostragem da busca em tela cheia. Padrão é 4.
+            y_offset (int, opcional): Deslocamento vertical do ponto retornado em relação ao nome. Padrão é 20.
+        """
+        bgr = np.array(color_rgb, dtype=int)[::-1]
+        self.lower = np.clip(bgr - tolerance, 0, 255).astype(np.uint8)
+        self.upper = np.clip(bgr + tolerance, 0, 255).astype(np.uint8)
+        self.min_pixels = min_pixels
+        self.window = window
+        self.downsample = downsample
+        self.y_offset = y_offset
+        self.last = None
+        self.calls = 0
+        self.window_hits = 0
+        self.full_scans = 0
+        self.found = 0
+        self.total_time = 0.0
+
+    def _median(self, image, left, top):
+        """
+        Mediana (x, y) absoluta dos pixels da cor na imagem, ou None se houver menos de min_pixels.
+        """
+        points = cv2.findNonZero(cv2.inRange(image, self.lower, self.upper))
+        if points is None or len(points) < self.min_pixels:
+            return None
+        x, y = np.median(points.reshape(-1, 2), axis=0)
+        return left + x, top + y
+
+    def _window_around(self, frame, center):
+        w, h = self.window
+        return frame.crop((int(center[0] - w // 2), int(center[1] - h // 2), w, h))
+
+    def locate(self, frame):
+        """
+        Retorna a posição (x, y) absoluta para clicar no NPC, ou None se ele não estiver na tela.
+
+        Args:
+            frame (Frame): Quadro em tela cheia.
+        """
+        t0 = time.perf_counter()
+        self.calls += 1
+        position = None
+        if self.last is not None:
+            position = self._median(*self._window_around(frame, self.last))
+            if position is not None:
+                self.window_hits += 1
+        if position is None:
+            self.full_scans += 1
+            step = self.downsample
+            sample = np.ascontiguousarray(frame.image[::step, ::step])
+            points = cv2.findNonZero(cv2.inRange(sample, self.lower, self.upper))
+            if points is not None and len(points) * step * step >= self.min_pixels:
+                x, y = np.median(points.reshape(-1, 2), axis=0) * step
+                position = self._median(*self._window_around(frame, (frame.left + x, frame.top + y)))
+        self.last = position
+        self.total_time += time.perf_counter() - t0
+        if position is None:
+            return None
+        self.found += 1
+        return int(position[0]), int(position[1]) + self.y_offset
+
+    @property
+    def hit_rate(self):
+        """
+        Fração das chamadas resolvidas na janela em volta da última posição, sem busca em tela cheia.
+        """
+        return self.window_hits / self.calls if self.calls else 0.0
+
+    def summary(self):
+        per_call = self.total_time / self.calls * 1000 if self.calls else 0.0
+        return (f"npc tracker: {self.calls} calls, {self.found} found, window hit rate {self.hit_rate:.0%}, "
+                f"{self.full_scans} full scans, {per_call:.2f} ms/call")
+
+
+class AlphaBetaFilter:
+    """
+    Filtro alfa-beta (modelo de velocidade constante) de uma coordenada medida em instantes irregulares.
+    """
+
+    def __init__(self, alpha=0.5, beta=0.1):
+        """
+        Args:
+            alpha (float, opcional): Peso da medida na correção da posição (0 a 1). Padrão é 0.5.
+            beta (float, opcional): Peso da medida na correção da velocidade (0 a 1). Padrão é 0.1.
+        """
+        self.alpha = alpha
+        self.beta = beta
+        self.reset()
+
+    def reset(self):
+        self.position = None
+        self.velocity = 0.0
+        self.t = None
+
+    def update(self, measurement, t):
+        """
+        Incorpora uma medida feita no instante t (segundos) e retorna a posição estimada.
+        """
+        if self.t is None:
+            self.position, self.velocity, self.t = float(measurement), 0.0, t
+            return self.position
+        dt = t - self.t
+        predicted = self.position + self.velocity * dt
+        residual = measurement - predicted
+        self.position = predicted + self.alpha * residual
+        if dt > 0:
+            self.velocity += self.beta * residual / dt
+        self.t = t
+        return self.position
+
+    def predict(self, t):
+        """
+        Posição prevista no instante t, ou None se ainda não houve nenhuma medida.
+        """
+        if self.t is None:
+            return None
+        return self.position + self.velocity * (t - self.t)
+
+
+class MarkerTracker:
+    """
+    Acompanha o marcador e os limites da zona alvo do minigame de pesca entre amostras consecutivas do pull().
+
+    Cada amostra atualiza um filtro alfa-beta por coordenada; a decisão de clicar usa a posição prevista para
+    o instante em que o clique chega ao jogo ('latency' segundos depois da captura), e não a última amostra.
+    Como a previsão leva em conta o tempo entre amostras, a barra pode ser amostrada com menos frequência.
+
+    Cada leitura deve ser feita num quadro novo: fresh() diz se o número de sequência do quadro já foi usado,
+    para que o mesmo quadro não seja incorporado (nem gere cliques) duas vezes.
+
+    Também contabiliza as pescas (start_catch/end_catch), a taxa de sucesso e as amostras por pesca.
+    """
+
+    def __init__(self, alpha=0.8, beta=0.5, latency=0.05):
+        """
+        Args:
+            alpha (float, opcional): Peso da medida na correção da posição. Padrão é 0.8.
+            beta (float, opcional): Peso da medida na correção da velocidade. Padrão é 0.5 (próximo do
+                amortecimento crítico, beta = alpha² / (2 - alpha)).
+            latency (float, opcional): Tempo (s) entre a captura da barra e o efeito do clique. Padrão é 0.05.
+        """
+        self.marker = AlphaBetaFilter(alpha, beta)
+        self.first_bound = AlphaBetaFilter(alpha, beta)
+        self.last_bound = AlphaBetaFilter(alpha, beta)
+        self.latency = latency
+        self.catches = 0
+        self.successes = 0
+        self.samples = 0
+        self.catch_samples = 0
+        self.stale = 0
+        self.last_seq = None
+
+    def start_catch(self):
+        """
+        Descarta o estado da pesca anterior.
+        """
+        for f in (self.marker, self.first_bound, self.last_bound):
+            f.reset()
+        self.catch_samples = 0
+
+    def fresh(self, seq):
+        """
+        True se o quadro de número 'seq' ainda não foi incorporado (sempre True se seq for None).
+        """
+        if seq is not None and seq == self.last_seq:
+            self.stale += 1
+            return False
+        return True
+
+    def update(self, reading, t, seq=None):
+        """
+        Incorpora uma leitura da barra (BarReading) capturada no instante t (time.monotonic) no quadro 'seq'.
+
+        Returns:
+            tuple: (marcador, primeiro limite, último limite) previstos para t + latency; cada valor é None
+            se a coordenada ainda não foi medida nesta pesca.
+        """
+        self.samples += 1
+        self.catch_samples += 1
+        self.last_seq = seq
+        if reading.marker is not None:
+            self.marker.update(reading.marker, t)
+        if reading.n_bounds:
+            self.first_bound.update(reading.first_bound, t)
+            self.last_bound.update(reading.last_bound, t)
+        return self.predict(t + self.latency)
+
+    def predict(self, t):
+        return tuple(None if value is None else int(round(value))
+                     for value in (f.predict(t) for f in (self.marker, self.first_bound, self.last_bound)))
+
+    def end_catch(self, success):
+        """
+        Registra o fim de uma pesca e se ela terminou com sucesso.
+        """
+        self.catches += 1
+        self.successes += bool(success)
+
+    @property
+    def success_rate(self):
+        return self.successes / self.catches if self.catches else 0.0
+
+    @property
+    def samples_per_catch(self):
+        return self.samples / self.catches if self.catches else 0.0
+
+    def summary(self):
+        return (f"marker tracker: {self.catches} catches, success rate {self.success_rate:.0%}, "
+                f"{self.samples_per_catch:.0f} samples/catch ({self.catch_samples} in the last one), "
+                f"{self.stale} repeated frames skipped")
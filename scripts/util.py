@@ -1,4 +1,4 @@
-import collections, sys, os, random, time, json
+import atexit, collections, contextlib, sys, os, random, time, json
 from datetime import datetime
 
 DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
@@ -14,10 +14,25 @@ except ImportError:
     import numpy as np
     from pytesseract import pytesseract
 
+import cv2
+
+from capture import CaptureThread, ChangeGate, Frame, RowSampler, ScreenshotSource, open_frame_source
+from templates import Haystack, TemplateStore
+from roi_cache import RoiCache
+from states import StateProber
+from trackers import MarkerTracker, NpcTracker
+from bar import analyze_bar
+from control import ControlLoop, ReactionStats, WaitStats, wait_for
+from interrupts import InterruptWatcher
+from inputs import LOW, NORMAL, URGENT, InputScheduler, open_input_backend
+from ocr import OcrService, gather, text_line_crops
+from loot import LOOT_COLORS, ColorLabeller, PickupStats, merge_blobs, pixel_count, plan_tour
+
 Box = collections.namedtuple('Box', 'left top width height')
 
 RESOURCES_DIR = os.path.join(DIR, "resources")
 RESOURCES_TEMPEST_DIR = os.path.join(DIR, "resources/tempest")
+REGIONS_PATH = os.path.join(RESOURCES_DIR, "regions.json")
 TEMP_DIR = os.path.join(DIR, "temp_im")
 
 STANDBY = 's'           # não em estado de pesca
@@ -73,6 +88,50 @@ im_data = {
 
 }
 
+# Todos os templates são decodificados uma única vez aqui e as buscas de check() são feitas em memória
+templates = TemplateStore(im_data, (RESOURCES_DIR, RESOURCES_TEMPEST_DIR))
+change_gate = ChangeGate()
+# Cores do texto dos itens no chão, classificadas numa única passada pela coleta (pickup_win32)
+loot_labeller = ColorLabeller(LOOT_COLORS, tolerance=5)
+pickup_stats = PickupStats()
+# OCR dos nomes de NPC em segundo plano (find_npc_3_async)
+ocr_service = OcrService(workers=2)
+wait_stats = WaitStats()
+
+# Captura a tela uma única vez por iteração de check_status e roda todos os detectores sobre o mesmo quadro
+SINGLE_CAPTURE_PER_TICK = True
+CAPTURE_FPS = 30         # taxa da thread de captura em segundo plano (0 desativa)
+FRAME_MAX_AGE = 0.2      # idade máxima (s) de um quadro da thread de captura antes de capturar diretamente
+CHANGE_GATING = True     # reutiliza o resultado de check() quando a região não mudou desde a última busca
+CLICK_POLL_INTERVAL = 0.1  # intervalo mínimo (s) entre buscas de click_image
+CLICK_CPU_BUDGET = 0.5     # fração máxima de um núcleo usada por click_image enquanto espera
+WAIT_POLL_INTERVAL = 0.1   # intervalo (s) entre verificações de wait_until
+# Busca em pirâmide nas buscas em tela cheia: procura primeiro na imagem reduzida e refina em resolução total
+# apenas em volta dos melhores picos. Escalas menores e menos candidatos são mais rápidos, porém menos precisos.
+PYRAMID_SEARCH = True
+PYRAMID_SCALE = 0.25
+PYRAMID_CANDIDATES = 3
+PULL_CLICK_LATENCY = 0.05   # tempo (s) entre a captura da barra e o efeito do clique, usado na previsão do marcador
+PULL_SAMPLE_INTERVAL = 0.0  # pausa (s) entre amostras da barra no minigame (0 = sem pausa)
+STALE_FRAME_POLL = 0.002   # pausa (s) quando a thread de captura ainda não trouxe um quadro novo da barra
+PULL_LOOP_HZ = 60           # taxa do laço de controle do minigame em fishing.py
+INTERRUPT_WATCH_INTERVAL = 0.5  # intervalo (s) entre verificações da thread de interrupções (pop-ups)
+INTERRUPT_CLEAR_TIMEOUT = 5     # espera máxima (s) dos fluxos pelo fechamento de um pop-up
+# Intervalo (s) entre as verificações de fish(), por status: rápido enquanto a mordida é provável e com o
+# botão de puxar na tela, lento em standby e logo depois de BONUS_NOT_REACHED
+FISH_POLL_INTERVALS = {
+    STANDBY:            1.0,
+    WAITING:            0.1,   # a partir de BITE_WINDOW_START segundos de espera
+    READY:              0.1,
+    BONUS_NOT_REACHED:  1.0,   # e durante os BONUS_RETRY_DELAY segundos seguintes
+    PICK:               0.5,
+    None:               0.1,   # nenhum estado reconhecido (transição de tela)
+}
+FISH_POLL_DEFAULT = 1.0   # status sem intervalo próprio e espera antes de BITE_WINDOW_START
+BITE_WINDOW_START = 2.0   # segundos de espera (WAITING) antes dos quais a mordida é improvável
+BONUS_RETRY_DELAY = 10    # segundos em que fish() ignora o botão de puxar depois de BONUS_NOT_REACHED
+STATE_FULL_SWEEP_EVERY = 10  # a cada quantos ticks check_status verifica todos os estados na ordem de prioridade
+
 FISH_TYPE_COLOR = (125, 125, 100)
 FISH_TYPE_X_COORD_TOLERANCE = 100
 TESSERACT_CONFIG = "-c tessedit_char_whitelist=aBceFhlkimrst"
@@ -87,14 +146,16 @@ else:
     TESSERACT_PATH_WIN32 = "C:/Program Files/Tesseract-OCR/tesseract.exe"
 
 if sys.platform == 'darwin':
-    from locate_im import locate_on_screen, pixel_match_color, screenshot, locate
+    from locate_im import locate, grab_region
     import subprocess
+    frame_source = ScreenshotSource(grab_region, rgb_image=False)
     FISH_TYPE_X_COORD = {"white": 0, "blue": 910, "yellow": 1047}
     FISH_TYPE_Y_COORD = 137
     MAX_FISHING_TIME = 20
     MAX_TIMEOUT = 2
     KEY_MOVE = {'bilefen': ('w', 's'), 'tundra': ('w', 's'), 'ashwold': ('a', 'w')}
     NPC_NAME_COLOR = (230, 190, 135)
+    NPC_CLICK_Y_OFFSET = 20  # distância (px) do centro do nome do NPC até o ponto de clique, abaixo do nome
 
     pos = subprocess.run(["osascript", "-e",
                           'tell application "System Events" to tell process "Diablo Immortal" to get position of window 1'],
@@ -102,7 +163,7 @@ if sys.platform == 'darwin':
     x0, y0 = [int(n) for n in pos.stdout.decode("utf-8").strip().split(", ")]
     x0, y0 = x0 * 2, y0 * 2
 
-    regions = {
+    regions = RoiCache(REGIONS_PATH, (x0, y0), static={
         INTERRUPTED_LAIR: (x0 + 735, y0 + 945, 180, 40),
         INTERRUPTED_PARTY: (x0 + 760, y0 + 1255, 225, 45),
         INTERRUPTED_RAID: (x0 + 760, y0 + 1255, 225, 45),
@@ -112,14 +173,18 @@ if sys.platform == 'darwin':
         STANDBY: (x0 + 1540, y0 + 860, 100, 100),
         TALK: (x0 + 1540, y0 + 860, 100, 100),
         PICK: (x0 + 1540, y0 + 860, 100, 100)
-    }
+    })
 
     window = None
 
 else:
-    # assume windows
-    import DIKeys, hexKeyMap
-    locate_on_screen, pixel_match_color, screenshot, locate = p.locateOnScreen, p.pixelMatchesColor, p.screenshot, p.locate
+    # assume windows (no Linux, o mesmo layout 1920x1080, rodando sob Xvfb)
+    import hexKeyMap
+    if sys.platform == "win32":
+        import DIKeys
+    locate = p.locate
+    grab_region = p.screenshot  # sem imageFilename, a captura fica só em memória
+    frame_source = ScreenshotSource(grab_region, rgb_image=True)
 
     FISH_TYPE_X_COORD = {"white": 0, "blue": 826, "yellow": 955}
     FISH_TYPE_Y_COORD = 75
@@ -127,21 +192,75 @@ else:
     MAX_TIMEOUT = 5
     PICKUP_LIMIT = 10
     NPC_NAME_COLOR = (248, 198, 134)
+    NPC_CLICK_Y_OFFSET = 20  # distância (px) do centro do nome do NPC até o ponto de clique, abaixo do nome
+    # Coleta (pickup_win32), no layout 1920x1080 das demais coordenadas: o item fica abaixo do nome dele no chão
+    PICKUP_CLICK_Y_OFFSET = 90  # distância (px) do topo do nome do item até o ponto de clique no item
+    PICKUP_CLICK_JITTER = 30    # variação aleatória máxima (px) do ponto de clique, em cada direção
     KEY_MOVE = {'bilefen': hexKeyMap.DIK_S, 'tundra': hexKeyMap.DIK_S, 'ashwold': hexKeyMap.DIK_D}
     BACK_TO_FISHING_COORD = {'bilefen': (970, 670), 'tundra': (1100, 670), 'ashwold': (1400, 385)}
 
-    window = p.getWindowsWithTitle("Diablo Immortal")[0]
-    x0, y0 = window.left, window.top
+    if sys.platform == "win32":
+        window = p.getWindowsWithTitle("Diablo Immortal")[0]
+        x0, y0 = window.left, window.top
+    else:
+        window = None
+        x0, y0 = 0, 0
     boxes = {}
 
-    if os.path.exists(os.path.join(RESOURCES_DIR, "regions.json")):
-        try:
-            with open(os.path.join(RESOURCES_DIR, "regions.json"), 'r') as f:
-                regions = json.load(f)
-        except:
-            regions = {}
-    else:
-        regions = {}
+    # Regiões aprendidas automaticamente na primeira busca em tela cheia de cada template
+    regions = RoiCache(REGIONS_PATH, (x0, y0))
+
+# As regiões aprendidas são gravadas no máximo a cada poucos segundos; o que estiver pendente é gravado ao sair
+atexit.register(regions.flush)
+
+# Fonte de quadros alternativa: "xshm" (X11 MIT-SHM, padrão no Linux) ou "replay:<caminho>" (PNG/NPZ gravados)
+FRAME_SOURCE = os.environ.get("DIABLO_FRAME_SOURCE", "xshm" if sys.platform.startswith("linux") else "")
+if FRAME_SOURCE:
+    frame_source = open_frame_source(FRAME_SOURCE)
+
+# Cliques e teclas sem a pausa implícita do pyautogui: "sendinput" (Windows), "xtest" (Linux), "pyautogui" ou "record"
+INPUT_BACKEND = os.environ.get("DIABLO_INPUT_BACKEND", "")
+input_backend = open_input_backend(INPUT_BACKEND)
+# Rajadas de teclas em segundo plano, sem travar a detecção de estados
+input_scheduler = InputScheduler(input_backend)
+
+
+def screenshot(image_name=None, region=None):
+    """
+    Captura a tela (ou uma região) pela frame_source.
+
+    Mantém a convenção de cores de cada plataforma: BGR no macOS (como locate_im) e RGB nos demais (como o pyautogui).
+
+    Args:
+        image_name (str, opcional): Se informado, a captura também é gravada nesse arquivo.
+        region (tuple, opcional): Região da tela (x, y, largura, altura). Se None, captura a tela inteira.
+
+    Returns:
+        numpy.ndarray: Imagem capturada.
+    """
+    image = frame_source.grab(region)
+    if image_name is not None:
+        cv2.imwrite(image_name, image)
+    return image if sys.platform == "darwin" else image[:, :, ::-1]
+
+
+def locate_on_screen(im_name, region=None, confidence=0.999):
+    """
+    Localiza uma imagem na tela capturada pela frame_source.
+
+    Returns:
+        Box ou None: Coordenadas absolutas da melhor correspondência acima da confiança.
+    """
+    frame = grab_frame(region)
+    box = templates.locate(im_name, frame.image, confidence=confidence)
+    return Box(box.left + frame.left, box.top + frame.top, box.width, box.height) if box else None
+
+
+def pixel_match_color(x, y, expected_RGB_color, tolerance=0):
+    """
+    Verifica se a cor de um pixel da tela corresponde à cor esperada, dentro da tolerância.
+    """
+    return grab_frame((x, y, 1, 1)).pixel_match_color(x, y, expected_RGB_color, tolerance)
 
 
 def clear_temp_screenshots():
@@ -157,26 +276,38 @@ def clear_temp_screenshots():
 def reset_game_ui_positions():
     """
     Remove o arquivo JSON que armazena as posições da interface do usuário no jogo, resetando as posições salvas.
+    As regiões já aprendidas em memória também são descartadas.
     """
-    file_path = os.path.join(RESOURCES_DIR, "regions.json")
-    if os.path.exists(file_path):
-        os.unlink(file_path)
+    regions.reset()
 
 def activate_diablo():
     """
     Ativa a janela do jogo 'Diablo Immortal'.
     Se rodando no macOS, utiliza AppleScript para ativar a aplicação.
-    Se rodando no Windows, ativa a janela diretamente.
+    Se rodando no Windows, ativa a janela diretamente e atualiza a origem (x0, y0) se ela foi movida.
     """
+    global x0, y0
     if sys.platform == "darwin":
         result = subprocess.run(["osascript", "get_active_window.scpt"], stdout=subprocess.PIPE)
         if result.stdout.decode("utf-8").strip() != "Immortal":
             subprocess.run(["osascript", "-e", 'tell application "Diablo Immortal" to activate'])
             p.sleep(0.3)
-    else:
+    elif window is not None:
         window.activate()
+        x0, y0 = window.left, window.top
+        regions.set_origin((x0, y0))
+
+
+def window_origin():
+    """
+    Retorna a origem atual (x0, y0) da janela do jogo.
+
+    Os módulos que fazem "from util import *" recebem uma cópia de x0 e y0 feita na importação; as funções
+    com coordenadas fixas devem usar este valor, atualizado por activate_diablo() quando a janela é movida.
+    """
+    return x0, y0
 
-def click_box(box: Box, clicks=1, interval=0.01, button=p.PRIMARY,
+def click_box(box: Box, clicks=1, interval=0.0, button=p.PRIMARY,
               offset_left=0.2, offset_top=0.2, offset_right=-0.2, offset_bottom=-0.2):
     """
     Simula um clique em uma região da tela representada por um objeto Box.
@@ -184,7 +315,7 @@ def click_box(box: Box, clicks=1, interval=0.01, button=p.PRIMARY,
     Args:
         box (Box): Área da tela onde o clique será realizado.
         clicks (int, optional): Número de cliques a serem executados. Padrão é 1.
-        interval (float, optional): Intervalo entre cliques múltiplos. Padrão é 0.01s.
+        interval (float, optional): Intervalo entre cliques múltiplos. Padrão é 0 (todos numa única chamada).
         button (str, optional): Botão do mouse a ser clicado (ex: PRIMARY, SECONDARY). Padrão é PRIMARY.
         offset_left (float, optional): Offset percentual à esquerda da caixa. Padrão é 0.2.
         offset_top (float, optional): Offset percentual no topo da caixa. Padrão é 0.2.
@@ -201,7 +332,7 @@ def click_box(box: Box, clicks=1, interval=0.01, button=p.PRIMARY,
         x, y = x // 2, y // 2
     else:
         x, y = int(x), int(y)
-    p.click(x, y, clicks=clicks, interval=interval, button=button)
+    input_backend.click(x, y, clicks=clicks, interval=interval, button=button)
 
 def cast_fishing_rod(key, box):
     """
@@ -220,20 +351,23 @@ def cast_fishing_rod(key, box):
     else:
         if key not in hexKeyMap.DI_KEYS:
             raise KeyError(f"The key {key} is not an accepted keyboard key.")
-        DIKeys.press(hexKeyMap.DI_KEYS[key])
+        input_backend.press(hexKeyMap.DI_KEYS[key], 0.1)
 
-def image_is_gray(image_or_box, threshold=5):
+def image_is_gray(image_or_box, threshold=5, frame=None):
     """
     Verifica se uma imagem é predominantemente cinza.
     
     Args:
         image_or_box: Imagem a ser analisada ou um objeto Box para capturar a região.
         threshold (int, optional): Tolerância para considerar uma imagem cinza. Padrão é 5.
+        frame (Frame, opcional): Quadro já capturado; se informado, a região do Box é recortada dele.
     
     Returns:
         bool: True se a imagem for cinza, False caso contrário.
     """
-    if isinstance(image_or_box, Box):
+    if isinstance(image_or_box, Box) and frame is not None:
+        image = frame.crop(image_or_box)[0]
+    elif isinstance(image_or_box, Box):
         # Se for um objeto Box, captura a região correspondente
         image = screenshot(region=(image_or_box.left, image_or_box.top, image_or_box.width, image_or_box.height))
     else:
@@ -245,19 +379,350 @@ def image_is_gray(image_or_box, threshold=5):
  
 
 
-def check(im_name, confidence=0.8, region=None, region_boarder_x=0, region_boarder_y=0):
+capture_thread = None
+
+
+def start_capture(fps=CAPTURE_FPS, region=None):
     """
-    Verifica se uma imagem está presente na tela.
-    
+    Inicia (uma única vez) a thread que captura a tela em segundo plano a uma taxa fixa.
+
+    Enquanto ela estiver ativa, check(), pull(), find_npc() e pickup_win32() leem o quadro mais recente em vez
+    de capturarem a tela por conta própria.
+
+    Args:
+        fps (float, opcional): Capturas por segundo. Padrão é CAPTURE_FPS; 0 não inicia a thread.
+        region (tuple, opcional): Região capturada. Se None, a tela inteira.
+    """
+    global capture_thread
+    if capture_thread is None and fps > 0:
+        capture_thread = CaptureThread(frame_source, region, fps)
+        capture_thread.start()
+
+
+def stop_capture():
+    """
+    Encerra a thread de captura (os detectores voltam a capturar a tela diretamente).
+    """
+    global capture_thread
+    if capture_thread is not None:
+        capture_thread.stop()
+        capture_thread.join()
+        capture_thread = None
+
+
+# O convite de ataque só é verificado no Windows, como antes (no macOS o mesmo botão é o do convite para festa)
+INTERRUPT_STATES = [INTERRUPTED_LAIR, INTERRUPTED_PARTY] + ([INTERRUPTED_RAID] if sys.platform == "win32" else [])
+
+
+def detect_interrupt():
+    """
+    Procura os pop-ups de interrupção (covil, festa, ataque) numa única passada sobre o quadro mais recente.
+
+    Returns:
+        tuple: (status, box) do primeiro pop-up encontrado, ou (None, None).
+    """
+    hits = check_many(INTERRUPT_STATES)
+    return next(((status, box) for status, box in hits.items() if box), (None, None))
+
+
+def dismiss_interrupt(status, box):
+    """
+    Fecha um pop-up de interrupção. Só deve ser chamada pela thread do fluxo ativo (ver wait_interrupts).
+    """
+    activate_diablo()
+    click_box(box)
+
+
+interrupt_watcher = None
+
+
+def start_interrupt_watcher(interval=INTERRUPT_WATCH_INTERVAL):
+    """
+    Inicia (uma única vez) a thread que detecta os pop-ups de interrupção em segundo plano.
+
+    Returns:
+        InterruptWatcher: A thread, cujo evento 'interrupted' indica um pop-up na tela.
+    """
+    global interrupt_watcher
+    if interrupt_watcher is None:
+        interrupt_watcher = InterruptWatcher(detect_interrupt, interval)
+        interrupt_watcher.start()
+    return interrupt_watcher
+
+
+def stop_interrupt_watcher():
+    """
+    Para a thread de interrupções, se estiver ativa, e espera ela terminar.
+    """
+    global interrupt_watcher
+    if interrupt_watcher is not None:
+        interrupt_watcher.stop()
+        interrupt_watcher.join()
+        interrupt_watcher = None
+
+
+@contextlib.contextmanager
+def watching_interrupts(interval=INTERRUPT_WATCH_INTERVAL):
+    """
+    Mantém a thread de interrupções ativa só enquanto um fluxo (pesca, troca, salvage, ataque) roda; também pode
+    ser usada como decorador. A thread é parada na saída do fluxo que a iniciou: fluxos aninhados ou recursivos
+    usam a mesma thread sem pará-la.
+
+    Yields:
+        InterruptWatcher: A thread ativa.
+    """
+    started = interrupt_watcher is None
+    watcher = start_interrupt_watcher(interval)
+    try:
+        yield watcher
+    finally:
+        if started:
+            stop_interrupt_watcher()
+
+
+def wait_interrupts(timeout=INTERRUPT_CLEAR_TIMEOUT):
+    """
+    Ponto seguro dos fluxos: se a thread de interrupções sinalizou um pop-up, fecha-o aqui, na thread de quem
+    chamou (entre duas ações do fluxo, nunca no meio de uma), e espera ele sumir. Fora de um fluxo com a thread
+    ativa (watching_interrupts), não faz nada.
+
+    Args:
+        timeout (float, opcional): Espera máxima, em segundos, pelo pop-up sumir. Padrão é INTERRUPT_CLEAR_TIMEOUT.
+
+    Returns:
+        str ou None: O status do pop-up que interrompeu o fluxo, ou None se não havia nenhum.
+    """
+    watcher = interrupt_watcher
+    if watcher is None:
+        return None
+    pending = watcher.take()
+    if pending is None:
+        return None
+    status, box = pending
+    dismiss_interrupt(status, box)
+    wait_until(status, timeout, gone=True)
+    watcher.resolved(status)
+    return status
+
+
+def get_frame(region=None, max_age=FRAME_MAX_AGE):
+    """
+    Retorna o quadro mais recente da thread de captura ou, se ela não estiver ativa (ou o quadro for mais velho
+    que max_age), captura a região diretamente.
+
+    Args:
+        region (tuple, opcional): Região de interesse. Se informada, só ela é copiada (ou capturada).
+        max_age (float, opcional): Idade máxima aceita para o quadro da thread. Padrão é FRAME_MAX_AGE.
+
+    Returns:
+        Frame: O quadro a ser usado pelos detectores (uma cópia, segura para usos demorados).
+    """
+    if capture_thread is not None:
+        frame = capture_thread.latest(max_age, region)
+        if frame is not None:
+            return frame
+    return grab_frame(region)
+
+
+@contextlib.contextmanager
+def leased_frame(max_age=FRAME_MAX_AGE):
+    """
+    Como get_frame(), mas empresta o buffer da thread de captura sem copiar a tela inteira; o quadro só pode
+    ser usado dentro do bloco with.
+    """
+    if capture_thread is not None:
+        with capture_thread.lease(max_age) as frame:
+            if frame is not None:
+                yield frame
+                return
+    yield grab_frame()
+
+
+def grab_frame(region=None):
+    """
+    Captura a tela (ou uma região dela) uma única vez para ser compartilhada por vários detectores.
+
+    Args:
+        region (tuple, opcional): Região da tela a capturar (x, y, largura, altura). Se None, captura a tela inteira.
+
+    Returns:
+        Frame: Quadro em BGR com a origem da região capturada.
+    """
+    left, top = (int(region[0]), int(region[1])) if region else (0, 0)
+    return Frame(frame_source.grab(region), left, top)
+
+
+row_samplers = {}
+
+
+def sample_row(region):
+    """
+    Lê uma região estreita da tela (como a barra de pesca) em memória, junto com o instante e o número do quadro.
+
+    Com a thread de captura, a linha vem do quadro mais recente (se não for mais velho que FRAME_MAX_AGE) e
+    leva o instante e o número de sequência daquele quadro; chamadas seguidas podem devolver o mesmo quadro.
+    Sem ela, a região é capturada na hora e o número de sequência é None.
+
+    Args:
+        region (tuple): Região da tela (x, y, largura, altura).
+
+    Returns:
+        tuple: (linha, instante, seq): array (altura, largura, 3) em RGB, sobrescrito na próxima leitura da mesma
+        região; instante da captura (time.monotonic); número de sequência do quadro ou None.
+    """
+    sampler = row_samplers.get(region)
+    if sampler is None:
+        sampler = row_samplers[region] = RowSampler(region, frame_source.grab, rgb_image=False)
+    if capture_thread is not None:
+        frame = capture_thread.latest(FRAME_MAX_AGE, region)
+        if frame is not None and frame.image.shape[:2] == sampler.buffer.shape[:2]:
+            return sampler.read(frame.image), frame.timestamp, frame.seq
+    timestamp = time.monotonic()
+    return sampler.read(), timestamp, None
+
+
+def read_row(region):
+    """
+    Lê uma região estreita da tela (como a barra de pesca) em memória, reutilizando um buffer pré-alocado por região.
+
+    Args:
+        region (tuple): Região da tela (x, y, largura, altura).
+
+    Returns:
+        numpy.ndarray: Array (altura, largura, 3) em RGB. É sobrescrito na próxima leitura da mesma região.
+    """
+    return sample_row(region)[0]
+
+
+def settle_match(im_name, box, score, confidence, cached_region, full_screen):
+    """
+    Aplica o limiar de confiança ao resultado de uma busca e atualiza o cache de regiões (acerto, falha ou aprendizado).
+
+    Depois de várias falhas seguidas na região aprendida, o template é procurado uma vez em tela cheia (relocate).
+
+    Args:
+        im_name (str): Nome da imagem buscada.
+        box (Box): Melhor posição encontrada, em coordenadas absolutas (ou None).
+        score (float): Score da melhor posição.
+        confidence (float): Confiança mínima.
+        cached_region (bool): True se a busca usou a região do cache.
+        full_screen (bool): True se a busca foi feita na tela inteira.
+
+    Returns:
+        tuple: (Box ou None, score). O Box só é retornado se o score atingiu a confiança.
+    """
+    if box is None or score < confidence:
+        box = None
+    if cached_region:
+        if box:
+            regions.hit(im_name)
+        elif regions.miss(im_name):
+            return relocate(im_name, confidence)
+    elif full_screen and box:
+        regions.learn(im_name, box)
+    return box, score
+
+
+def relocate(im_name, confidence):
+    """
+    Procura em tela cheia um template que falhou várias vezes seguidas na sua região aprendida.
+
+    Se ele estiver em outro lugar, a região é reaprendida; se não estiver na tela, a região é mantida.
+
+    Returns:
+        tuple: (Box ou None, score) da busca em tela cheia.
+    """
+    frame = get_frame()
+    box, score = match_template(im_data.get(im_name, im_name), frame, frame.image, True)
+    if box is None or score < confidence:
+        return None, score
+    box = Box(box.left + frame.left, box.top + frame.top, box.width, box.height)
+    regions.learn(im_name, box)
+    return box, score
+
+
+def pyramid_params():
+    """
+    Parâmetros (escala, candidatos) da busca em pirâmide, ou None se ela estiver desativada.
+    """
+    return (PYRAMID_SCALE, PYRAMID_CANDIDATES) if PYRAMID_SEARCH else None
+
+
+def frame_haystack(frame):
+    """
+    Retorna o Haystack do quadro inteiro, criado uma única vez por quadro, para que as escalas reduzidas
+    sejam compartilhadas por todas as buscas em tela cheia do mesmo quadro.
+    """
+    if frame.haystack is None:
+        frame.haystack = Haystack(frame.image)
+    return frame.haystack
+
+
+def match_template(image_path, frame, haystack, full_screen):
+    """
+    Busca o template no recorte do quadro; buscas em tela cheia usam a busca em pirâmide (se ativada).
+    """
+    if full_screen and PYRAMID_SEARCH:
+        return templates.match(image_path, frame_haystack(frame), coarse=pyramid_params())
+    return templates.match(image_path, haystack)
+
+
+def check_many(im_names, confidence=0.8, frame=None, grayscale=False):
+    """
+    Verifica vários templates de uma só vez sobre um único quadro.
+
+    Todas as buscas usam a mesma captura e a mesma conversão de cores, e rodam em paralelo num pequeno
+    pool de threads. Cada template continua usando a sua região do cache, quando houver.
+
+    Args:
+        im_names (iterable): Nomes das imagens (chaves de im_data) ou caminhos.
+        confidence (float ou dict, opcional): Confiança mínima, única ou por nome. Padrão é 0.8.
+        frame (Frame, opcional): Quadro já capturado. Se None, usa o quadro mais recente (get_frame).
+        grayscale (bool, opcional): Se True, compara em escala de cinza. Padrão é False.
+
+    Returns:
+        dict: Nome -> Box (ou None, se não encontrado).
+    """
+    im_names = list(im_names)
+    if frame is None:
+        frame = get_frame()
+    jobs = {}
+    for im_name in im_names:
+        region = regions.get(im_name)
+        rect = None if region is None else (region[0] - frame.left, region[1] - frame.top, region[2], region[3])
+        jobs[im_name] = (im_data.get(im_name, im_name), rect)
+    try:
+        results = templates.match_many(jobs, frame_haystack(frame), grayscale, coarse=pyramid_params())
+    except Exception as e:
+        return {im_name: None for im_name in im_names}
+    hits = {}
+    for im_name, (box, score) in results.items():
+        if box is not None:
+            box = Box(box.left + frame.left, box.top + frame.top, box.width, box.height)
+        threshold = confidence.get(im_name, 0.8) if isinstance(confidence, dict) else confidence
+        full_screen = jobs[im_name][1] is None
+        hits[im_name] = settle_match(im_name, box, score, threshold, not full_screen, full_screen)[0]
+    return hits
+
+
+def check_score(im_name, confidence=0.8, region=None, region_boarder_x=0, region_boarder_y=0, frame=None):
+    """
+    Busca uma imagem na tela e retorna também o score da melhor correspondência.
+
+    Uma única captura e uma única busca bastam para testar vários limiares: quem chama pode comparar o
+    score com limiares mais rígidos sem buscar de novo.
+
     Args:
         im_name (str): Nome da imagem a ser procurada ou uma constante que mapeia para um caminho de imagem.
-        confidence (float, opcional): Nível de confiança para a correspondência. Padrão é 0.8.
+        confidence (float, opcional): Nível de confiança para considerar a imagem encontrada. Padrão é 0.8.
         region (tuple, opcional): Região da tela para procurar (x, y, largura, altura).
         region_boarder_x (int, opcional): Borda adicional em x para a região. Padrão é 0.
         region_boarder_y (int, opcional): Borda adicional em y para a região. Padrão é 0.
-    
+        frame (Frame, opcional): Quadro já capturado. Se informado, a busca é feita sobre ele,
+            sem uma nova captura de tela; caso contrário, apenas a região procurada é capturada.
+
     Returns:
-        Box ou None: Objeto Box representando a região onde a imagem foi encontrada, ou None se não encontrada.
+        tuple: (Box ou None, score). Box é None se o score ficar abaixo da confiança.
     """
     # Obtém o caminho da imagem do dicionário im_data se im_name for uma chave
     image_path = im_data.get(im_name, im_name)
@@ -267,17 +732,52 @@ def check(im_name, confidence=0.8, region=None, region_boarder_x=0, region_board
         image_path = im_data[im_name]
     
     try:
-        # Verifica se a região específica para esta imagem está definida
-        if region is None and im_name in regions:
+        # Verifica se a região específica para esta imagem está definida (fixa ou aprendida)
+        cached_region = region is None and im_name in regions
+        if cached_region:
             region = regions[im_name]
         
-        box = locate_on_screen(image_path, region=region, confidence=confidence)
+        if frame is None:
+            frame = get_frame(region)
+        haystack, left, top = frame.crop(region)
+        # O template já está decodificado em memória (TemplateStore), sem leitura do PNG a cada chamada
+        if CHANGE_GATING:
+            gate_key = (image_path, region and tuple(region))
+            reused, result, signature = change_gate.lookup(gate_key, haystack)
+            if not reused:
+                result = match_template(image_path, frame, haystack, region is None)
+                change_gate.store(gate_key, signature, result)
+        else:
+            result = match_template(image_path, frame, haystack, region is None)
+        box, score = result
+        if box is not None:
+            box = Box(box.left + left, box.top + top, box.width, box.height)
+        box, score = settle_match(im_name, box, score, confidence, cached_region, region is None)
         if box and (region_boarder_x > 0 or region_boarder_y > 0):
             box = Box(box.left - region_boarder_x, box.top - region_boarder_y,
                     box.width + 2 * region_boarder_x, box.height + 2 * region_boarder_y)
-        return box
+        return box, score
     except Exception as e:
-        return None
+        return None, 0.0
+
+
+def check(im_name, confidence=0.8, region=None, region_boarder_x=0, region_boarder_y=0, frame=None):
+    """
+    Verifica se uma imagem está presente na tela.
+    
+    Args:
+        im_name (str): Nome da imagem a ser procurada ou uma constante que mapeia para um caminho de imagem.
+        confidence (float, opcional): Nível de confiança para a correspondência. Padrão é 0.8.
+        region (tuple, opcional): Região da tela para procurar (x, y, largura, altura).
+        region_boarder_x (int, opcional): Borda adicional em x para a região. Padrão é 0.
+        region_boarder_y (int, opcional): Borda adicional em y para a região. Padrão é 0.
+        frame (Frame, opcional): Quadro já capturado. Se informado, a busca é feita sobre ele,
+            sem uma nova captura de tela; caso contrário, apenas a região procurada é capturada.
+    
+    Returns:
+        Box ou None: Objeto Box representando a região onde a imagem foi encontrada, ou None se não encontrada.
+    """
+    return check_score(im_name, confidence, region, region_boarder_x, region_boarder_y, frame)[0]
 
 
 def match_box(box1: Box, box2: Box, max_diff=5):
@@ -288,24 +788,47 @@ def match_box(box1: Box, box2: Box, max_diff=5):
 
 
 def scroll_down(x, y, amount=200):
+    # Arrastar e rolar não existem no input_backend: continuam no pyautogui, mas sem o pyautogui.PAUSE
     if sys.platform == "darwin":
-        p.moveTo(x // 2, y // 2 + 200)
+        input_backend.move(x // 2, y // 2 + 200)
         p.sleep(0.1)
-        p.drag(yOffset=-amount, duration=0.3 + 0.2 * random.random(), button='left')
+        p.drag(yOffset=-amount, duration=0.3 + 0.2 * random.random(), button='left', _pause=False)
     else:
-        p.moveTo(x, y)
+        input_backend.move(x, y)
         p.sleep(0.1)
-        p.scroll(-1, x=x, y=y)
+        p.scroll(-1, x=x, y=y, _pause=False)
+
+
+def click_image(im_state, start_time, max_time, clicks=1, interval=0.0, confidence=0.9, region_boarder_x=10,
+                region_boarder_y=10, offset=(0.2, 0.2, -0.2, -0.2), poll_interval=CLICK_POLL_INTERVAL,
+                cpu_budget=CLICK_CPU_BUDGET):
+    """
+    Espera uma imagem aparecer na tela e clica nela.
 
+    Cada iteração faz uma única captura e busca: o score retornado é comparado com a confiança pedida
+    com a mesma tolerância de 0.02 de antes, sem uma segunda busca. Entre as iterações a função dorme
+    pelo menos poll_interval e o suficiente para não ocupar mais que cpu_budget de um núcleo.
 
-def click_image(im_state, start_time, max_time, clicks=1, interval=0.01, confidence=0.9, region_boarder_x=10,
-                region_boarder_y=10, offset=(0.2, 0.2, -0.2, -0.2)):
+    Args:
+        im_state (str): Nome da imagem (chave de im_data) a ser clicada.
+        start_time (float): Instante (time.time()) em que a espera começou.
+        max_time (float): Tempo máximo de espera, em segundos.
+        poll_interval (float, opcional): Intervalo mínimo entre buscas, em segundos. Padrão é CLICK_POLL_INTERVAL.
+        cpu_budget (float, opcional): Fração máxima de um núcleo usada na espera (0 < cpu_budget <= 1). Padrão é
+            CLICK_CPU_BUDGET.
+
+    Returns:
+        int: 0 se a imagem foi clicada, 1 se o tempo esgotou.
+
+    Raises:
+        ValueError: Se cpu_budget estiver fora do intervalo (0, 1].
+    """
+    if not 0 < cpu_budget <= 1:
+        raise ValueError(f"cpu_budget deve estar entre 0 (exclusive) e 1, recebido {cpu_budget}.")
     while True:
-        box = check(im_state, confidence=confidence,
-                    region_boarder_x=region_boarder_x, region_boarder_y=region_boarder_y)
-        if not box:
-            box = check(im_state, confidence=confidence - 0.02,
-                        region_boarder_x=region_boarder_x, region_boarder_y=region_boarder_y)
+        t_poll = time.perf_counter()
+        box, score = check_score(im_state, confidence=confidence - 0.02,
+                                 region_boarder_x=region_boarder_x, region_boarder_y=region_boarder_y)
         if box:
             p.sleep(1)
             click_box(box, clicks, interval, offset_left=offset[0], offset_top=offset[1],
@@ -313,21 +836,59 @@ def click_image(im_state, start_time, max_time, clicks=1, interval=0.01, confide
             return 0  # success
         if time.time() - start_time > max_time:
             return 1  # fail
+        busy = time.perf_counter() - t_poll
+        p.sleep(max(poll_interval, busy * (1 / cpu_budget - 1)))
+
+
+def wait_until(condition, timeout, poll=None, gone=False, **check_kwargs):
+    """
+    Espera uma condição da tela em vez de uma pausa fixa: retorna assim que ela for satisfeita.
+
+    A condição é verificada imediatamente, a cada 'poll' segundos e uma última vez no fim do prazo, de modo
+    que o timeout pode ser o valor da pausa fixa substituída: no pior caso a espera dura o mesmo que antes.
+
+    Args:
+        condition (str ou callable): Nome de uma imagem (chave de im_data), verificada com check(), ou uma
+            função sem argumentos cujo retorno verdadeiro encerra a espera.
+        timeout (float): Tempo máximo de espera, em segundos.
+        poll (float, opcional): Intervalo entre verificações. Se None, usa WAIT_POLL_INTERVAL.
+        gone (bool, opcional): Se True, espera a condição deixar de ser verdadeira (a imagem sumir). Padrão é False.
+        **check_kwargs: Argumentos repassados a check() quando condition é o nome de uma imagem.
+
+    Returns:
+        O retorno da condição (por exemplo, o Box da imagem encontrada; True quando gone=True), ou None se o
+        tempo esgotar.
+    """
+    if isinstance(condition, str):
+        im_name = condition
+
+        def condition():
+            return check(im_name, **check_kwargs)
+
+    return wait_for(condition, timeout, WAIT_POLL_INTERVAL if poll is None else poll, gone, wait_stats)
 
 
 def click_center(box):
     x = box.left + box.width // 2
     y = box.top + box.height // 2
-    p.click(x, y)
+    input_backend.click(x, y)
+
+
+npc_trackers = {}
 
 
 def find_npc(npc_color_rgb=np.array(NPC_NAME_COLOR)):
-    im = p.screenshot()
-    matches = np.argwhere((np.abs(np.array(im)[:, :, :3] - npc_color_rgb) <= 5).all(axis=2))
-    print(matches.shape)
-    if matches.shape[0] > 20:
-        position = np.median(matches, axis=0)[::-1]
-        return int(position[0]), int(position[1]) + 20
+    """
+    Localiza o NPC pela cor do nome, procurando primeiro em volta da última posição encontrada (NpcTracker).
+
+    Returns:
+        tuple or None: Posição (x, y) para clicar no NPC, ou None se ele não estiver na tela.
+    """
+    key = tuple(int(c) for c in npc_color_rgb)
+    if key not in npc_trackers:
+        npc_trackers[key] = NpcTracker(key, tolerance=5, min_pixels=20, y_offset=NPC_CLICK_Y_OFFSET)
+    with leased_frame() as frame:
+        return npc_trackers[key].locate(frame)
 
 
 def find_npc_2(npc_name_im, npc_color_rgb=np.array(NPC_NAME_COLOR)):
@@ -346,7 +907,7 @@ def find_npc_2(npc_name_im, npc_color_rgb=np.array(NPC_NAME_COLOR)):
     im_array = extract_color_from_screen(npc_color_rgb)
     # from PIL import Image
     # Image.fromarray(im_array[:,:,::-1]).save("npc_im_black.png")
-    return locate(npc_name_im, im_array, confidence=0.5)
+    return templates.locate(npc_name_im, im_array, confidence=0.5)
 
 
 def find_npc_3(npc_name, npc_color_rgb=np.array(NPC_NAME_COLOR), config=TESSERACT_CONFIG, tesseract_path=TESSERACT_PATH_WIN32):
@@ -367,21 +928,37 @@ def find_npc_3(npc_name, npc_color_rgb=np.array(NPC_NAME_COLOR), config=TESSERAC
     Box or None: Retorna uma caixa chamada tupla que representa a posição e o tamanho do nome do NPC detectado, se encontrado;
     caso contrário, Nenhum se o nome do NPC não for detectado ou o Tesseract não for 
     """
+    return find_npc_3_async(npc_name, npc_color_rgb, config, tesseract_path).result()
+
 
+def find_npc_3_async(npc_name, npc_color_rgb=np.array(NPC_NAME_COLOR), config=TESSERACT_CONFIG,
+                     tesseract_path=TESSERACT_PATH_WIN32):
+    """
+    Versão não bloqueante de find_npc_3: a tela é capturada agora e o OCR roda em segundo plano (ocr_service).
+
+    Returns:
+        Future: Resolvido com o Box do nome do NPC, ou None se ele não for encontrado.
+    """
     full_name = {"fish": "Fisher", "bs": "Ferretre"}[npc_name]
     im_array = extract_color_from_screen(npc_color_rgb)
     # config = "-c tessedit_char_whitelist=aBceFhlkimrst"
-    if sys.platform == "win32":
-        pytesseract.tesseract_cmd = tesseract_path
-    try:
-        outputs = pytesseract.image_to_data(im_array, config=config, output_type=pytesseract.Output.DICT)
-        print(outputs)
-        if full_name in outputs["text"]:
-            i_row = outputs["text"].index(full_name)
-            return Box(outputs["left"][i_row], outputs["top"][i_row] + 20, outputs["width"][i_row], outputs["height"][i_row])
-    except pytesseract.TesseractNotFoundError:
-        log("Tesseract not installed. Follow the instruction on the project homepage.")
-        return locate(im_data[f"npc_{npc_name}"], im_array, confidence=0.5)
+    # Só as linhas de texto da cor do nome vão para o OCR, em vez da tela inteira quase toda preta
+    crops = text_line_crops(im_array)
+
+    def npc_box(results):
+        # Sem nenhuma linha da cor do nome (ou sem Tesseract), procura o template do nome na imagem filtrada
+        if not results or any(outputs is None for outputs in results):
+            if results:
+                log("Tesseract not installed. Follow the instruction on the project homepage.")
+            return templates.locate(f"npc_{npc_name}", im_array, confidence=0.5)
+        for (_, left, top), outputs in zip(crops, results):
+            if full_name in outputs["text"]:
+                i_row = outputs["text"].index(full_name)
+                return Box(left + outputs["left"][i_row], top + outputs["top"][i_row] + NPC_CLICK_Y_OFFSET,
+                           outputs["width"][i_row], outputs["height"][i_row])
+
+    tesseract_cmd = tesseract_path if sys.platform == "win32" else None
+    return gather([ocr_service.submit(crop, config, tesseract_cmd) for crop, _, _ in crops], npc_box)
 
 
 def extract_color_from_screen(color_rgb: np.ndarray):